@@ -14,10 +14,14 @@
 
 """Destroy action module."""
 
+import asyncio
 import logging
 
 from mrack.context import global_context
 from mrack.errors import MetadataError
+from mrack.providers import providers
+from mrack.providers.provider import INIT_FULL
+from mrack.providers.utils.timeline import write_trace
 from mrack.transformers import transformers
 
 logger = logging.getLogger(__name__)
@@ -33,17 +37,35 @@ class Action:
         self._db_driver = db_driver or global_context.DB
         self._transformers = {}
 
-    async def _get_transformer(self, provider_name):
-        """Get a transformer by name, initialize a new one if not yet done."""
+    async def _get_transformer(self, provider_name, profile=INIT_FULL):
+        """Get a transformer by name, initialize a new one if not yet done.
+
+        `profile` tells the provider what the action needs from it, see
+        INIT_* constants in mrack.providers.provider.
+        """
         transformer = self._transformers.get(provider_name)
         if not transformer:
             transformer = transformers.get(provider_name)
-            await transformer.init(self._config, self._metadata)
+            await transformer.init(self._config, self._metadata, profile=profile)
             if not transformer:
                 raise MetadataError(f"Invalid provider: {provider_name}")
             self._transformers[provider_name] = transformer
         return transformer
 
+    def save_trace(self, path):
+        """Save phases of all hosts handled by the action as Chrome trace to file."""
+        timelines = {
+            provider_name: providers.get(provider_name).timeline
+            for provider_name in self._transformers
+        }
+        write_trace(path, timelines)
+
+    async def close(self):
+        """Release resources held by providers used by the action."""
+        await asyncio.gather(
+            *[providers.get(name).close() for name in self._transformers]
+        )
+
 
 class DBAction:
     """Base Action."""
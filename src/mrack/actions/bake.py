@@ -0,0 +1,71 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bake action module."""
+
+import asyncio
+import logging
+
+from mrack.actions.action import Action
+from mrack.host import STATUS_ACTIVE
+from mrack.providers.provider import INIT_STATUS_ONLY
+
+logger = logging.getLogger(__name__)
+
+
+class Bake(Action):
+    """Bake action.
+
+    Create images of configured hosts which have `bake` attribute in job
+    metadata so later provisioning of the same hosts can use them instead
+    of configuring the hosts again.
+    """
+
+    def _get_bake_host_names(self):
+        """Get names of hosts with `bake` attribute in job metadata."""
+        return [
+            host["name"]
+            for domain in self._metadata.get("domains", [])
+            for host in domain.get("hosts", [])
+            if host.get("bake")
+        ]
+
+    async def bake(self, hostnames=None):
+        """Execute the bake action."""
+        hostnames = hostnames or self._get_bake_host_names()
+        hosts = self._db_driver.hosts
+        to_bake = [
+            hosts[name]
+            for name in hostnames
+            if name in hosts and hosts[name].status == STATUS_ACTIVE
+        ]
+        missing = set(hostnames) - {host.name for host in to_bake}
+        if missing:
+            logger.warning(f"Hosts not active: {', '.join(sorted(missing))}")
+        if not to_bake:
+            logger.info("No hosts to bake")
+            return False
+
+        providers = {host.provider.name for host in to_bake}
+        await asyncio.gather(
+            *[
+                self._get_transformer(provider, profile=INIT_STATUS_ONLY)
+                for provider in providers
+            ]
+        )
+        results = await asyncio.gather(
+            *[host.provider.bake_host(host) for host in to_bake]
+        )
+        logger.info("Bake done")
+        return all(results)
@@ -19,6 +19,7 @@ import logging
 
 from mrack.actions.action import Action
 from mrack.host import STATUS_DELETED
+from mrack.providers.provider import INIT_DELETE_ONLY
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +47,9 @@ class Destroy(Action):
             results_aws.append(awaitable)
         delete_results = await asyncio.gather(*results_aws)
         success = all(delete_results)
+        for host in to_del:
+            # store the delete phase with the provisioning phases of the host
+            host.timeline = host.timeline + host.provider.timeline.get(host.name)
         self._db_driver.update_hosts(hosts)
         logger.info("Destroy done")
         return success
@@ -54,5 +58,8 @@ class Destroy(Action):
         """Initialize providers for hosts to delete."""
         providers = [host.provider.name for host in hosts]
         providers = set(providers)
-        aws = [self._get_transformer(provider) for provider in providers]
+        aws = [
+            self._get_transformer(provider, profile=INIT_DELETE_ONLY)
+            for provider in providers
+        ]
         await asyncio.gather(*aws)
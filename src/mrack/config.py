@@ -19,9 +19,11 @@ Provisioning config is general project configuration shared between multiple job
 
 import logging
 import os
+import tempfile
 from configparser import ConfigParser, NoOptionError, ParsingError
 
 from mrack.errors import ConfigError
+from mrack.providers.utils.bake import BAKE_MAX_AGE, BAKE_MAX_COUNT
 from mrack.utils import value_to_bool
 
 logger = logging.getLogger(__name__)
@@ -166,6 +168,109 @@ class MrackConfig:
         """Return maximum acceptable network utilization of provider."""
         return int(self.get("usable-network-threshold", default=95))
 
+    @property
+    def quota_cache_ttl(self):
+        """Return `quota-cache-ttl` (seconds) from mrack config.
+
+        Provider quota usage and limits are fetched again after this time.
+        """
+        return int(self.get("quota-cache-ttl", default=30))
+
+    @property
+    def lock_dir(self):
+        """Return `lock-dir` from mrack config.
+
+        Directory with lock files used to coordinate concurrent mrack runs,
+        it can be on a shared file system to coordinate runs on more machines.
+        """
+        return self.get(
+            "lock-dir", default=os.path.join(tempfile.gettempdir(), "mrack")
+        )
+
+    @property
+    def cache_dir(self):
+        """Return `cache-dir` from mrack config or None if not set.
+
+        Directory where providers cache objects which rarely change
+        (e.g. OpenStack flavors, images and networks) between mrack runs.
+        """
+        value = self.get("cache-dir")
+        return os.path.expanduser(value) if value else None
+
+    @property
+    def bake_max_age(self):
+        """Return `bake-max-age` from mrack config.
+
+        Number of hours images baked from configured hosts are used.
+        """
+        return int(self.get("bake-max-age", default=BAKE_MAX_AGE))
+
+    @property
+    def bake_max_count(self):
+        """Return `bake-max-count` from mrack config.
+
+        Number of images kept per base image and host configuration.
+        """
+        return int(self.get("bake-max-count", default=BAKE_MAX_COUNT))
+
+    @property
+    def max_concurrency(self):
+        """Return `max-concurrency` from mrack config or None if not set.
+
+        Limits number of concurrently running provider operations
+        (create, poll, delete, ssh) unless set per provider.
+        """
+        value = self.get("max-concurrency")
+        return None if value is None else int(value)
+
+    @property
+    def http_transport(self):
+        """Return options of HTTP transport shared by provider API clients.
+
+        Options are read from `http-pool-size`, `http-pool-size-per-host`,
+        `http-keepalive`, `http-dns-cache` and `http-connect-timeout`,
+        options which are not set are missing in returned dictionary.
+        """
+        options = {
+            "pool_size": "http-pool-size",
+            "pool_size_per_host": "http-pool-size-per-host",
+            "keepalive": "http-keepalive",
+            "dns_cache": "http-dns-cache",
+            "connect_timeout": "http-connect-timeout",
+        }
+        return {
+            option: int(self.get(key))
+            for option, key in options.items()
+            if self.get(key) is not None
+        }
+
+    @property
+    def fast_abort(self):
+        """Return value of `fast-abort` from mrack config.
+
+        With abort strategy stop waiting for other hosts after first error
+        and delete all hosts right away.
+        """
+        return value_to_bool(self.get("fast-abort", default=True))
+
+    @property
+    def partial_admission(self):
+        """Return value of `partial-admission` from mrack config.
+
+        When enabled hosts which fit available resources are provisioned
+        right away and the rest is provisioned once resources are freed.
+        """
+        return value_to_bool(self.get("partial-admission", default=False))
+
+    @property
+    def provisioning_pipeline(self):
+        """Return value of `provisioning-pipeline` from mrack config.
+
+        When enabled each host goes through create, wait and ssh check
+        on its own instead of waiting for all hosts to finish each stage.
+        """
+        return value_to_bool(self.get("provisioning-pipeline", default=False))
+
     @property
     def network_spread(self):
         """Return `network-spread` setting value from mrack config.
@@ -52,6 +52,7 @@ def host_from_json(host_data):
         host_data["password"],
         host_data["error"],
         host_data.get("meta_extra"),
+        host_data.get("timeline"),
     )
     return host
 
@@ -76,6 +77,7 @@ class Host:
         password=None,
         error_obj=None,
         meta_extra=None,
+        timeline=None,
     ):
         """Initialize host object."""
         self._provider = provider
@@ -90,6 +92,7 @@ class Host:
         self._rawdata = rawdata
         self._error = error_obj
         self._meta_extra = meta_extra
+        self._timeline = timeline or []
 
     def __str__(self):
         """Return string representation of host."""
@@ -124,6 +127,7 @@ class Host:
             "rawdata": self._rawdata,
             "error": self._error,
             "meta_extra": self._meta_extra,
+            "timeline": self._timeline,
         }
 
     @property
@@ -131,6 +135,11 @@ class Host:
         """Get host provisioning provider."""
         return self._provider
 
+    @property
+    def rawdata(self):
+        """Get raw provisioning result of the host."""
+        return self._rawdata
+
     @property
     def operating_system(self):
         """Get host operating system."""
@@ -191,8 +200,19 @@ class Host:
         """Get host extra meta information."""
         return self._meta_extra
 
+    @property
+    def timeline(self):
+        """Get host provisioning phases with monotonic start and end time."""
+        return self._timeline
+
+    @timeline.setter
+    def timeline(self, value):
+        """Set host provisioning phases."""
+        self._timeline = value
+
     async def delete(self):
         """Issue host deletion via associated provider."""
-        await self.provider.delete_host(self.host_id, self.name)
+        with self.provider.timeline.phase(self.name, "delete"):
+            await self.provider.delete_host(self.host_id, self.name)
         self._status = STATUS_DELETED
         return True
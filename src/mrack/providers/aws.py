@@ -15,24 +15,40 @@
 """AWS Provider interface."""
 
 import asyncio
+import hashlib
 import logging
+import os
 import secrets
 from copy import deepcopy
 from datetime import datetime
-from random import shuffle
+from ipaddress import ip_network
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError, NoRegionError
 from dateutil import parser
 
+from mrack.context import global_context
 from mrack.errors import NotAuthenticatedError, ProvisioningError, ValidationError
 from mrack.host import STATUS_ACTIVE, STATUS_DELETED, STATUS_ERROR, STATUS_PROVISIONING
 from mrack.providers.provider import STRATEGY_ABORT, Provider
+from mrack.providers.utils.cache import DiskCache
+from mrack.providers.utils.executor import (
+    EXECUTOR_TIMEOUT,
+    EXECUTOR_WORKERS,
+    BlockingExecutor,
+)
+from mrack.providers.utils.poller import BatchPoller
 from mrack.utils import object2json
 
 logger = logging.getLogger(__name__)
 
 PROVISIONER_KEY = "aws"
+CONNECT_TIMEOUT = 30  # seconds to wait for connection to EC2 API
+POLL_PAGE_SIZE = 200  # maximum number of IDs in filter of single request
+FINAL_STATES = ["running", "shutting-down", "terminated", "stopping", "stopped"]
+IMAGES_CACHE_TTL = 24 * 60 * 60  # seconds resolved images are kept in disk cache
+BULK_CREATE_WINDOW = 0.5  # seconds to collect identical instances for single request
 
 
 class AWSProvider(Provider):
@@ -46,7 +62,21 @@ class AWSProvider(Provider):
         self.ssh_key = None
         self.instance_tags = None
         self.max_retry = 1  # for retry strategy
-        self.subnets_capacity = {}
+        self.subnets_capacity = {}  # free IPs of subnets left for new hosts
+        self.subnet_ids = set()  # subnets which quota is cached
+        self.subnet_zones = {}  # availability zones of subnets
+        self._zone_hosts = {}  # hosts placed to availability zones, see pick_subnet
+        self.client = None
+        self.amis = {}
+        self.cache = None  # disk cache of resolved images, see cache-dir
+        self.executor = None  # runs blocking boto3 calls, see _ec2
+        self.timeout = 60  # minutes to wait for instance to run
+        self.poll_sleep = 10  # seconds
+        self.status_checks = False
+        self._poller = None
+        self.bulk_create = False
+        self._create_batches = {}
+        self._batch_tasks = set()  # running _create_batch tasks
         self.status_map = {
             "running": STATUS_ACTIVE,
             "pending": STATUS_PROVISIONING,
@@ -67,17 +97,42 @@ class AWSProvider(Provider):
         instance_tags,
         strategy=STRATEGY_ABORT,
         max_retry=1,
+        api_workers=EXECUTOR_WORKERS,
+        api_timeout=EXECUTOR_TIMEOUT,
+        bulk_create=False,
+        status_checks=False,
     ):
-        """Initialize provider with data from AWS."""
+        """Initialize provider with data from AWS.
+
+        boto3 calls are blocking, they run in pool of `api_workers` threads
+        so hosts are provisioned concurrently without blocking other providers.
+        Each call fails after `api_timeout` seconds.
+
+        With `bulk_create` instances with identical requests are created
+        using single request, see `create_server`.
+
+        With `status_checks` instances are provisioned once they pass status
+        checks, see `wait_till_provisioned`.
+        """
         # AWS_CONFIG_FILE=`readlink -f ./aws.key`
         log_msg_start = self.dsp_name
         logger.info(f"{log_msg_start} Initializing provider")
         login_start = datetime.now()
         self.strategy = strategy
         self.max_retry = max_retry
+        self.bulk_create = bulk_create
+        self.status_checks = status_checks
+        self.executor = BlockingExecutor(self.dsp_name, api_workers, api_timeout)
         try:
-            self.ec2 = boto3.resource("ec2")
-            self.client = boto3.client("ec2")
+            # client is thread safe unlike boto3 resources
+            self.client = boto3.client(
+                "ec2",
+                config=Config(
+                    max_pool_connections=api_workers,
+                    connect_timeout=CONNECT_TIMEOUT,
+                    read_timeout=api_timeout,
+                ),
+            )
         except (NoRegionError, NoCredentialsError) as c_err:
             logger.debug(
                 f"{log_msg_start} Failed loading credentials file with: {str(c_err)}"
@@ -87,13 +142,25 @@ class AWSProvider(Provider):
                 " and try again. E.g.: $ export AWS_CONFIG_FILE=~/aws.key"
             ) from c_err
 
-        self.amis = []
+        self.amis = {}  # images by filter name and value, see _image_key
+        self.cache = self._init_cache()
         self.ssh_key = ssh_key
         self.instance_tags = instance_tags
         login_end = datetime.now()
         login_duration = login_end - login_start
         logger.info(f"{log_msg_start} Login duration {login_duration}")
 
+    async def close(self):
+        """Wait for batches of instances being created, stop boto3 threads."""
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self.executor:
+            self.executor.shutdown()
+
+    async def _ec2(self, operation, **kwargs):
+        """Call EC2 client operation (e.g. describe_images) off the event loop."""
+        return await self.executor.run(getattr(self.client, operation), **kwargs)
+
     def raise_image_def_error(self, definition):
         """Raise error that image definition is incorrect."""
         json_str = object2json(definition)
@@ -117,13 +184,12 @@ class AWSProvider(Provider):
 
         return True
 
-    def get_image(self, req):
-        """
-        Get a loaded image.
+    def _image_key(self, req):
+        """Get key of image definition of the requirement.
 
+        The key is tuple of describe_images filter name and its value,
+        e.g. ("image-id", "ami-123") or ("tag:os", "fedora").
         Does also basic image definition validation.
-
-        Return None if image is not yet loaded.
         """
         log_msg_start = f"{self.dsp_name} [{req.get('name')}]"
         image_def = req.get("image")
@@ -135,74 +201,132 @@ class AWSProvider(Provider):
         if isinstance(image_def, dict) and "tag" in image_def:
             self.validate_tags_image_def(image_def)
             tag_def = image_def.get("tag")
-            for ami in self.amis:
-                if not ami.tags:
-                    continue
-                for tag in ami.tags:
-                    if (
-                        tag["Key"] == tag_def["name"]
-                        and tag["Value"] == tag_def["value"]
-                    ):
-                        return ami
+            return (f"tag:{tag_def['name']}", tag_def["value"])
         # by AMI ID
-        elif isinstance(image_def, str):
-            for ami in self.amis:
-                if ami.image_id == image_def:
-                    return ami
-        else:
-            raise ValidationError(
-                f"{log_msg_start} Invalid image "
-                f"definition. Must be 'tags' definition or AMI ID"
-            )
-        return None
+        if isinstance(image_def, str):
+            return ("image-id", image_def)
+
+        raise ValidationError(
+            f"{log_msg_start} Invalid image "
+            f"definition. Must be 'tags' definition or AMI ID"
+        )
 
-    def load_image(self, req):
+    def get_image(self, req):
         """
-        Load AMI information from EC2 based on image requirement.
+        Get a loaded image.
 
-        If more images match the search then the newest is returned.
+        Does also basic image definition validation.
 
-        Raises validation error if no image is found.
+        Return None if image is not yet loaded.
         """
-        log_msg_start = f"{self.dsp_name} [{req.get('name')}]"
-        image_def = req.get("image")
-        filters = []
+        return self.amis.get(self._image_key(req))
+
+    def _index_images(self, filter_name, amis):
+        """Index images by filter name and value, the newest image wins."""
+        amis = sorted(amis, key=lambda ami: parser.parse(ami["CreationDate"]))
+        for ami in amis:
+            if filter_name == "image-id":
+                self.amis[(filter_name, ami["ImageId"])] = ami
+                continue
+            for tag in ami.get("Tags", []):
+                if f"tag:{tag['Key']}" == filter_name:
+                    self.amis[(filter_name, tag["Value"])] = ami
+
+    async def _describe_images(self, filter_name, values):
+        """Load images matching any of the values of the filter."""
+        response = await self._ec2(
+            "describe_images", Filters=[{"Name": filter_name, "Values": values}]
+        )
+        return response["Images"]
 
-        # by tag
-        if isinstance(image_def, dict) and "tag" in image_def:
-            tag_def = image_def.get("tag")
-            name = tag_def["name"]
-            filters.append({"Name": f"tag:{name}", "Values": [tag_def["value"]]})
+    async def load_images(self, reqs):
+        """
+        Load AMI images for all requirements.
 
-        # by AMI ID
-        elif isinstance(image_def, str):
-            filters.append({"Name": "image-id", "Values": [image_def]})
+        Already loaded images are not loaded again. Images of all requirements
+        are loaded by single describe_images request per filter (AMI ID or tag
+        name) and the newest image is used for each definition. Resolved images
+        are kept in the disk cache if `cache-dir` is set. Basically also
+        validates that images are available and that their definition is correct.
+        """
+        missing = {}
+        for req in reqs:
+            key = self._image_key(req)
+            if key not in self.amis:
+                missing.setdefault(key, req)
+        if not missing:
+            return
+
+        for key in list(missing):
+            ami = self._get_cached_image(key)
+            if ami:
+                self.amis[key] = ami
+                del missing[key]
+
+        values = {}
+        for filter_name, value in missing:
+            values.setdefault(filter_name, []).append(value)
+        filter_names = sorted(values)
+        results = await asyncio.gather(
+            *[
+                self._describe_images(filter_name, sorted(values[filter_name]))
+                for filter_name in filter_names
+            ]
+        )
+        for filter_name, amis in zip(filter_names, results):
+            self._index_images(filter_name, amis)
 
-        amis = list(self.ec2.images.filter(Filters=filters))
+        for key, req in missing.items():
+            if key not in self.amis:
+                raise ValidationError(
+                    f"{self.dsp_name} [{req.get('name')}] Cannot find image for host"
+                )
+            if self.cache:
+                self.cache.set(self._image_cache_key(key), self.amis[key])
 
-        if not amis:
-            raise ValidationError(f"{log_msg_start} Cannot find image for host")
+    @staticmethod
+    def _image_cache_key(key):
+        """Get disk cache key of image resolved for the image key."""
+        return "image:" + "=".join(key)
 
-        amis.sort(key=lambda ami: parser.parse(ami.creation_date), reverse=True)
-        self.amis.append(amis[0])
-        return amis[0]
+    def _get_cached_image(self, key):
+        """Get image resolved for the image key from the disk cache or None.
 
-    def load_images(self, reqs):
+        Each image is stored with its own time, so images resolved later
+        do not extend the lifetime of images resolved earlier (e.g. newest
+        image with a tag).
         """
-        Load AMI images for all requirements.
+        if not self.cache:
+            return None
+        return self.cache.get(self._image_cache_key(key), IMAGES_CACHE_TTL)
 
-        Done sequentially, already loaded images are not loaded again. Basically also
-        validates that images are available and that their definition is correct.
+    def _init_cache(self):
+        """Init disk cache of resolved images if `cache-dir` is configured.
+
+        The cache is specific for the region and profile.
         """
-        for req in reqs:
-            ami = self.get_image(req)
-            if not ami:
-                self.load_image(req)
+        config = global_context.CONFIG
+        cache_dir = config.cache_dir if config else None
+        if not cache_dir:
+            return None
+
+        scope = "|".join(
+            str(value)
+            for value in (
+                self.client.meta.region_name,
+                os.environ.get("AWS_PROFILE"),
+                os.environ.get("AWS_CONFIG_FILE"),
+            )
+        )
+        digest = hashlib.sha256(scope.encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"{self.name}-{digest}.json")
+        logger.debug(f"{self.dsp_name} Using cache {path}")
+        return DiskCache(path)
 
     async def prepare_provisioning(self, reqs):
         """Prepare provisioning."""
         try:
-            self.load_images(reqs)
+            await self.load_images(reqs)
         except ValidationError as val_err:
             logger.error(val_err)
             return False
@@ -213,70 +337,112 @@ class AWSProvider(Provider):
         """Validate that host requirements are well specified."""
         return
 
-    async def get_subnet_available_ips(self, subnet_id, log_msg_start):
-        """Get number of IPs available in a subnet."""
+    async def fetch_quota(self):
+        """Fetch IP address usage of subnets used by hosts.
+
+        All subnets are described by single request, size of subnet is
+        derived from its CIDR block.
+        """
+        log_msg_start = self.dsp_name
+        logger.info(f"{log_msg_start} Checking IP availability")
+        subnet_ids = sorted(self.subnet_ids)
         try:
-            subnet = self.ec2.Subnet(subnet_id)
-        except ClientError:
-            logger.warning(
-                f"{log_msg_start} Error retrieving info from subnet: {subnet_id}"
+            subnets = await self._describe_pages(
+                "describe_subnets",
+                "Subnets",
+                subnet_ids,
+                id_filter="subnet-id",
             )
-            return 0
+        except (ClientError, asyncio.TimeoutError) as err:
+            logger.warning(f"{log_msg_start} Error retrieving info of subnets: {err}")
+            subnets = []
+
+        quota = {subnet_id: {"used": 0, "limit": 0} for subnet_id in subnet_ids}
+        for subnet in subnets:
+            subnet_id = subnet["SubnetId"]
+            # AWS reserves first four and the last address of each subnet
+            size = ip_network(subnet["CidrBlock"]).num_addresses - 5
+            available = subnet["AvailableIpAddressCount"]
+            logger.debug(
+                f"{log_msg_start} Subnet {subnet_id} "
+                f"({subnet['AvailabilityZone']}) available: {available}"
+            )
+            self.subnet_zones[subnet_id] = subnet["AvailabilityZone"]
+            quota[subnet_id] = {"used": size - available, "limit": size}
 
-        logger.debug(f"{log_msg_start} Subnet {subnet_id}")
-        logger.debug(
-            f"{log_msg_start}   available: {subnet.available_ip_address_count}"
-        )
+        for subnet_id in set(subnet_ids).difference(self.subnet_zones):
+            logger.warning(f"{log_msg_start} Subnet {subnet_id} not found")
+        return quota
+
+    def pick_subnet(self, subnet_ids, capacity, zone_hosts):
+        """Pick subnet with free IP address for a host, None if there is none.
+
+        Hosts are spread across availability zones of given subnets first:
+        subnet in the zone with least hosts placed so far is used and among
+        subnets of the same zone the one with most free IP addresses.
+        `capacity` (free IPs by subnet) and `zone_hosts` (hosts by zone) are
+        updated with the picked subnet.
+        """
+        candidates = [
+            (
+                zone_hosts.get(self.subnet_zones.get(subnet_id), 0),
+                -capacity.get(subnet_id, 0),
+                idx,
+            )
+            for idx, subnet_id in enumerate(subnet_ids)
+            if capacity.get(subnet_id, 0) > 0
+        ]
+        if not candidates:
+            return None
 
-        return subnet.available_ip_address_count
+        subnet_id = subnet_ids[min(candidates)[2]]
+        zone = self.subnet_zones.get(subnet_id)
+        capacity[subnet_id] -= 1
+        zone_hosts[zone] = zone_hosts.get(zone, 0) + 1
+        return subnet_id
 
-    async def can_provision(self, hosts):  # pylint: disable=too-many-branches
+    async def can_provision(self, hosts):
         """Check that all host can be provisioned.
 
         Checks:
         * Available IPv4 addresses are enough
+
+        Hosts with single subnet are counted first, hosts with multiple
+        subnets are then placed the same way as in `create_server`.
         """
         log_msg_start = self.dsp_name
 
-        ip_availabilities = {}  # Dict for storing available IPs in every subnet
         single_subnet_prov = []  # List for storing provided single subnets
         mult_subnets_prov = []  # List for storing lists of provided multiple subnets
-
-        # For all hosts, get subnets in dict (with no repetitions) and list of
-        # provided single & multiple subnets
         for host in hosts:
             subnet_ids = host.get("subnet_ids")
-            if subnet_ids:
-                if len(subnet_ids) == 1:
-                    single_subnet_prov.append(subnet_ids[0])
-                    if subnet_ids[0] not in ip_availabilities:
-                        ip_availabilities[subnet_ids[0]] = 0
-                else:
-                    mult_subnets_prov.append(subnet_ids)
-                    for subnet_id in subnet_ids:
-                        if subnet_id not in ip_availabilities:
-                            ip_availabilities[subnet_id] = 0
-            else:
+            if not subnet_ids:
                 logger.debug(
                     f"{log_msg_start} No subnet/s specified for host {host['name']}."
                 )
-
-        # Get available IPs from AWS for every subnet
-        logger.info(f"{log_msg_start} Checking IP availability")
-        ips_count_wait = [
-            self.get_subnet_available_ips(subnet_id, log_msg_start)
-            for subnet_id in ip_availabilities
-        ]
-        ips_count_result = await asyncio.gather(*ips_count_wait)
-        ip_availabilities = dict(zip(ip_availabilities, ips_count_result))
+            elif len(subnet_ids) == 1:
+                single_subnet_prov.append(subnet_ids[0])
+            else:
+                mult_subnets_prov.append(subnet_ids)
+
+        # Get available IPs from AWS for all subnets (cached)
+        used_subnets = set(single_subnet_prov).union(*mult_subnets_prov)
+        if not self.subnet_ids.issuperset(used_subnets):
+            self.subnet_ids.update(used_subnets)
+            self.quota.invalidate()
+        quota = await self.quota.get()
+        ip_availabilities = {
+            subnet_id: max(0, quota[subnet_id]["limit"] - quota[subnet_id]["used"])
+            for subnet_id in used_subnets
+        }
 
         self.subnets_capacity = ip_availabilities.copy()
+        self._zone_hosts = {}
 
         # Discount hosts with single subnet specified from available IPs
+        zone_hosts = {}
         for subnet_id in single_subnet_prov:
-            if ip_availabilities[subnet_id] > 0:
-                ip_availabilities[subnet_id] -= 1
-            else:
+            if not self.pick_subnet([subnet_id], ip_availabilities, zone_hosts):
                 logger.info(
                     f"{log_msg_start} Not enougn IP addresses available "
                     f"in subnet: {subnet_id}"
@@ -285,11 +451,7 @@ class AWSProvider(Provider):
 
         # Discount hosts with multiple subnets specified from available IPs
         for subnet_ids in mult_subnets_prov:
-            for subnet_id in subnet_ids:
-                if ip_availabilities[subnet_id] > 0:
-                    ip_availabilities[subnet_id] -= 1
-                    break
-            else:
+            if not self.pick_subnet(subnet_ids, ip_availabilities, zone_hosts):
                 logger.info(
                     f"{log_msg_start} Not enougn IP addresses available "
                     f"in subnet/s: {subnet_ids}"
@@ -300,21 +462,15 @@ class AWSProvider(Provider):
 
     async def utilization(self):
         """Check percentage utilization of given provider."""
-        net_sizes = {
-            "28": 14,
-            "27": 30,
-            "26": 62,
-            "25": 126,
-            "24": 254,
-            "23": 510,
-        }
+        if not self.subnet_ids:
+            return 0
+
+        quota = await self.quota.get()
         res = 0
-        for net, _availability in self.subnets_capacity.items():
-            subnet = self.ec2.Subnet(net)
-            size = net_sizes[subnet.cidr_block.split("/")[-1]]
-            self.subnets_capacity[net] = subnet.available_ip_address_count
-            usage = (size - self.subnets_capacity[net]) / size * 100
-            res = usage if usage > res else res
+        for usage in quota.values():
+            if not usage["limit"]:
+                continue
+            res = max(res, usage["used"] / usage["limit"] * 100)
 
         return res
 
@@ -327,6 +483,10 @@ class AWSProvider(Provider):
         * 'image': ami or name of image
         * 'flavor': flavor to use
 
+        With `bulk_create` enabled, instances with identical request (except
+        the Name and Hostname tags) whose creation is issued within
+        BULK_CREATE_WINDOW are created using single RunInstances request.
+
         Returns:
             A tuple containing, respectively, a string (<aws machine id>)
             and a dict (<requirements for the VM>)
@@ -340,14 +500,15 @@ class AWSProvider(Provider):
 
         name = req.get("name")
         # creating unique name for instance (visible in aws ec2 WebUI)
-        taglist = [{"Key": "Name", "Value": name}]
-        taglist.append(
+        name_tags = [{"Key": "Name", "Value": name}]
+        name_tags.append(
             {
                 "Key": "Hostname",
                 "Value": f"{name.split('.')[0]}-{secrets.token_hex()[:6]}",
             }
         )
 
+        taglist = []
         for key, value in self.instance_tags.items():
             taglist.append({"Key": key, "Value": value})
 
@@ -355,10 +516,13 @@ class AWSProvider(Provider):
             for key, value in specs.get("metadata").items():
                 taglist.append({"Key": key, "Value": value})
 
-        logger.debug(f"{log_msg_start} Tagging instance with: {object2json(taglist)}")
+        logger.debug(
+            f"{log_msg_start} Tagging instance with: "
+            f"{object2json(name_tags + taglist)}"
+        )
 
         request = {
-            "ImageId": self.get_image(specs).image_id,
+            "ImageId": self.get_image(specs)["ImageId"],
             "MinCount": 1,
             "MaxCount": 1,
             "InstanceType": specs.get("flavor"),
@@ -377,15 +541,14 @@ class AWSProvider(Provider):
 
         subnet_ids = specs.get("subnet_ids")
         if subnet_ids:
-            shuffle(subnet_ids)  # Randomize subnets order
-            for subnet_id in subnet_ids:
-                if self.subnets_capacity[subnet_id] > 0:
-                    self.subnets_capacity[subnet_id] -= 1
-                    request["SubnetId"] = subnet_id
-                    break
-            if not request["SubnetId"]:
+            subnet_id = self.pick_subnet(
+                subnet_ids, self.subnets_capacity, self._zone_hosts
+            )
+            if subnet_id:
+                request["SubnetId"] = subnet_id
+            else:
                 raise ProvisioningError(
-                    f"There are no subnets with IPs available"
+                    f"There are no subnets with IPs available "
                     f"for use from {subnet_ids}",
                     req,
                 )
@@ -397,25 +560,176 @@ class AWSProvider(Provider):
                 "MarketType": "spot",
             }
 
-        try:
-            aws_res = self.ec2.create_instances(**request)
-        except ClientError as creation_error:
-            err_msg = (
-                f"{log_msg_start} Requested image "
-                f"'{specs.get('image')}' can not be provisioned"
+        if self.bulk_create:
+            aws_id = await self._create_instance_in_batch(request, name_tags, req)
+        else:
+            aws_id = await self._request_instance(
+                self._with_tags(request, name_tags), req
             )
-            logger.error(err_msg)
-            err_resp = creation_error.response["Error"]["Message"]
-            raise ProvisioningError(
-                f"{err_msg} Request failed with: {err_resp}", req
+
+        if request.get("SubnetId"):
+            self.quota.reserve({request["SubnetId"]: 1})
+
+        # returns id of provisioned instance and required host name
+        return (aws_id, req)
+
+    def _with_tags(self, request, tags):
+        """Get copy of RunInstances request with additional instance tags."""
+        request = deepcopy(request)
+        request["TagSpecifications"][0]["Tags"] = (
+            tags + request["TagSpecifications"][0]["Tags"]
+        )
+        return request
+
+    def _creation_error(self, error, req, log_msg_start):
+        """Get ProvisioningError for failed RunInstances request."""
+        err_msg = (
+            f"{log_msg_start} Requested image "
+            f"'{req.get('image')}' can not be provisioned"
+        )
+        logger.error(err_msg)
+        if isinstance(error, ClientError):
+            err_resp = error.response["Error"]["Message"]
+        else:
+            err_resp = "timeout"
+        return ProvisioningError(f"{err_msg} Request failed with: {err_resp}", req)
+
+    async def _request_instance(self, request, req):
+        """Request creation of single instance, return its ID."""
+        log_msg_start = f"{self.dsp_name} [{req['name']}]"
+        try:
+            async with self.limiter("create"):
+                aws_res = await self._ec2("run_instances", **request)
+        except (ClientError, asyncio.TimeoutError) as creation_error:
+            raise self._creation_error(
+                creation_error, req, log_msg_start
             ) from creation_error
 
-        ids = [srv.id for srv in aws_res]
+        ids = [srv["InstanceId"] for srv in aws_res["Instances"]]
         if len(ids) != 1:  # ids must be len of 1 as we provision one vm at the time
             raise ProvisioningError("Unexpected number of instances provisioned.", req)
+        return ids[0]
+
+    async def _create_instance_in_batch(self, request, name_tags, req):
+        """Add instance to batch of instances with identical request and wait."""
+        key = object2json(request)
+        batch = self._create_batches.get(key)
+        if batch is None:
+            batch = []
+            self._create_batches[key] = batch
+            task = asyncio.ensure_future(self._create_batch(key, request))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+        future = asyncio.get_event_loop().create_future()
+        batch.append((name_tags, req, future))
+        return await future
+
+    async def _create_batch(self, key, request):
+        """Create batch of instances once the window for joining it closes.
+
+        Future of each instance in the batch is resolved even when the creation
+        or termination of instances nobody waits for fails.
+        """
+        await asyncio.sleep(BULK_CREATE_WINDOW)
+        batch = self._create_batches.pop(key)
+        try:
+            await self._resolve_batch(request, batch)
+        finally:
+            for _name_tags, _req, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _resolve_batch(self, request, batch):
+        """Create instances of the batch and set results of their futures."""
+        try:
+            if len(batch) == 1:
+                name_tags, req, _future = batch[0]
+                ids = [
+                    await self._request_instance(
+                        self._with_tags(request, name_tags), req
+                    )
+                ]
+            else:
+                ids = await self._request_instances(request, batch)
+        except Exception as exc:  # pylint: disable=broad-except
+            for _name_tags, req, future in batch:
+                if future.done():
+                    continue
+                if isinstance(exc, ProvisioningError):
+                    # each host needs the error with its own requirement
+                    future.set_exception(ProvisioningError(exc.args[0], req))
+                else:
+                    future.set_exception(exc)
+            return
+
+        abandoned = []
+        for (_name_tags, req, future), aws_id in zip(batch, ids):
+            if future.done():
+                abandoned.append((req, aws_id))
+                continue
+            future.set_result(aws_id)
+
+        for req, aws_id in abandoned:
+            # nobody waits for the instance anymore, do not leave it behind
+            logger.info(f"{self.dsp_name} [{req['name']}] Creation cancelled")
+            try:
+                await self.delete_host(aws_id, req["name"])
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(
+                    f"{self.dsp_name} [{req['name']}] Unable to terminate "
+                    f"instance {aws_id}: {exc}"
+                )
 
-        # returns id of provisioned instance and required host name
-        return (ids[0], req)
+    async def _request_instances(self, request, batch):
+        """Create batch of instances with identical request using single request.
+
+        Instances are mapped to the requirements in the batch by their launch
+        index and tagged with their Name and Hostname tags afterwards.
+        Returns IDs of the instances in order of the batch.
+        """
+        count = len(batch)
+        names = ", ".join(req["name"] for _name_tags, req, _future in batch)
+        log_msg_start = f"{self.dsp_name} [{names}]"
+        logger.info(f"{log_msg_start} Creating {count} instances with single request")
+
+        request = dict(request, MinCount=count, MaxCount=count)
+        try:
+            async with self.limiter("create"):
+                aws_res = await self._ec2("run_instances", **request)
+        except (ClientError, asyncio.TimeoutError) as creation_error:
+            raise self._creation_error(
+                creation_error, batch[0][1], log_msg_start
+            ) from creation_error
+
+        instances = sorted(aws_res["Instances"], key=lambda srv: srv["AmiLaunchIndex"])
+        ids = [srv["InstanceId"] for srv in instances]
+        if len(ids) != count:
+            for aws_id in ids:
+                await self.delete_host(aws_id, names)
+            raise ProvisioningError(
+                f"{log_msg_start} Expected {count} instances, got {len(ids)}",
+                batch[0][1],
+            )
+
+        await asyncio.gather(
+            *[
+                self._tag_instance(aws_id, name_tags, req)
+                for aws_id, (name_tags, req, _future) in zip(ids, batch)
+            ]
+        )
+        return ids
+
+    async def _tag_instance(self, aws_id, tags, req):
+        """Tag instance created by multi-instance request with its own tags."""
+        try:
+            async with self.limiter("create"):
+                await self._ec2("create_tags", Resources=[aws_id], Tags=tags)
+        except (ClientError, asyncio.TimeoutError) as error:
+            logger.warning(
+                f"{self.dsp_name} [{req['name']}] Unable to tag instance "
+                f"{aws_id}: {error}"
+            )
 
     def get_ip_addresses(self, prov_result):
         """Get IP address from a provisioning result."""
@@ -432,7 +746,8 @@ class AWSProvider(Provider):
         result = {}
 
         result["id"] = prov_result.get("InstanceId")
-        for tag in prov_result.get("Tags"):
+        result["name"] = req.get("name")  # tags may not be visible yet
+        for tag in prov_result.get("Tags", []):
             if tag["Key"] == "Name":
                 result["name"] = tag["Value"]  # should be one key "name"
 
@@ -443,22 +758,128 @@ class AWSProvider(Provider):
 
         return result
 
+    async def _describe_pages(self, operation, key, ids, id_filter=None):
+        """Call describe operation for IDs in pages, return all listed items.
+
+        With `id_filter` (e.g. instance-id) the IDs are passed as filter of that
+        name, so unknown IDs are missing in the result instead of failing
+        the request.
+        """
+        items = []
+        for start in range(0, len(ids), POLL_PAGE_SIZE):
+            page = ids[start : start + POLL_PAGE_SIZE]
+            if id_filter:
+                params = {"Filters": [{"Name": id_filter, "Values": page}]}
+            else:
+                params = {"InstanceIds": page}
+            while True:
+                async with self.limiter("poll"):
+                    response = await self._ec2(operation, **params)
+                items.extend(response.get(key, []))
+                if not response.get("NextToken"):
+                    break
+                params["NextToken"] = response["NextToken"]
+        return items
+
+    async def _fetch_instances(self, aws_ids):
+        """Get current state of instances using describe_instances in pages.
+
+        Instances are filtered by ID, so instances which are not visible
+        yet are missing in the result instead of failing the request. With
+        `status_checks` the status checks of running instances are added
+        to them under "mrack_status_checks".
+        """
+        reservations = await self._describe_pages(
+            "describe_instances", "Reservations", aws_ids, id_filter="instance-id"
+        )
+        instances = {
+            instance["InstanceId"]: instance
+            for reservation in reservations
+            for instance in reservation["Instances"]
+        }
+
+        running = [
+            aws_id
+            for aws_id, instance in instances.items()
+            if instance["State"]["Name"] == "running"
+        ]
+        if self.status_checks and running:
+            statuses = await self._describe_pages(
+                "describe_instance_status", "InstanceStatuses", running
+            )
+            for status in statuses:
+                checks = [
+                    status["InstanceStatus"]["Status"],
+                    status["SystemStatus"]["Status"],
+                ]
+                if "impaired" in checks:
+                    checks_status = "impaired"
+                elif all(check == "ok" for check in checks):
+                    checks_status = "ok"
+                else:
+                    checks_status = "initializing"
+                instances[status["InstanceId"]]["mrack_status_checks"] = checks_status
+
+        return instances
+
+    def _is_instance_done(self, instance):
+        """Check that instance reached final state (and passed status checks)."""
+        state = instance["State"]["Name"]
+        if state not in FINAL_STATES:
+            return False
+        if state == "running" and self.status_checks:
+            return instance.get("mrack_status_checks") in ["ok", "impaired"]
+        return True
+
+    def _get_poller(self):
+        """Get poller shared by all instances waiting to be provisioned."""
+        if self._poller is None:
+            self._poller = BatchPoller(
+                self.dsp_name,
+                self._fetch_instances,
+                self._is_instance_done,
+                interval=self.poll_sleep,
+                errors=(ClientError, asyncio.TimeoutError),
+            )
+        return self._poller
+
     async def wait_till_provisioned(self, resource):
-        """Wait for AWS provisioning result."""
+        """Wait for AWS provisioning result.
+
+        State of all instances is checked by polling with single request
+        (per POLL_PAGE_SIZE instances) every `poll_sleep` seconds till the
+        instance is running or reaches other final state. With `status_checks`
+        running instance needs to pass also instance and system status
+        checks, so it is reachable right away.
+        """
         aws_id, req = resource
-        instance = self.ec2.Instance(aws_id)
-        instance.wait_until_running()
-        response = self.client.describe_instances(InstanceIds=[aws_id])
-        result = {}
-        try:  # returns dict with aws instance information
-            result = response["Reservations"][0]["Instances"][0]
-            result.update({"mrack_req": req})
-        except (KeyError, IndexError) as data_err:
+        log_msg_start = f"{self.dsp_name} [{req['name']}]"
+        try:
+            result = await self._get_poller().wait(
+                aws_id,
+                timeout=self.timeout * 60,
+                seen=lambda _state: self.timeline.mark(req.get("name"), "first status"),
+            )
+        except (ClientError, asyncio.TimeoutError) as err:
+            logger.debug(f"{log_msg_start} {err}")
             raise ProvisioningError(
-                "Unexpected data format in response "
-                f"of provisioned instance '{req['name']}'"
-            ) from data_err
+                f"{log_msg_start} Failed to get state of instance {aws_id}", req
+            ) from err
 
+        if not result:
+            raise ProvisioningError(
+                f"Instance '{req['name']}' with ID {aws_id} was not found", req
+            )
+        if not self._is_instance_done(result):
+            logger.warning(
+                f"{log_msg_start} ID {aws_id}: host was not provisioned "
+                f"within a timeout of {self.timeout} mins"
+            )
+        if result.get("mrack_status_checks") == "impaired":
+            logger.warning(f"{log_msg_start} ID {aws_id}: status checks failed")
+        if result["State"]["Name"] == "running":
+            self.timeline.mark(req.get("name"), "active")
+        result = dict(result, mrack_req=req)
         return result, req
 
     async def delete_host(self, host_id, host_name):
@@ -472,9 +893,15 @@ class AWSProvider(Provider):
 
         logger.info(f"{log_msg_start} Terminating host with ID {host_id}")
         try:
-            self.ec2.instances.filter(InstanceIds=[host_id]).terminate()
+            async with self.limiter("delete"):
+                await self._ec2("terminate_instances", InstanceIds=[host_id])
         except ClientError as error:
             logger.error(f"{log_msg_start} Issue while terminating host {host_id}:")
             logger.error(error.response["Error"]["Message"])
             return False
+        except asyncio.TimeoutError:
+            logger.error(f"{log_msg_start} Terminating host {host_id} timed out")
+            return False
+        # freed IP addresses are visible only in fresh subnet data
+        self.quota.invalidate()
         return True
@@ -343,6 +343,8 @@ class BeakerProvider(Provider):
             job_url = f"{hub_url}/jobs/{bkr_res.get('id', None)}"
 
             status_changed = prev_status != status
+            if status and not prev_status:
+                self.timeline.mark(req.get("name"), "first status")
             if status_changed:
                 logger.info(
                     f"{log_msg_start} Job {job_url} "
@@ -354,6 +356,7 @@ class BeakerProvider(Provider):
             if self.status_map.get(status) == STATUS_PROVISIONING or not status_changed:
                 await asyncio.sleep(self.poll_sleep)
             elif self.status_map.get(status) == STATUS_ACTIVE:
+                self.timeline.mark(req.get("name"), "active")
                 break
             elif self.status_map.get(status) in [STATUS_ERROR, STATUS_DELETED]:
                 logger.warning(
@@ -15,18 +15,30 @@
 """OpenStack provider."""
 
 import asyncio
+import hashlib
 import logging
+import os
+import time
+from collections import namedtuple
 from copy import deepcopy
 from datetime import datetime, timedelta
+from itertools import chain, repeat
 from random import random, sample
 from urllib.parse import parse_qs, urlparse
+from uuid import UUID
 
 import aiofiles  # type: ignore
 import os_client_config
 from aiohttp import ContentTypeError
-from asyncopenstackclient import AuthPassword, GlanceClient
+from asyncopenstackclient import AuthPassword
 from keystoneauth1.exceptions.auth_plugins import MissingRequiredOptions, OptionError
-from simple_rest_client.exceptions import AuthError, NotFoundError, ServerError
+from simple_rest_client.exceptions import (
+    AuthError,
+    ClientConnectionError,
+    ClientError,
+    NotFoundError,
+    ServerError,
+)
 
 from mrack.context import global_context
 from mrack.errors import (
@@ -37,8 +49,16 @@ from mrack.errors import (
     ValidationError,
 )
 from mrack.host import STATUS_ACTIVE, STATUS_DELETED, STATUS_ERROR, STATUS_PROVISIONING
-from mrack.providers.provider import STRATEGY_ABORT, Provider
-from mrack.providers.utils.osapi import ExtraNovaClient, NeutronClient
+from mrack.providers.provider import INIT_FULL, STRATEGY_ABORT, Provider
+from mrack.providers.utils.bake import BakeCache
+from mrack.providers.utils.cache import DiskCache
+from mrack.providers.utils.http import HTTPTransport
+from mrack.providers.utils.osapi import (
+    ExtraGlanceClient,
+    ExtraNovaClient,
+    NeutronClient,
+)
+from mrack.providers.utils.poller import BatchPoller
 from mrack.utils import get_shortname, is_windows_host, object2json
 
 logger = logging.getLogger(__name__)
@@ -52,8 +72,24 @@ PROVISIONER_KEY = "openstack"
 SERVER_ERROR_RETRY = 5  # number of times to retry server creation
 SERVER_ERROR_SLEEP = 10  # seconds
 SERVER_RES_SLEEP = 10  # minutes
+POLL_SINCE_MARGIN = 5  # minutes to tolerate clock skew when listing changed servers
 NETWORK_NAME = 0
 NETWORK_SIZE = 1
+# number of seconds objects are kept in the disk cache
+FLAVORS_CACHE_TTL = 7 * 24 * 60 * 60
+NETWORKS_CACHE_TTL = 24 * 60 * 60
+IMAGES_CACHE_TTL = 24 * 60 * 60
+KEYPAIR_CACHE_TTL = 7 * 24 * 60 * 60
+AUTH_CACHE_TTL = 24 * 60 * 60
+TOKEN_REUSE_MARGIN = 30 * 60  # seconds cached token needs to stay valid to be reused
+BULK_CREATE_WINDOW = 0.5  # seconds to collect identical servers for single request
+BAKE_POLL_SLEEP = 10  # seconds
+BAKE_TIMEOUT = 60  # minutes to wait for baked image
+
+# OpenStack objects required by host requirement, see _resolve_req
+ResolvedSpec = namedtuple(
+    "ResolvedSpec", ["flavor", "image", "base_image", "networks", "specs"]
+)
 
 
 class OpenStackProvider(Provider):
@@ -84,7 +120,19 @@ class OpenStackProvider(Provider):
         self.poll_sleep_initial = 15  # seconds
         self.poll_sleep = 7  # seconds
         self.poll_init_adj = 0  # set based on # of hosts to provisions
-        self.poll_adj = 0  # set based on # of hosts to provisions
+        self._poller = None
+        self.cache = None  # disk cache of environment objects, see cache-dir
+        self.bakes = None  # images baked from configured hosts, see bake_host
+        self.lazy_load = False
+        self._flavors_loading = None
+        self.bulk_create = False
+        self._create_batches = {}
+        self._batch_tasks = set()  # running _create_batch tasks
+        self.transport = None
+        self._resolved = {}  # resolved specs of requirements by their signature
+        self._project_id = None
+        # lower concurrency of requests when OpenStack struggles to serve them
+        self.rate_limit_errors = (ServerError, ClientConnectionError)
         self.status_map = {
             "ACTIVE": STATUS_ACTIVE,
             "BUILD": STATUS_PROVISIONING,
@@ -205,15 +253,187 @@ class OpenStackProvider(Provider):
                 )
                 raise NotAuthenticatedError(err_msg) from terr
 
+    def _init_cache(self):
+        """Init disk cache of environment objects if `cache-dir` is configured.
+
+        The cache is specific for the cloud profile, project and user so cached
+        token of one identity is never used by another one.
+        """
+        config = global_context.CONFIG
+        cache_dir = config.cache_dir if config else None
+        if not cache_dir:
+            return None
+
+        scope = "|".join(
+            str(value)
+            for value in (
+                self.session.os_auth_url,
+                self.cloud_profile,
+                self.session.os_project_id or self.session.os_project_name,
+                self.session.os_project_domain_name,
+                self.session.os_username,
+                self.session.os_user_domain_name,
+                self.session.os_application_credential_id,
+            )
+        )
+        digest = hashlib.sha256(scope.encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"{self.name}-{digest}.json")
+        logger.debug(f"{self.dsp_name} Using cache {path}")
+        return DiskCache(path)
+
+    def _init_bakes(self):
+        """Init cache of baked images, it is stored in the disk cache."""
+        if not self.cache:
+            return None
+        config = global_context.CONFIG
+        return BakeCache(self.cache, config.bake_max_age, config.bake_max_count)
+
+    def _get_cached(self, key, ttl):
+        """Get object from disk cache or None if it is missing or disabled."""
+        if not self.cache:
+            return None
+        return self.cache.get(key, ttl)
+
+    def _set_cached(self, key, value):
+        """Store object in disk cache if it is enabled."""
+        if self.cache:
+            self.cache.set(key, value)
+
+    def _invalidate_cached(self, key):
+        """Remove object from disk cache if it is enabled."""
+        if self.cache:
+            self.cache.invalidate(key)
+
+    def _invalidate_rejected(self, error, req):
+        """Remove cached image or keypair which nova rejected as missing.
+
+        So the next run resolves the (deleted or replaced) object again
+        instead of failing until the cached object expires.
+        """
+        body = str(getattr(error.response, "body", "")).lower()
+        if "image" in body and "not be found" in body:
+            logger.debug(f"{self.dsp_name} Dropping cached image {req.get('image')}")
+            self._invalidate_cached(f"image:{req.get('image')}")
+        if "key_name" in body or "keypair" in body:
+            logger.debug(f"{self.dsp_name} Dropping cached keypair {self.keypair}")
+            self._invalidate_cached("keypair")
+
+    def _create_clients(self, api_urls):
+        """Create nova, glance and neutron clients sharing the session.
+
+        API URLs which are not known yet are taken from the service catalog.
+        """
+        self.nova = ExtraNovaClient(
+            session=self.session,
+            api_url=api_urls.get("nova"),
+            transport=self.transport,
+        )
+        self.glance = ExtraGlanceClient(
+            session=self.session,
+            api_url=api_urls.get("glance"),
+            transport=self.transport,
+        )
+        self.neutron = NeutronClient(
+            session=self.session,
+            api_url=api_urls.get("neutron"),
+            transport=self.transport,
+        )
+
+    async def _login(self):
+        """Authenticate and initialize APIs of the clients."""
+        login_start = datetime.now()
+        try:
+            # authenticate once so all clients use the same token
+            await self.session.authenticate()
+            await asyncio.gather(
+                self.nova.init_api(self.api_timeout),
+                self.glance.init_api(self.api_timeout),
+                self.neutron.init_api(self.api_timeout),
+            )
+        except KeyError as e:
+            err_msg = "Authentication to Openstack with provided credentials failed"
+            raise NotAuthenticatedError(err_msg) from e
+        except ContentTypeError as e:
+            err_msg = (
+                "Authentication to Openstack with provided credentials failed"
+                + "\nTIP: Make sure the parameter 'auth_url' from your credentials"
+                + " ends with '/v3'"
+            )
+            raise NotAuthenticatedError(err_msg) from e
+        login_end = datetime.now()
+        logger.info(f"{self.dsp_name} Login duration {login_end - login_start}")
+
+    async def _check_cached_auth(self):
+        """Check that OpenStack still accepts token reused from disk cache.
+
+        Client APIs are initialized without any request when the token is
+        cached, so a revoked token would only fail later, e.g. when deleting
+        servers. Returns False when the token was rejected.
+        """
+        try:
+            await self.nova.limits.show()
+        except AuthError:
+            return False
+        return True
+
+    def _load_cached_auth(self):
+        """Reuse token and service catalog from disk cache.
+
+        The token is reused only when it stays valid long enough for mrack run.
+        Returns API URLs of the clients or empty dict when nothing is reused.
+        """
+        auth = self._get_cached("auth", AUTH_CACHE_TTL)
+        if not auth or auth["expires_at"] - time.time() < TOKEN_REUSE_MARGIN:
+            return {}
+
+        logger.debug(f"{self.dsp_name} Reusing cached authentication token")
+        self.session.token = auth["token"]
+        self.session.token_expires_at = auth["expires_at"]
+        self.session.endpoints = auth["catalog"]
+        return auth["api_urls"]
+
+    def _save_cached_auth(self):
+        """Store token, service catalog and API URLs of the clients in disk cache."""
+        self._set_cached(
+            "auth",
+            {
+                "token": self.session.token,
+                "expires_at": self.session.token_expires_at,
+                "catalog": self.session.endpoints,
+                "api_urls": {
+                    "nova": self.nova.api_url,
+                    "glance": self.glance.api_url,
+                    "neutron": self.neutron.api_url,
+                },
+            },
+        )
+
+    async def _read_public_key(self):
+        """Read content of the public key file."""
+        async with aiofiles.open(self.pubkey, mode="r") as public_key_file:
+            return await public_key_file.read()
+
     async def _import_public_key(self):
-        """Import public key to OpenStack if it does not exist."""
+        """Import public key to OpenStack if it does not exist.
+
+        Keypair known from the disk cache with the same public key is not checked.
+        """
+        keypair_state = None
+        if self.cache:
+            public_key = await self._read_public_key()
+            keypair_state = {
+                "name": self.keypair,
+                "key_digest": hashlib.sha256(public_key.encode()).hexdigest(),
+            }
+            if self._get_cached("keypair", KEYPAIR_CACHE_TTL) == keypair_state:
+                logger.debug(f"Keypair {self.keypair} exists according to cache.")
+                return
+
         try:
             await self.nova.keypairs.show(self.keypair)
             logger.debug(f"Keypair {self.keypair} already exists.")
         except NotFoundError:
-            async with aiofiles.open(self.pubkey, mode="r") as public_key_file:
-                public_key = await public_key_file.read()
-
+            public_key = await self._read_public_key()
             keypair_obj = {"name": self.keypair, "public_key": public_key}
             resp = await self.nova.keypairs.create(keypair=keypair_obj)
             resp_obj = resp["keypair"]
@@ -222,6 +442,22 @@ class OpenStackProvider(Provider):
                 + f"{resp_obj.get('fingerprint')}"
             )
 
+        if keypair_state:
+            self._set_cached("keypair", keypair_state)
+
+    def _create_transport(self):
+        """Create HTTP transport configured in mrack config."""
+        config = global_context.CONFIG
+        options = config.http_transport if config else {}
+        return HTTPTransport(self.dsp_name, **options)
+
+    async def close(self):
+        """Wait for batches of servers being created, close HTTP transport."""
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self.transport:
+            await self.transport.close()
+
     async def init(
         self,
         image_names=None,
@@ -231,6 +467,9 @@ class OpenStackProvider(Provider):
         cloud_profile="",
         keypair="",
         pubkey="",
+        lazy_load=False,
+        bulk_create=False,
+        profile=INIT_FULL,
     ):
         """Initialize provider with data from OpenStack.
 
@@ -239,7 +478,16 @@ class OpenStackProvider(Provider):
         * networks
         * network availabilities (number of available IPs for networks)
         * images which were defined in `images` option
-        * account limits (max and current usage of vCPUs, memory, ...)
+        * account limits (max and current usage of vCPUs, memory, instances, ports)
+
+        With `lazy_load` only images and limits are loaded, flavors, networks
+        and network availabilities are loaded when requirements reference them.
+
+        With other `profile` than INIT_FULL (e.g. for deletion of known hosts)
+        the provider only authenticates, keypair and objects are not loaded.
+
+        With `bulk_create` servers with identical requirements are created
+        using single request, see `create_server`.
         """
         logger.info(f"{self.dsp_name} Initializing provider")
         self.strategy = strategy
@@ -247,48 +495,56 @@ class OpenStackProvider(Provider):
         self.cloud_profile = cloud_profile
         self.keypair = keypair
         self.pubkey = pubkey
+        self.lazy_load = lazy_load
+        self.bulk_create = bulk_create
 
         # Session expects that credentials will be set via env variables
         # or clouds.yaml file. For the latter, cloud profile should be specified
         # in provisioning-config openstack.profile key or in envvar OS_CLOUD.
         self.session = await self._create_session()
-
-        self.nova = ExtraNovaClient(session=self.session)
-        self.glance = GlanceClient(session=self.session)
-        self.neutron = NeutronClient(session=self.session)
-
-        login_start = datetime.now()
-        try:
-            await asyncio.gather(
-                self.nova.init_api(self.api_timeout),
-                self.glance.init_api(self.api_timeout),
-                self.neutron.init_api(self.api_timeout),
-            )
-        except KeyError as e:
-            err_msg = "Authentication to Openstack with provided credentials failed"
-            raise NotAuthenticatedError(err_msg) from e
-        except ContentTypeError as e:
-            err_msg = (
-                "Authentication to Openstack with provided credentials failed"
-                + "\nTIP: Make sure the parameter 'auth_url' from your credentials"
-                + " ends with '/v3'"
-            )
-            raise NotAuthenticatedError(err_msg) from e
-        login_end = datetime.now()
-        logger.info(f"{self.dsp_name} Login duration {login_end - login_start}")
+        self.cache = self._init_cache()
+        self.bakes = self._init_bakes()
+        api_urls = self._load_cached_auth()
+
+        # all clients share pool of keep-alive connections
+        self.transport = self._create_transport()
+        self._create_clients(api_urls)
+        await self._login()
+
+        if api_urls and not await self._check_cached_auth():
+            # cached token was revoked, login again and replace it
+            logger.info(f"{self.dsp_name} Cached token was rejected, logging in")
+            self._invalidate_cached("auth")
+            self.session.token = None
+            api_urls = {}
+            self._create_clients(api_urls)
+            await self._login()
+
+        if not api_urls:
+            self._save_cached_auth()
+        if profile != INIT_FULL:
+            logger.info(f"{self.dsp_name} Skipping environment objects load")
+            return
 
         await self._import_public_key()
 
         self.network_pools = networks
         object_start = datetime.now()
 
-        _, _, self.limits, _, _ = await self._openstack_gather_responses(
-            [self._load_flavors, [], {}],
-            [self._load_images, [image_names], {}],
-            [self.nova.limits.show, [], {}],
-            [self._load_networks, [], {}],
-            [self._load_ip_availabilities, [], {}],
-        )
+        if self.lazy_load:
+            _, quota = await self._openstack_gather_responses(
+                [self._load_images_cached, [image_names], {}],
+                [self.fetch_quota, [], {}],
+            )
+        else:
+            _, _, quota, _, _ = await self._openstack_gather_responses(
+                [self._load_flavors, [], {}],
+                [self._load_images_cached, [image_names], {}],
+                [self.fetch_quota, [], {}],
+                [self._load_networks, [], {}],
+                [self._load_ip_availabilities, [], {}],
+            )
+        self.quota.update(quota)
 
         object_duration = datetime.now() - object_start
         logger.info(
@@ -297,12 +553,14 @@ class OpenStackProvider(Provider):
 
     def _set_flavors(self, flavors):
         """Extend provider configuration with list of flavors."""
+        self._resolved.clear()
         for flavor in flavors:
             self.flavors[flavor["name"]] = flavor
             self.flavors_by_ref[flavor["id"]] = flavor
 
     def _set_images(self, images):
         """Extend provider configuration with list of images."""
+        self._resolved.clear()
         for image in images:
             self.images[image["name"]] = image
             self.images_by_ref[image["id"]] = image
@@ -335,83 +593,16 @@ class OpenStackProvider(Provider):
 
         return network_types
 
-    def _pick_network(self, host_name, host_weight, nets_weights):
-        """
-        Pick network based network type and weight of host.
-
-        This method allows OpenStack to pick Network from
-        all of networks based on network load and requirement
-        got from the metadata. Each of required host gets
-        its own position, aka weigh in interval <0, 1>
-        based on the order (index) in metadata. Before that
-        all of the networks are 'normalized' with _get_weights_from_usable
-
-        An example:
-        - considering 5 host request
-        - picked 5 networks where availability is > 5%
-
-        Host weights:
-        - host 1 - 0/5 = 0
-        - host 2 - 1/5 = 0.2
-        - host 3 - 2/5 = 0.4
-        - host 4 - 3/5 = 0.6
-        - host 5 - 4/5 = 0.8
-
-        Network availability:
-        - net 1 - 20 addresses
-        - net 2 - 100 addresses
-        - net 3 - 130 addresses
-        - net 4 - 145 addresses
-        - net 5 - 105 addresses
-
-        Full capacity of these 5 nets: 500
-
-        Normalized network range:
-        net 4 - <0, 0.29)
-        net 3 - <0,29, 0.55)
-        net 5 - <0.55, 0.76)
-        net 2 - <0.76, 0.96)
-        net 1 - <0.96, 1)
-
-        Which will divide networks for hosts:
-        host 1 => net 4 (0 falls into net 4 interval)
-        host 2 => net 4 (0.2 falls into net 4 interval)
-        host 3 => net 3 (0.4 falls into net 3 interval)
-        host 4 => net 5 (0.6 falls into net 5 interval)
-        host 5 => net 2 (0.8 falls into net 2 interval)
-
-        net 1 will be unused as bigger networks are preferred this way.
-        """
-        chosen = tuple()
-        for index, net in enumerate(nets_weights):
-            if host_weight < net[NETWORK_SIZE]:
-                chosen = net
-                # print details only if there is more one network to be picked from
-                if len(nets_weights) > 1:
-                    lower_bound = nets_weights[index - 1][NETWORK_SIZE] if index else 0
-                    logger.debug(
-                        f"{self.dsp_name} [{host_name}] Weight of host "
-                        f"{host_weight:.3f} fell into interval: "
-                        f"({lower_bound:.3f}, {chosen[NETWORK_SIZE]:.3f}>"
-                    )
-
-                break
-
-        if not chosen:
-            raise ProviderError(f"{self.dsp_name} Error: No network has been chosen")
-
-        logger.debug(
-            f"{self.dsp_name} [{host_name}] Picked network '{chosen[NETWORK_NAME]}'"
-        )
-
-        return chosen[NETWORK_NAME]
-
-    def _get_usable_networks(self, network_type, requested_ip_cnt):
+    def _get_usable_networks(self, network_type, requested_ip_cnt, planned=None):
         """
         Return list of available networks and ip availability.
 
-        Available networks with most IPs available is picked.
+        Available networks with most IPs available is picked. Optional
+        `planned` dictionary maps network names to number of IPs already
+        planned for other hosts, these IPs are not considered available.
         """
+        if planned is None:
+            planned = {}
         usable = set()
         low_avail_nets = set()
         total_available = 0
@@ -428,8 +619,9 @@ class OpenStackProvider(Provider):
             )
         ):
             ips = self._get_ips(ref=network.get("id"))
+            used_ips = ips["used_ips"] + planned.get(network["name"], 0)
 
-            available = ips["total_ips"] - ips["used_ips"]
+            available = ips["total_ips"] - used_ips
             max_size_net = available if available > max_size_net else max_size_net
 
             logger.debug(
@@ -437,7 +629,7 @@ class OpenStackProvider(Provider):
                 f"{' - unusable (0 IPs left) skipping' if not available else ''}"
             )
             logger.debug(f"  total: {ips['total_ips']}")
-            logger.debug(f"  used: {ips['used_ips']}")
+            logger.debug(f"  used: {used_ips}")
             logger.debug(f"  available: {available}")
 
             if not available:
@@ -446,7 +638,7 @@ class OpenStackProvider(Provider):
             total_available += available
 
             #  assume network is unusable when usable_threshold is reached
-            if ips["used_ips"] / ips["total_ips"] > threshold / 100:
+            if used_ips / ips["total_ips"] > threshold / 100:
                 low_avail_nets.add((network["name"], available))
                 continue
 
@@ -500,51 +692,74 @@ class OpenStackProvider(Provider):
             else:
                 network_subset_size = 1
 
-        if network_subset_size:
-            return sorted(
-                set(sample(sorted(usable), network_subset_size)),
-                key=lambda u: u[NETWORK_SIZE],
-                reverse=True,
+        if not network_subset_size:
+            raise ValidationError(
+                f"Can not satisfy request for {requested_ip_cnt} hosts "
+                f"({network_type}) Change the 'network-spread' in mrack.conf "
+                "or try provisioning again later",
+                self.dsp_name,
             )
-        # If the above return does not happened because there is 0 usable networks
-        # we will raise a ValidationError
-        raise ValidationError(
-            f"Can not satisfy request for {requested_ip_cnt} hosts ({network_type}) "
-            "Change the 'network-spread' in mrack.conf or try provisioning again later",
-            self.dsp_name,
-        )
 
-    def _get_weights_from_usable(self, usable_networks):
-        """
-        Define map of network type and weight of usable_networks.
+        if network_subset_size == 1:
+            # pick from networks which can hold all hosts if there are some
+            fitting = [net for net in usable if net[NETWORK_SIZE] >= requested_ip_cnt]
+            subset = set(sample(sorted(fitting or usable), 1))
+        else:
+            subset = set(sample(sorted(usable), network_subset_size))
 
-        All of the networks are 'normalized' in a way that the random
-        selection from subset of networks (networks_weights parameter)
-        (or all of network if number of hosts >= number of networks)
-        is divided to effective range (multiple intervals in <0, 1>)
-        for the network based on the relative network weight
-        compared to full capacity of considered networks.
+        if spread_option != "no":
+            # add the biggest of other networks till all hosts fit
+            for net in sorted(usable - subset, key=lambda u: -u[NETWORK_SIZE]):
+                if sum(n[NETWORK_SIZE] for n in subset) >= requested_ip_cnt:
+                    break
+                subset.add(net)
 
-        e.g.:
-        - usable_networks = [('net_1', 11), ('net_3', 10)]
-        - weights = [('net_1', 0.5238095238095238), ('net_3', 1.0)]
+        return sorted(subset, key=lambda u: u[NETWORK_SIZE], reverse=True)
 
+    def _plan_networks(self, network_type, requested_ip_cnt, usable_networks):
         """
-        total_weight = sum(net[NETWORK_SIZE] for net in usable_networks)
-        weights = [
-            (net[NETWORK_NAME], net[NETWORK_SIZE] / total_weight)
-            for net in usable_networks
-        ]
-        if len(weights) == 1:
-            return weights
+        Split hosts of network type between usable networks.
 
-        for w_index in range(1, len(weights)):
-            weights[w_index] = (
-                weights[w_index][NETWORK_NAME],
-                weights[w_index - 1][NETWORK_SIZE] + weights[w_index][NETWORK_SIZE],
+        Each network gets number of hosts proportional to its available IPs,
+        bigger networks are filled first. Hosts are split using integer
+        arithmetic so no network gets more hosts than it has available IPs.
+
+        An example:
+        - considering 5 host request
+        - usable networks: net 4 - 145, net 3 - 130, net 5 - 105, net 2 - 100
+          and net 1 - 20 available IPs (500 in total)
+
+        Hosts with position k (0 to 4) for which k / 5 is lower than the
+        cumulative share of network and networks before it get the network:
+        net 4 - 2 hosts (cumulative share 0.29)
+        net 3 - 1 host (0.55)
+        net 5 - 1 host (0.76)
+        net 2 - 1 host (0.96)
+        net 1 - 0 hosts (1)
+
+        Returns list of tuples (network name, number of hosts).
+        """
+        total_available = sum(net[NETWORK_SIZE] for net in usable_networks)
+        if requested_ip_cnt > total_available:
+            raise ValidationError(
+                f"Can not satisfy request for {requested_ip_cnt} hosts "
+                f"({network_type}), only {total_available} IP(s) available "
+                "in considered networks",
+                self.dsp_name,
             )
 
-        return weights
+        plan = []
+        planned = 0
+        cumulative = 0
+        for name, available in usable_networks:
+            cumulative += available
+            # number of positions k for which k / count < cumulative / total
+            up_to = -(-requested_ip_cnt * cumulative // total_available)
+            if up_to > planned:
+                plan.append((name, up_to - planned))
+            planned = up_to
+
+        return plan
 
     def _translate_network_types(self, hosts):
         """Pick the right OpenStack networks for all hosts.
@@ -552,29 +767,30 @@ class OpenStackProvider(Provider):
         Pick the network based on network type, networks configured for the
         type and the available IP addresses. Process all hosts to
         be able to pick the network which have enough addresses for all hosts.
+        IP addresses planned for one network type are not available to other
+        network types sharing the same networks.
 
         All hosts will have either "networks" attribute or "network"
         host attribute set with OpenStack network name or ID.
         """
         nt_requirements = self._aggregate_networks(hosts)
-        nt_map = {}
+        planned = {}
+        assignments = {}
         for network_type, count in nt_requirements.items():
             # count is crucial
-            nt_map[network_type] = self._get_usable_networks(network_type, count)
+            usable_networks = self._get_usable_networks(network_type, count, planned)
+            plan = self._plan_networks(network_type, count, usable_networks)
 
-        weight_map = {}
-        for network_type, usable_networks in nt_map.items():
-            weight_map[network_type] = self._get_weights_from_usable(
-                usable_networks,
+            logger.info(
+                f"{self.dsp_name} Network plan for {count} host(s) with "
+                f"{network_type}: "
+                + ", ".join(f"{name} ({hosts_cnt})" for name, hosts_cnt in plan)
             )
-
-        for net_type, netw_weights in weight_map.items():
-            logger.debug(
-                f"{self.dsp_name} Considered networks "
-                f"for {net_type} (network_name, weight_interval):"
+            for name, hosts_cnt in plan:
+                planned[name] = planned.get(name, 0) + hosts_cnt
+            assignments[network_type] = chain.from_iterable(
+                repeat(name, hosts_cnt) for name, hosts_cnt in plan
             )
-            for net in netw_weights:
-                logger.debug(f"  {net}")
 
         for host in hosts:
             # skip hosts which have low-level network names defined
@@ -588,16 +804,14 @@ class OpenStackProvider(Provider):
             if not self.network_pools.get(network_type):
                 continue
 
-            networks_weights = weight_map[network_type]
-
-            host["network"] = self._pick_network(
-                host_name=host["name"],
-                host_weight=hosts.index(host) / len(hosts),
-                nets_weights=networks_weights,
+            host["network"] = next(assignments[network_type])
+            logger.debug(
+                f"{self.dsp_name} [{host['name']}] Picked network '{host['network']}'"
             )
 
     def _set_networks(self, networks):
         """Extend provider configuration with list of networks."""
+        self._resolved.clear()
         for network in networks:
             self.networks[network["name"]] = network
             self.networks_by_ref[network["id"]] = network
@@ -639,11 +853,47 @@ class OpenStackProvider(Provider):
 
     async def _load_flavors(self):
         """Extend provider configuration by loading all flavors from OpenStack."""
-        resp = await self.nova.flavors.list()
-        flavors = resp["flavors"]
+        flavors = self._get_cached("flavors", FLAVORS_CACHE_TTL)
+        if flavors is None:
+            resp = await self.nova.flavors.list()
+            flavors = resp["flavors"]
+            self._set_cached("flavors", flavors)
         self._set_flavors(flavors)
         return flavors
 
+    async def _load_images_cached(self, image_names=None):
+        """
+        Extend provider configuration by loading information about images.
+
+        Images found in the disk cache are not loaded from OpenStack again,
+        all images are loaded (without caching) if image_names is not specified.
+        Images of each name are cached under their own key so they expire
+        independently of images loaded later.
+        """
+        if not image_names or not self.cache:
+            return await self._load_images(image_names)
+
+        cached = []
+        missing = []
+        for name in image_names:
+            images = self._get_cached(f"image:{name}", IMAGES_CACHE_TTL)
+            if images:
+                cached += images
+            else:
+                missing.append(name)
+        self._set_images(cached)
+        if not missing:
+            return cached
+
+        images = await self._load_images(missing)
+        for name in missing:
+            named = [image for image in images if image["name"] == name]
+            if named:  # do not remember that image does not exist
+                self._set_cached(f"image:{name}", named)
+        loaded = {image["id"] for image in images}
+        images += [image for image in cached if image["id"] not in loaded]
+        return images
+
     async def _load_images(self, image_names=None):
         """
         Extend provider configuration by loading information about images.
@@ -678,20 +928,125 @@ class OpenStackProvider(Provider):
 
         return images
 
+    async def _load_baked_images(self, reqs):
+        """Load images baked for configuration of the hosts, see bake_host."""
+        refs = set()
+        for req in reqs:
+            image = self.images.get(req["image"])
+            ref = self._get_baked_image_ref(req, image) if image else None
+            if ref and ref not in self.images_by_ref:
+                refs.add(ref)
+        if not refs:
+            return
+
+        images = await asyncio.gather(*[self._load_baked_image(ref) for ref in refs])
+        self._set_images([image for image in images if image])
+
+    async def _load_baked_image(self, ref):
+        """Load baked image by UUID, None if it does not exist anymore."""
+        try:
+            return await self.glance.images.retrieve(ref)
+        except NotFoundError:
+            logger.debug(f"{self.dsp_name} Baked image {ref} not found")
+            return None
+
     async def _load_networks(self):
         """Extend provider configuration by loading all networks from OpenStack."""
-        resp = await self.neutron.network.list()
-        networks = resp["networks"]
+        networks = self._get_cached("networks", NETWORKS_CACHE_TTL)
+        if networks is None:
+            resp = await self.neutron.network.list()
+            networks = resp["networks"]
+            self._set_cached("networks", networks)
         self._set_networks(networks)
         return networks
 
+    async def _load_all_flavors_once(self):
+        """Load all flavors, only once even when called concurrently."""
+        if self._flavors_loading is None:
+            self._flavors_loading = asyncio.ensure_future(self._load_flavors())
+        try:
+            return await self._flavors_loading
+        except Exception:
+            # let the next lookup try it again
+            self._flavors_loading = None
+            raise
+
+    async def _lookup_flavor(self, ref):
+        """Load flavor by UUID, fall back to loading all flavors.
+
+        Flavors can not be filtered by name so all of them are loaded once
+        when flavor is not found by UUID.
+        """
+        try:
+            resp = await self.nova.flavors.show(ref)
+            self._set_flavors([resp["flavor"]])
+        except NotFoundError:
+            await self._load_all_flavors_once()
+
+    async def _lookup_network(self, ref, availability=False):
+        """Load network by name or UUID and optionally its IP availability."""
+        try:
+            UUID(ref)
+            resp = await self.neutron.network.list(id=ref)
+        except ValueError:
+            resp = await self.neutron.network.list(name=ref)
+        networks = resp["networks"]
+        self._set_networks(networks)
+
+        if availability:
+            for network in networks:
+                resp = await self.neutron.ip.list(network_id=network["id"])
+                self._set_ip_availabilities(resp["network_ip_availabilities"])
+
+    async def _load_referenced_objects(self, reqs):
+        """Load flavors, networks and IP availabilities referenced by requirements.
+
+        Objects which were already loaded are not loaded again, independent
+        lookups are done concurrently.
+        """
+        flavor_refs = set()
+        network_refs = set()
+        pool_refs = set()
+        for req in reqs:
+            flavor_refs.update(
+                ref for ref in (req.get("flavor"), req.get("flavorRef")) if ref
+            )
+            network = req.get("network")
+            if network and self.network_pools.get(network):
+                pool_refs.update(self.network_pools[network])
+            elif network:
+                network_refs.add(network)
+            network_specs = req.get("networks")
+            if isinstance(network_specs, list):
+                network_refs.update(
+                    spec.get("uuid") for spec in network_specs if spec.get("uuid")
+                )
+
+        calls = [
+            [self._lookup_flavor, [ref], {}]
+            for ref in flavor_refs
+            if ref not in self.flavors and ref not in self.flavors_by_ref
+        ]
+        calls += [
+            [self._lookup_network, [ref], {"availability": ref in pool_refs}]
+            for ref in network_refs | pool_refs
+            if ref not in self.networks and ref not in self.networks_by_ref
+        ]
+        if calls:
+            logger.debug(f"{self.dsp_name} Loading {len(calls)} referenced object(s)")
+            await self._openstack_gather_responses(*calls)
+
+    def _set_ip_availabilities(self, availabilities):
+        """Extend provider configuration with list of network availabilities."""
+        for availability in availabilities:
+            self.ips[availability["network_name"]] = availability
+            self.ips_by_ref[availability["network_id"]] = availability
+
     async def _load_ip_availabilities(self):
         """Extend provider configuration by loading networks availabilities."""
         resp = await self.neutron.ip.list()
         availabilities = resp["network_ip_availabilities"]
-        for availability in availabilities:
-            self.ips[availability["network_name"]] = availability
-            self.ips_by_ref[availability["network_id"]] = availability
+        self._set_ip_availabilities(availabilities)
         return availabilities
 
     def _translate_flavor(self, req):
@@ -721,13 +1076,30 @@ class OpenStackProvider(Provider):
             raise ValidationError(f"Image not found {specs}", self.dsp_name)
         return image
 
+    def _get_baked_image_ref(self, req, image):
+        """Get UUID of image baked from the image for host configuration or None."""
+        if not req.get("bake") or not self.bakes:
+            return None
+        return self.bakes.get(image["id"], req["bake"])
+
+    def _translate_baked_image(self, req, image):
+        """Get image baked for host configuration or the base image."""
+        baked = self._get_image(ref=self._get_baked_image_ref(req, image))
+        if not baked or baked.get("status") != "active":
+            return image
+        logger.info(
+            f"{self.dsp_name} Using image {baked['name']} baked from {image['name']}"
+        )
+        return baked
+
     def _translate_networks(self, req, spec=False):
         network_req = req.get("network")
         network_specs = req.get("networks", [])
-        network_specs = deepcopy(network_specs)
         networks = []
         if not isinstance(network_specs, list):
             network_specs = []
+        # own copies, specs are extended and must not modify the requirement
+        network_specs = [dict(network_spec) for network_spec in network_specs]
         for network_spec in network_specs:
             uuid = network_spec.get("uuid")
             network = self._get_network(ref=uuid)
@@ -750,20 +1122,47 @@ class OpenStackProvider(Provider):
             return network_specs
         return networks
 
+    def _resolve_req(self, req):
+        """Get OpenStack objects required by host requirement.
+
+        Requirements with the same flavor, image and networks share single
+        ResolvedSpec which is translated only once, so validation and creation
+        of many similar hosts does not translate the same objects again.
+        """
+        signature = (
+            req.get("flavor"),
+            req.get("flavorRef"),
+            req.get("image"),
+            req.get("imageRef"),
+            req.get("bake"),
+            req.get("network"),
+            repr(req.get("networks")),
+        )
+        resolved = self._resolved.get(signature)
+        if resolved is None:
+            base_image = self._translate_image(req)
+            resolved = ResolvedSpec(
+                flavor=self._translate_flavor(req),
+                image=self._translate_baked_image(req, base_image),
+                base_image=base_image,
+                networks=tuple(self._translate_networks(req)),
+                specs=tuple(self._translate_networks(req, spec=True)),
+            )
+            self._resolved[signature] = resolved
+        return resolved
+
     def validate_host(self, req):
         """Validate that host requirements contains existing required objects."""
-        self._translate_flavor(req)
-        self._translate_image(req)
-        self._translate_networks(req)
+        self._resolve_req(req)
 
         return True
 
     def _set_poll_sleep_times(self, reqs):
         """
-        Compute polling sleep times based on number of hosts.
+        Compute initial polling sleep time based on number of hosts.
 
-        So that we don't create unnecessary load on server while still checking returns
-        (initial_sleep, sleep)
+        Polling itself is done in batches for all hosts so its load on server
+        does not depend on number of hosts.
         """
         count = len(reqs)
 
@@ -771,16 +1170,16 @@ class OpenStackProvider(Provider):
         # time when more than half of host is in ACTIVE state
         self.poll_init_adj = 0.65 * count
 
-        # poll time should ask often enough, to not create unnecessary delays
-        # while not that many to not load the server much
-        self.poll_adj = 0.22 * count
-
     async def prepare_provisioning(self, reqs):
         """
         Prepare provisioning.
 
         Load missing images if they are not in provisioning-config.yaml
+        and with lazy loading also flavors and networks used by the hosts.
         """
+        if self.lazy_load:
+            await self._load_referenced_objects(reqs)
+
         prepare_images = list(
             {req["image"] for req in reqs if req["image"] not in self.images}
         )
@@ -788,9 +1187,10 @@ class OpenStackProvider(Provider):
         if prepare_images:
             im_list = ", ".join(prepare_images)
             logger.debug(f"{self.dsp_name} Loading image info for: '{im_list}'")
-            await self._load_images(list(prepare_images))
+            await self._load_images_cached(list(prepare_images))
             logger.debug(f"{self.dsp_name} Loading images info done.")
 
+        await self._load_baked_images(reqs)
         self._set_poll_sleep_times(reqs)
         return True
 
@@ -800,12 +1200,30 @@ class OpenStackProvider(Provider):
         self._translate_network_types(reqs)
 
         for req in reqs:
-            logger.info(f"{self.dsp_name} Validating host: {object2json(req)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"{self.dsp_name} Validating host: {object2json(req)}")
             self.validate_host(req)
-            logger.info(f"{self.dsp_name} [{req['name']}] OK")
+        logger.info(f"{self.dsp_name} Validated {len(reqs)} host(s)")
+
+    def _count_ports(self, req):
+        """Get number of ports (one per network) required by host requirement."""
+        networks = req.get("networks")
+        count = len(networks) if isinstance(networks, list) else 0
+        if req.get("network"):
+            count += 1
+        return count
+
+    def _host_usage(self, req, flavor):
+        """Get quota usage of host requirement with given flavor."""
+        return {
+            "vcpus": flavor.get("vcpus", 0),
+            "ram": flavor.get("ram", 0),
+            "instances": 1,
+            "ports": self._count_ports(req),
+        }
 
     def get_host_requirements(self, req):
-        """Get vCPU and memory requirements for host requirement."""
+        """Get vCPU, memory, instance and port requirements for host requirement."""
         flavor_spec = req.get("flavor")
         flavor_ref = req.get("flavorRef")
         flavor = None
@@ -814,71 +1232,105 @@ class OpenStackProvider(Provider):
         if flavor_spec:
             flavor = self._get_flavor(flavor_spec, flavor_spec)
 
-        try:
-            res = {"ram": flavor["ram"], "vcpus": flavor["vcpus"]}
-        except TypeError as flavor_none:
+        if not flavor:
             # func does not load flavor so None is used as result
             raise ValidationError(
                 f"Could not load the flavor for requirement: {req}", self.dsp_name
-            ) from flavor_none
+            )
 
-        return res
+        return self._host_usage(req, flavor)
+
+    def _limits_to_quota(self, limits):
+        """Transform nova limits to quota usage and limits of vCPUs, memory, ..."""
+        limits = limits["limits"]["absolute"]
+        quota = {
+            "vcpus": {
+                "used": limits["totalCoresUsed"],
+                "limit": limits["maxTotalCores"],
+            },
+            "ram": {"used": limits["totalRAMUsed"], "limit": limits["maxTotalRAMSize"]},
+        }
+        if "maxTotalInstances" in limits:
+            quota["instances"] = {
+                "used": limits.get("totalInstancesUsed", 0),
+                "limit": limits["maxTotalInstances"],
+            }
+        return quota
 
-    async def _load_limits(self):
-        limits_await = await self._openstack_gather_responses(
-            [self.nova.limits.show, [], {}],
-        )
-        self.limits = limits_await[0]  # gather returns list
+    async def _fetch_port_quota(self):
+        """Fetch usage and limit of neutron ports of the project.
 
-        limits = self.limits["limits"]["absolute"]
-        used_vcpus = limits["totalCoresUsed"]
-        used_memory = limits["totalRAMUsed"]
-        limit_vcpus = limits["maxTotalCores"]
-        limit_memory = limits["maxTotalRAMSize"]
+        Returns empty dictionary when the quota is not available.
+        """
+        try:
+            if not self._project_id:
+                resp = await self.neutron.quota.tenant()
+                self._project_id = resp["tenant"]["tenant_id"]
+            resp = await self.neutron.quota.details(self._project_id)
+            port = resp["quota"]["port"]
+        except (ClientError, KeyError) as err:
+            logger.debug(f"{self.dsp_name} Unable to load port quota: {err}")
+            return {}
+
+        return {
+            "ports": {
+                "used": port["used"] + port.get("reserved", 0),
+                "limit": port["limit"],
+            }
+        }
 
-        return used_vcpus, used_memory, limit_vcpus, limit_memory
+    async def fetch_quota(self):
+        """Fetch nova limits and neutron port quota concurrently."""
+        self.limits, port_quota = await self._openstack_gather_responses(
+            [self.nova.limits.show, [], {}],
+            [self._fetch_port_quota, [], {}],
+        )
+        quota = self._limits_to_quota(self.limits)
+        quota.update(port_quota)
+        return quota
 
     async def can_provision(self, hosts):  # pylint: disable=arguments-differ
         """Check that all host can be provisioned.
 
-        Checks:
-        * available vCPUs and memory based on account limits
-        * that all host contain available flavors, images, networks
+        Checks available vCPUs, memory, instances and ports based on account
+        limits (cached). Resources with negative limit are unlimited.
         """
-        vcpus = 0
-        ram = 0
-
+        required = {}
         for req in hosts:
-            needs = self.get_host_requirements(req)
-            vcpus += needs["vcpus"]
-            ram += needs["ram"]
+            for resource, amount in self.get_host_requirements(req).items():
+                required[resource] = required.get(resource, 0) + amount
 
         # poll the actual openstack load
-        logger.debug(f"{self.dsp_name} Loading nova limits")
-
-        used_vcpus, used_memory, limit_vcpus, limit_memory = await self._load_limits()
-
-        req_vcpus = used_vcpus + vcpus
-        req_memory = used_memory + ram
+        logger.debug(f"{self.dsp_name} Loading quota")
+        quota = await self.quota.get()
 
-        logger.info(
-            f"{self.dsp_name} Required vcpus: {vcpus}, "
-            f"used: {used_vcpus}, max: {limit_vcpus}"
-        )
+        fits = True
+        for resource, amount in required.items():
+            if resource not in quota:
+                continue
 
-        logger.info(
-            f"{self.dsp_name} Required ram: {ram}, "
-            f"used: {used_memory}, max: {limit_memory}"
-        )
+            used = quota[resource]["used"]
+            limit = quota[resource]["limit"]
+            logger.info(
+                f"{self.dsp_name} Required {resource}: {amount}, "
+                f"used: {used}, max: {limit}"
+            )
+            if 0 <= limit < used + amount:
+                fits = False
 
-        return req_vcpus <= limit_vcpus and req_memory <= limit_memory
+        return fits
 
     async def utilization(self):
-        """Check utilization of provider."""
-        used_vcpus, used_memory, limit_vcpus, limit_memory = await self._load_limits()
-        cpu_util = used_vcpus / limit_vcpus * 100
-        memory_util = used_memory / limit_memory * 100
-        return cpu_util if memory_util <= cpu_util else memory_util
+        """Check utilization of provider, the highest of all its limited resources."""
+        quota = await self.quota.get()
+        return max(
+            (
+                values["used"] / values["limit"] * 100
+                for values in quota.values()
+                if values["limit"] > 0
+            ),
+            default=0,
+        )
 
     async def create_server(self, req):
         """Issue creation of a server.
@@ -891,11 +1343,15 @@ class OpenStackProvider(Provider):
         * 'flavor': uuid or name of flavor to use
         * 'network': uuid or name of network to use. Will be added to networks
                      list if present
+
+        With `bulk_create` enabled, servers with identical specification
+        (except the name) whose creation is issued within BULK_CREATE_WINDOW
+        are created using single request with `min_count` and `max_count`.
         """
         name = req.get("name")
         log_msg_start = f"{self.dsp_name} [{name}]"
         logger.info(f"{log_msg_start} Creating server")
-        specs = deepcopy(req)  # work with own copy, do not modify the input
+        specs = dict(req)  # work with own copy, do not modify the input
         del specs["os"]  # do not pass this to openstack
 
         if is_windows_host(req):
@@ -903,12 +1359,13 @@ class OpenStackProvider(Provider):
             # derived from openstack vm name.
             specs["name"] = get_shortname(name)
 
-        flavor = self._translate_flavor(req)
+        resolved = self._resolve_req(req)
+        flavor = resolved.flavor
         specs["flavorRef"] = flavor["id"]
         if specs.get("flavor"):
             del specs["flavor"]
 
-        image = self._translate_image(req)
+        image = resolved.image
         if image.get("meta_compose_id") and image.get("meta_compose_url"):
             logger.info(
                 f"{log_msg_start} Image meta_compose_id: {image['meta_compose_id']}"
@@ -920,18 +1377,36 @@ class OpenStackProvider(Provider):
         if specs.get("image"):
             del specs["image"]
 
-        network_specs = self._translate_networks(req, spec=True)
-        specs["networks"] = network_specs
+        specs["networks"] = [dict(network_spec) for network_spec in resolved.specs]
         if specs.get("network"):
             del specs["network"]
 
         if specs.get("group"):
             del specs["group"]
 
+        if specs.get("bake"):
+            # record what the server is baked from, see bake_host
+            del specs["bake"]
+            specs["metadata"] = dict(
+                req.get("metadata", {}),
+                mrack_bake=req["bake"],
+                mrack_base_image=resolved.base_image["id"],
+            )
+
+        if self.bulk_create:
+            server = await self._create_server_in_batch(specs, req, flavor)
+        else:
+            server = await self._request_server(specs, req, flavor)
+        return (server, req)
+
+    async def _request_server(self, specs, req, flavor):
+        """Request creation of single server, return the server from response."""
+        log_msg_start = f"{self.dsp_name} [{req.get('name')}]"
         error_attempts = 0
         while error_attempts < SERVER_ERROR_RETRY:
             try:
-                response = await self.nova.servers.create(server=specs)
+                async with self.limiter("create"):
+                    response = await self.nova.servers.create(server=specs)
             except ServerError as exc:
                 logger.debug(f"{log_msg_start} {exc}")
                 error_attempts += 1
@@ -943,6 +1418,12 @@ class OpenStackProvider(Provider):
                     f"{log_msg_start} Failed to create server: {exc}",
                     req,
                 )
+            except ClientError as exc:
+                self._invalidate_rejected(exc, req)
+                raise ProvisioningError(
+                    f"{log_msg_start} Failed to create server: {exc.message}",
+                    req,
+                ) from exc
 
             fault = response["server"].get("fault", {})
 
@@ -958,12 +1439,15 @@ class OpenStackProvider(Provider):
                 logger.info(
                     f"{log_msg_start} Retrying request in {SERVER_RES_SLEEP} minutes"
                 )
+                # do not hold the provisioning lock of other mrack runs meanwhile
+                self._mark_create_issued(req)
                 # We should wait for OpenStack for reasonable time to try to reprovision
                 # This sleep time should be longer for higher probability for Openstack
                 # having freed some resources for us even when we are not reaching quota
                 await asyncio.sleep(SERVER_RES_SLEEP * 60)  # * 60 - sleep for minutes
             else:
                 # provisioning seems to pass correctly break to return result
+                self.quota.reserve(self._host_usage(req, flavor))
                 break
 
         else:
@@ -973,7 +1457,174 @@ class OpenStackProvider(Provider):
                 req,  # add the requirement dictionary to traceback for later
             )
 
-        return (response.get("server"), req)
+        return response.get("server")
+
+    def _batch_key(self, specs):
+        """Get key of servers which can be created by single request."""
+        return object2json({key: val for key, val in specs.items() if key != "name"})
+
+    async def _create_server_in_batch(self, specs, req, flavor):
+        """Add server to batch of servers with identical specs and wait for it."""
+        key = self._batch_key(specs)
+        batch = self._create_batches.get(key)
+        if batch is None:
+            batch = []
+            self._create_batches[key] = batch
+            task = asyncio.ensure_future(self._create_batch(key))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+        future = asyncio.get_event_loop().create_future()
+        batch.append((specs, req, flavor, future))
+        return await future
+
+    async def _create_batch(self, key):
+        """Create batch of servers once the window for joining it closes.
+
+        Future of each server in the batch is resolved even when the creation
+        or deletion of servers nobody waits for anymore fails.
+        """
+        await asyncio.sleep(BULK_CREATE_WINDOW)
+        batch = self._create_batches.pop(key)
+        try:
+            await self._resolve_batch(batch)
+        finally:
+            for _specs, _req, _flavor, future in batch:
+                if not future.done():
+                    future.cancel()
+
+    async def _resolve_batch(self, batch):
+        """Create servers of the batch and set results of their futures."""
+        try:
+            if len(batch) == 1:
+                specs, req, flavor, _future = batch[0]
+                servers = [await self._request_server(specs, req, flavor)]
+            else:
+                servers = await self._request_servers(batch)
+        except Exception as exc:  # pylint: disable=broad-except
+            for _specs, req, _flavor, future in batch:
+                if future.done():
+                    continue
+                if isinstance(exc, ProvisioningError):
+                    # each host needs the error with its own requirement
+                    future.set_exception(ProvisioningError(exc.args[0], req))
+                else:
+                    future.set_exception(exc)
+            return
+
+        abandoned = []
+        for (_specs, req, _flavor, future), server in zip(batch, servers):
+            if future.done():
+                abandoned.append((req, server))
+                continue
+            future.set_result(server)
+
+        for req, server in abandoned:
+            # nobody waits for the server anymore, do not leave it behind
+            logger.info(f"{self.dsp_name} [{req['name']}] Creation cancelled")
+            try:
+                await self.delete_server(server["id"])
+            except ProviderError as exc:
+                logger.error(
+                    f"{self.dsp_name} [{req['name']}] Unable to delete server "
+                    f"{server['id']}: {exc}"
+                )
+
+    async def _request_servers(self, batch):
+        """Create batch of servers with identical specs using single request.
+
+        Servers are created with the name of the first one, found by the
+        reservation ID of the request and then renamed and mapped to the
+        requirements in the batch. Returns the servers in order of the batch.
+        """
+        count = len(batch)
+        names = ", ".join(req["name"] for _specs, req, _flavor, _future in batch)
+        log_msg_start = f"{self.dsp_name} [{names}]"
+        logger.info(f"{log_msg_start} Creating {count} servers with single request")
+
+        specs = deepcopy(batch[0][0])
+        specs.update({"min_count": count, "max_count": count})
+        specs["return_reservation_id"] = True
+
+        error_attempts = 0
+        while True:
+            try:
+                async with self.limiter("create"):
+                    response = await self.nova.servers.create(server=specs)
+                break
+            except ServerError as exc:
+                logger.debug(f"{log_msg_start} {exc}")
+                error_attempts += 1
+                if error_attempts > SERVER_ERROR_RETRY:
+                    raise ProvisioningError(
+                        f"{log_msg_start} Failed to create servers", batch[0][1]
+                    ) from exc
+                await asyncio.sleep(SERVER_ERROR_SLEEP)
+            except AuthError as exc:
+                raise ProvisioningError(
+                    f"{log_msg_start} Failed to create servers: {exc}", batch[0][1]
+                ) from exc
+            except ClientError as exc:
+                self._invalidate_rejected(exc, batch[0][1])
+                raise ProvisioningError(
+                    f"{log_msg_start} Failed to create servers: {exc.message}",
+                    batch[0][1],
+                ) from exc
+
+        reservation_id = response["reservation_id"]
+        for _specs, req, flavor, _future in batch:
+            self.quota.reserve(self._host_usage(req, flavor))
+            self._mark_create_issued(req)
+
+        # servers are created, their IDs are known only from the list
+        error_attempts = 0
+        while True:
+            try:
+                async with self.limiter("poll"):
+                    resp = await self.nova.servers.list(reservation_id=reservation_id)
+                break
+            except (ServerError, ClientError, ClientConnectionError) as exc:
+                logger.debug(f"{log_msg_start} {exc}")
+                error_attempts += 1
+                if error_attempts > SERVER_ERROR_RETRY:
+                    logger.error(
+                        f"{log_msg_start} Unable to list servers with reservation "
+                        f"ID {reservation_id}, they need to be deleted manually"
+                    )
+                    raise ProvisioningError(
+                        f"{log_msg_start} Failed to find created servers",
+                        batch[0][1],
+                    ) from exc
+                await asyncio.sleep(SERVER_ERROR_SLEEP)
+        servers = sorted(resp.get("servers", []), key=lambda srv: srv["name"])
+        if len(servers) != count:
+            for server in servers:
+                await self.delete_server(server["id"])
+            raise ProvisioningError(
+                f"{log_msg_start} Expected {count} servers with reservation ID "
+                f"{reservation_id}, found {len(servers)}",
+                batch[0][1],
+            )
+
+        await asyncio.gather(
+            *[
+                self._rename_server(server, item_specs["name"])
+                for server, (item_specs, _req, _flavor, _future) in zip(servers, batch)
+            ]
+        )
+        return servers
+
+    async def _rename_server(self, server, name):
+        """Rename server created by multi-create request to its host name."""
+        try:
+            async with self.limiter("create"):
+                await self.nova.servers.update(server["id"], server={"name": name})
+            server["name"] = name
+        except (ServerError, ClientError) as exc:
+            logger.warning(
+                f"{self.dsp_name} [{name}] Unable to rename server "
+                f"{server['name']} ({server['id']}): {exc}"
+            )
 
     async def delete_server(self, uuid):
         """Issue deletion of server.
@@ -983,7 +1634,10 @@ class OpenStackProvider(Provider):
         error_attempts = 0
         while True:
             try:
-                await self.nova.servers.force_delete(uuid)
+                async with self.limiter("delete"):
+                    await self.nova.servers.force_delete(uuid)
+                # freed resources are visible only in fresh limits
+                self.quota.invalidate()
             except ServerError as exc:
                 logger.debug(exc)
                 error_attempts += 1
@@ -997,16 +1651,58 @@ class OpenStackProvider(Provider):
                 )
                 break
 
-    async def wait_till_provisioned(self, resource):  # pylint: disable=too-many-locals
+    async def _fetch_servers(self, uuids):
+        """Get current state of servers using single list request.
+
+        Servers changed since the oldest watched server was created are
+        listed (including deleted ones). Servers missing in the list, e.g.
+        due to paging, are requested one by one.
+        """
+        since = self._poller.watched_since() - timedelta(minutes=POLL_SINCE_MARGIN)
+        async with self.limiter("poll"):
+            resp = await self.nova.servers.list(
+                **{"changes-since": since.strftime("%Y-%m-%dT%H:%M:%SZ")}
+            )
+
+        listed = {srv["id"]: srv for srv in resp.get("servers", [])}
+        servers = {uuid: listed[uuid] for uuid in uuids if uuid in listed}
+        for uuid in uuids:
+            if uuid in servers:
+                continue
+            try:
+                async with self.limiter("poll"):
+                    resp = await self.nova.servers.get(uuid)
+                servers[uuid] = resp["server"]
+            except NotFoundError as nf_err:
+                servers[uuid] = ServerNotFoundError(uuid)
+                servers[uuid].__cause__ = nf_err
+
+        return servers
+
+    def _get_poller(self):
+        """Get poller shared by all servers waiting to be provisioned."""
+        if self._poller is None:
+            self._poller = BatchPoller(
+                self.dsp_name,
+                self._fetch_servers,
+                lambda server: server["status"] in ["ACTIVE", "ERROR", "DELETED"],
+                interval=self.poll_sleep,
+                errors=(ServerError,),
+                max_errors=SERVER_ERROR_RETRY,
+            )
+        return self._poller
+
+    async def wait_till_provisioned(self, resource):
         """
         Wait till server is provisioned.
 
         Provisioned means that server is in ACTIVE or ERROR state
 
-        State is checked by polling. Polling can be controller via `poll_sleep` and
-        `poll_sleep_initial` options. This is useful when provisioning a lot of
-        machines as it is better to increase initial poll to not ask to often as
-        provisioning resources takes some time.
+        State of all servers is checked by polling with single request every
+        `poll_sleep` seconds. Initial wait can be controlled via `poll_sleep_initial`
+        option. This is useful when provisioning a lot of machines as it is better
+        to increase initial poll to not ask to often as provisioning resources
+        takes some time.
 
         Waits till timeout happens. Timeout can be either specified or default provider
         timeout is used.
@@ -1021,7 +1717,6 @@ class OpenStackProvider(Provider):
         poll_sleep_initial = (
             poll_sleep_initial / 2 + poll_sleep_initial * random() * 1.5
         )
-        poll_sleep = self.poll_sleep + self.poll_adj
 
         start = datetime.now()
         timeout_time = start + timedelta(minutes=self.timeout)
@@ -1032,29 +1727,20 @@ class OpenStackProvider(Provider):
         )
         await asyncio.sleep(poll_sleep_initial)
 
-        resp = {}
         logger.debug(f"{log_msg_start} ID {uuid}: Waiting for host creation")
-        error_attempts = 0
-        while datetime.now() < timeout_time:
-            try:
-                resp = await self.nova.servers.get(uuid)
-            except NotFoundError as nf_err:
-                raise ServerNotFoundError(uuid) from nf_err
-            except ServerError as err:
-                logger.debug(f"{log_msg_start} {err}")
-                error_attempts += 1
-                if error_attempts > SERVER_ERROR_RETRY:
-                    raise ProvisioningError(uuid) from err
-
-            server = resp["server"]
-            if server["status"] in ["ACTIVE", "ERROR"]:
-                break
-
-            poll_sleep += 0.5  # increase delays to check the longer it takes
-            logger.debug(
-                f"{log_msg_start} ID {uuid}: sleeping for {poll_sleep:.1f} seconds"
+        try:
+            server = await self._get_poller().wait(
+                uuid,
+                timeout=(timeout_time - datetime.now()).total_seconds(),
+                seen=lambda _state: self.timeline.mark(req.get("name"), "first status"),
             )
-            await asyncio.sleep(poll_sleep)
+        except ServerError as err:
+            logger.debug(f"{log_msg_start} {err}")
+            raise ProvisioningError(uuid) from err
+
+        if server is None:
+            # the server was not seen at all, use what we got from create request
+            server = dict(resource, status=resource.get("status", "BUILD"))
 
         done_time = datetime.now()
         prov_duration = (done_time - start).total_seconds()
@@ -1070,6 +1756,8 @@ class OpenStackProvider(Provider):
                 f"was provisioned in {prov_duration:.1f}s"
             )
 
+        if server.get("status") == "ACTIVE":
+            self.timeline.mark(req.get("name"), "active")
         server.update({"mrack_req": req})
 
         return server, req
@@ -1081,11 +1769,76 @@ class OpenStackProvider(Provider):
         await self.delete_server(host_id)
         return True
 
+    async def bake_host(self, host):
+        """Create image (snapshot) of configured host and record it as baked.
+
+        Host needs to be provisioned with `bake` attribute, later
+        provisioning of hosts with the same base image and `bake`
+        configuration uses the newest baked image instead of the base image.
+        Images evicted from the bake cache are deleted.
+        """
+        log_msg_start = f"{self.dsp_name} [{host.name}]"
+        server = host.rawdata or {}
+        metadata = server.get("metadata") or {}
+        bake_hash = metadata.get("mrack_bake")
+        base_id = metadata.get("mrack_base_image")
+        if not bake_hash or not base_id:
+            logger.warning(f"{log_msg_start} Host was not provisioned to be baked")
+            return False
+        if not self.bakes:
+            logger.warning(f"{log_msg_start} Baking requires cache-dir to be set")
+            return False
+        if (server.get("image") or {}).get("id") != base_id:
+            logger.info(f"{log_msg_start} Host already runs baked image")
+            return False
+
+        name = f"mrack-bake-{bake_hash}-{int(time.time())}"
+        logger.info(f"{log_msg_start} Creating image {name}")
+        try:
+            await self.nova.servers.run_action(
+                host.host_id,
+                createImage={"name": name, "metadata": metadata},
+            )
+            image = await self._wait_for_baked_image(name)
+        except ClientError as err:
+            logger.error(f"{log_msg_start} Failed to create image: {err}")
+            return False
+        if not image:
+            logger.error(f"{log_msg_start} Image {name} did not become active")
+            return False
+
+        logger.info(f"{log_msg_start} Baked image {name} with ID {image['id']}")
+        evicted = self.bakes.add(base_id, bake_hash, image["id"])
+        await self._delete_images(evicted)
+        return True
+
+    async def _wait_for_baked_image(self, name):
+        """Wait till image of given name is uploaded, return it or None on failure."""
+        deadline = time.monotonic() + BAKE_TIMEOUT * 60
+        while time.monotonic() < deadline:
+            resp = await self.glance.images.list(name=name)
+            image = resp["images"][0] if resp["images"] else {}
+            if image.get("status") == "active":
+                return image
+            if image.get("status") in ("killed", "deleted"):
+                return None
+            await asyncio.sleep(BAKE_POLL_SLEEP)
+        return None
+
+    async def _delete_images(self, image_ids):
+        """Delete images evicted from the bake cache."""
+        for image_id in image_ids:
+            logger.info(f"{self.dsp_name} Deleting evicted baked image {image_id}")
+            try:
+                await self.glance.images.destroy(image_id)
+            except ClientError as err:
+                logger.debug(f"{self.dsp_name} Unable to delete {image_id}: {err}")
+
     def prov_result_to_host_data(self, prov_result, req):
         """Get needed host information from openstack provisioning result."""
         result = {}
         meta_extra = {}
-        image = self._translate_image(req)
+        image = self._resolve_req(req).base_image
         # Check if these fields exists, not all images have them
         if image.get("meta_compose_id"):
             meta_extra["meta_compose_id"] = image.get("meta_compose_id")
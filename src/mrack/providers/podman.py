@@ -23,6 +23,7 @@ from mrack.errors import ProvisioningError, ServerNotFoundError
 from mrack.host import STATUS_ACTIVE, STATUS_DELETED, STATUS_ERROR, STATUS_OTHER
 from mrack.providers.provider import STRATEGY_ABORT, Provider
 from mrack.providers.utils.podman import Podman
+from mrack.providers.utils.poller import BatchPoller
 from mrack.utils import object2json
 
 logger = logging.getLogger(__name__)
@@ -40,6 +41,8 @@ class PodmanProvider(Provider):
         self.dsp_name = "Podman"
         self.max_retry = 1  # for retry strategy
         self.podman = Podman()
+        self.poll_sleep = 1  # seconds
+        self._poller = None
         self.status_map = {
             STATUS_ACTIVE: STATUS_ACTIVE,
             STATUS_DELETED: STATUS_DELETED,
@@ -155,18 +158,43 @@ class PodmanProvider(Provider):
             )
 
         try:
-            container_id = await self.podman.run(
-                image,
-                hostname,
-                network,
-                extra_options=self.podman_options,
-                remove_at_stop=True,
-            )
+            async with self.limiter("create"):
+                container_id = await self.podman.run(
+                    image,
+                    hostname,
+                    network,
+                    extra_options=self.podman_options,
+                    remove_at_stop=True,
+                )
         except ProvisioningError as p_error:
             raise ProvisioningError(p_error, req) from p_error
 
         return (container_id, req)
 
+    async def _fetch_containers(self, cont_ids):
+        """Inspect all containers using single podman call."""
+        async with self.limiter("poll"):
+            inspected = await self.podman.inspect(*cont_ids)
+
+        containers = {}
+        for cont_id in cont_ids:
+            # containers can be referenced by the prefix of their ID
+            found = [c for c in inspected if c.get("Id", "").startswith(cont_id)]
+            containers[cont_id] = found[0] if found else ServerNotFoundError(cont_id)
+        return containers
+
+    def _get_poller(self):
+        """Get poller shared by all containers waiting to be provisioned."""
+        if self._poller is None:
+            self._poller = BatchPoller(
+                self.dsp_name,
+                self._fetch_containers,
+                lambda server: server["State"]["Running"] or server["State"]["Error"],
+                interval=self.poll_sleep,
+                errors=(ProvisioningError,),
+            )
+        return self._poller
+
     async def wait_till_provisioned(self, resource):
         """Wait till resource is provisioned."""
         # access fist item from tuple resource which should be id
@@ -177,17 +205,14 @@ class PodmanProvider(Provider):
         timeout = 20
         timeout_time = start + timedelta(minutes=timeout)
 
-        while datetime.now() < timeout_time:
-            try:
-                servers = await self.podman.inspect(cont_id)
-                server = servers[0]
-            except ProvisioningError as err:
-                logger.error(f"{log_msg_start} {object2json(err)}")
-                raise ServerNotFoundError(cont_id) from err
-
-            if server["State"]["Running"] or server["State"]["Error"]:
-                break
-            await asyncio.sleep(1)
+        server = await self._get_poller().wait(
+            cont_id,
+            timeout=(timeout_time - datetime.now()).total_seconds(),
+            seen=lambda _state: self.timeline.mark(req.get("name"), "first status"),
+        )
+        if server is None:
+            logger.error(f"{log_msg_start} Container {cont_id} not found")
+            raise ServerNotFoundError(cont_id)
 
         done_time = datetime.now()
         prov_duration = (done_time - start).total_seconds()
@@ -226,6 +251,7 @@ class PodmanProvider(Provider):
                     f"Failed to run '{command}' in container {cont_id}", self.dsp_name
                 )
 
+        self.timeline.mark(req.get("name"), "active")
         server.update({"mrack_req": req})
 
         return server, req
@@ -243,6 +269,7 @@ class PodmanProvider(Provider):
                 if datetime.now() - start_ssh >= timedelta(seconds=(timeout * 60)):
                     break
             else:
+                self.timeline.mark(host.name, "ssh auth")
                 break
         return res, host
 
@@ -259,7 +286,8 @@ class PodmanProvider(Provider):
         networks = insp_data[0]["NetworkSettings"]["Networks"] if insp_data else []
         # then we destroy the container
         logger.info(f"{log_msg_start} Removing container {host_id}")
-        deleted = await self.podman.rm(host_id, force=True)
+        async with self.limiter("delete"):
+            deleted = await self.podman.rm(host_id, force=True)
         # after that we cleanup the podman network
         for net in networks:
             if await self.podman.network_remove(net):
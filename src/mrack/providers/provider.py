@@ -15,28 +15,49 @@
 """General Provider interface."""
 import asyncio
 import logging
+import os
 import random
-import socket
 from datetime import datetime, timedelta
+from functools import partial
 
 from mrack.context import global_context
 from mrack.errors import ProvisioningError
 from mrack.host import STATUS_ACTIVE, STATUS_OTHER, Host
+from mrack.providers.utils.limiter import ConcurrencyLimiter
+from mrack.providers.utils.lock import FileLock
+from mrack.providers.utils.quota import QuotaCache
+from mrack.providers.utils.timeline import Timeline
 from mrack.utils import (
+    get_backoff_delay,
+    get_host_from_metadata,
     get_ssh_options,
     get_username_pass_and_ssh_key,
+    is_port_open,
     object2json,
-    ssh_to_host,
+    ssh_to_host_async,
+    value_to_bool,
 )
 
 logger = logging.getLogger(__name__)
 
 STRATEGY_ABORT = "abort"
 STRATEGY_RETRY = "retry"
+INIT_FULL = "full"  # load everything needed for provisioning
+INIT_DELETE_ONLY = "delete-only"  # only what is needed to delete known hosts
+INIT_STATUS_ONLY = "status-only"  # only what is needed to query known hosts
 RET_CODE = 0  # index to access return code from _wait_for_ssh
 HOST_OBJ = 1  # index to access host object from _wait_for_ssh
 ERROR_OBJ = 0  # default index to access host error which caused ProvisioningError
 SPECS = 1  # default index to access host specs which caused ProvisioningError
+ABORTED_ERROR = "Provisioning aborted due to error of other host"
+SSH_PROBE_LIMIT = 50  # maximum number of ssh probes running at the same time
+QUOTA_CACHE_TTL = 30  # default number of seconds to cache provider quota
+# operations which concurrency can be limited per provider
+CONCURRENCY_OPERATIONS = ("create", "poll", "delete", "ssh")
+SSH_CONNECT_TIMEOUT = 10  # seconds to wait for single TCP connection attempt
+SSH_COMMAND_TIMEOUT = 60  # seconds to wait for single ssh command to finish
+SSH_BACKOFF_CAP = 30  # maximum number of seconds to wait between ssh probes
+CAPACITY_POLL_BASE = 5  # base number of seconds between checks of free resources
 
 
 class Provider:
@@ -50,6 +71,16 @@ class Provider:
         self.max_retry = 1
         self.strategy = STRATEGY_ABORT
         self.status_map = {"OTHER": STATUS_OTHER}
+        # default concurrency limits of operations, 0 means unlimited
+        self.concurrency = {"ssh": SSH_PROBE_LIMIT}
+        # errors signalling that provider is overloaded by our requests
+        self.rate_limit_errors = ()
+        self._limiters = {}
+        self._quota = None
+        # events of hosts which creation is being issued, see _mark_create_issued
+        self._create_issued = {}
+        # provisioning phases of hosts used to find where the time goes
+        self.timeline = Timeline()
 
     @property
     def name(self):
@@ -80,10 +111,80 @@ class Provider:
         """Prepare provisioning."""
         raise NotImplementedError()
 
+    async def fetch_quota(self):
+        """Fetch quota usage and limits of provider resources.
+
+        Returns dictionary mapping resource to its usage and limit,
+        e.g. {"vcpus": {"used": 10, "limit": 100}}.
+        """
+        raise NotImplementedError()
+
+    async def close(self):
+        """Release resources held by the provider, e.g. HTTP connections."""
+        pass
+
+    @property
+    def quota(self):
+        """Get cache of provider quota usage and limits."""
+        if self._quota is None:
+            config = global_context.CONFIG
+            self._quota = QuotaCache(
+                self.dsp_name,
+                self.fetch_quota,
+                ttl=config.quota_cache_ttl if config else QUOTA_CACHE_TTL,
+            )
+        return self._quota
+
+    def _get_concurrency_config(self):
+        """Get concurrency limits of operations from configuration.
+
+        Limit for an operation is taken from provider `concurrency` section
+        of provisioning config, then from `max-concurrency` in mrack config
+        and at last from provider defaults.
+        """
+        prov_config = global_context.PROV_CONFIG
+        config = global_context.CONFIG
+        concurrency = {}
+        if prov_config:
+            concurrency = prov_config.get(self.name, {}).get("concurrency", {}) or {}
+        max_concurrency = config.max_concurrency if config else None
+
+        limits = {}
+        for operation in CONCURRENCY_OPERATIONS:
+            limit = concurrency.get(operation, max_concurrency)
+            if limit is None:
+                limit = self.concurrency.get(operation, 0)
+            limits[operation] = int(limit)
+
+        return limits, bool(concurrency.get("adaptive", True))
+
+    def limiter(self, operation):
+        """Get concurrency limiter of provider operation.
+
+        Operation is one of create, poll, delete or ssh.
+        """
+        if operation not in self._limiters:
+            limits, adaptive = self._get_concurrency_config()
+            logger.debug(
+                f"{self.dsp_name} Concurrency limit of {operation}: "
+                f"{limits[operation] or 'unlimited'}"
+            )
+            self._limiters[operation] = ConcurrencyLimiter(
+                f"{self.dsp_name} {operation}",
+                limit=limits[operation],
+                adaptive=adaptive,
+                errors=self.rate_limit_errors,
+            )
+        return self._limiters[operation]
+
     async def _wait_for_ssh(self, host, timeout, port):
         """
         Wait until a port starts accepting TCP connections and is able to connect.
 
+        Probes do not block the event loop and the number of probes running
+        at the same time is bounded by ssh concurrency limit. Failed probes are
+        retried with exponential backoff with jitter.
+
         Args:
             host (Host): Host object to get its address on which the port should exist.
             timeout (float): In minutes. How long to wait before raising errors.
@@ -93,32 +194,39 @@ class Provider:
         """
         log_msg_start = f"{self.dsp_name} [{host.name}]"
         start_time = datetime.now()
+        ssh_limiter = self.limiter("ssh")
         info_msg = (
             f"{log_msg_start} Waiting for the port {port} on host "
             f"{host.ip_addr} to start accepting connections (up to {timeout} minutes)"
         )
         logger.info(info_msg)
 
+        attempt = 0
         while True:
-            try:
-                with socket.create_connection(
-                    (host.ip_addr, port), timeout=(timeout * 60)
-                ):
-                    logger.info(
-                        f"{log_msg_start} Port {port} on host "
-                        f" {host.ip_addr} is now open"
-                    )
-                    break
-            except OSError:
-                await asyncio.sleep(10)
-                logger.debug(info_msg)
-                if datetime.now() - start_time >= timedelta(seconds=(timeout * 60)):
-                    logger.error(
-                        f"{log_msg_start} Waited too long for the port "
-                        f"{port} on host {host.ip_addr} to start accepting connections"
-                    )
-                    # do not continue to try ssh connection after port is not open
-                    return False, host
+            async with ssh_limiter:
+                port_open = await is_port_open(
+                    host.ip_addr, port, timeout=SSH_CONNECT_TIMEOUT
+                )
+
+            if port_open:
+                logger.info(
+                    f"{log_msg_start} Port {port} on host "
+                    f" {host.ip_addr} is now open"
+                )
+                self.timeline.mark(host.name, "port open")
+                break
+
+            logger.debug(info_msg)
+            if datetime.now() - start_time >= timedelta(seconds=(timeout * 60)):
+                logger.error(
+                    f"{log_msg_start} Waited too long for the port "
+                    f"{port} on host {host.ip_addr} to start accepting connections"
+                )
+                # do not continue to try ssh connection after port is not open
+                return False, host
+
+            await asyncio.sleep(get_backoff_delay(attempt, cap=SSH_BACKOFF_CAP))
+            attempt += 1
 
         # Wait also for the ssh key to be accepted for a half timeout time
         start_ssh = datetime.now()
@@ -132,18 +240,21 @@ class Provider:
             f"to accept the authentication method (up to {timeout} minutes)"
         )
 
+        attempt = 0
         while True:
             ssh_options = get_ssh_options(
                 host, global_context.METADATA, global_context.PROV_CONFIG
             )
-            res = ssh_to_host(
-                host,
-                username=username,
-                password=password,
-                ssh_key=ssh_key,
-                command="echo mrack",
-                ssh_options=ssh_options,
-            )
+            async with ssh_limiter:
+                res = await ssh_to_host_async(
+                    host,
+                    username=username,
+                    password=password,
+                    ssh_key=ssh_key,
+                    command="echo mrack",
+                    ssh_options=ssh_options,
+                    timeout=SSH_COMMAND_TIMEOUT,
+                )
             duration = (datetime.now() - start_ssh).total_seconds()
 
             if res:
@@ -151,6 +262,7 @@ class Provider:
                     f"{log_msg_start} SSH to host '{host.ip_addr}' successful "
                     f"after {duration:.1f}s"
                 )
+                self.timeline.mark(host.name, "ssh auth")
                 break
 
             if datetime.now() - start_ssh >= timedelta(seconds=(timeout * 60)):
@@ -160,16 +272,14 @@ class Provider:
                 )
                 break
 
-            # wait 10 seconds to retry the ssh connection
-            await asyncio.sleep(10)
+            # back off before retrying the ssh connection
+            await asyncio.sleep(get_backoff_delay(attempt, cap=SSH_BACKOFF_CAP))
+            attempt += 1
 
         return res, host
 
-    async def _check_ssh_auth(self, default_check, active_hosts):
-        """Check the ssh authentication functionality."""
-        success_hosts = []
-        error_hosts = []
-
+    def _load_ssh_check_config(self, default_check):
+        """Split ssh check configuration to default and os/group based one."""
         if not isinstance(default_check, dict):
             default_check = {}
 
@@ -192,38 +302,59 @@ class Provider:
         based_check = {x: default_check[x] for x in default_check if x not in req_keys}
         default_check = {x: default_check[x] for x in default_check if x in req_keys}
 
-        wait_ssh = []
-        for host in active_hosts:
-            # go host by host and load the group and os based configuration for ssh
-            os_check = based_check.get("os", {}).get(host.operating_system, {})
-            group_check = based_check.get("group", {}).get(host.group, {})
-            opts = default_check | group_check | os_check  # sorted by priority
+        return default_check, based_check
 
-            logger.debug(
-                f"{self.dsp_name} [{host.name}] "
-                f"ssh check config: {object2json(opts)}"
-            )
+    def _get_host_ssh_check(self, host, default_check, based_check):
+        """Get ssh check options for the host or None if check is disabled."""
+        # load the group and os based configuration for ssh of the host
+        os_check = based_check.get("os", {}).get(host.operating_system, {})
+        group_check = based_check.get("group", {}).get(host.group, {})
+        opts = default_check | group_check | os_check  # sorted by priority
+
+        logger.debug(
+            f"{self.dsp_name} [{host.name}] ssh check config: {object2json(opts)}"
+        )
+
+        if (
+            not opts.get("enabled")
+            and self.name not in opts.get("enabled_providers", [])
+        ) or (opts.get("enabled") and self.name in opts.get("disabled_providers", [])):
+            logger.debug(f"{self.dsp_name} Skipping ssh check for host '{host.name}'")
+            return None
+
+        return opts
 
-            if (
-                not opts.get("enabled")
-                and self.name not in opts.get("enabled_providers", [])
-            ) or (
-                opts.get("enabled") and self.name in opts.get("disabled_providers", [])
-            ):
+    def _set_ssh_check_error(self, host):
+        """Set error of the host which failed the ssh check."""
+        host.error = (
+            "Could not establish ssh connection to host "
+            f"{host.host_id} with IP {host.ip_addr}"
+        )
+
+    async def _check_ssh_auth(self, default_check, active_hosts):
+        """Check the ssh authentication functionality."""
+        success_hosts = []
+        error_hosts = []
+
+        default_check, based_check = self._load_ssh_check_config(default_check)
+
+        wait_ssh = []
+        checked_hosts = []
+        for host in active_hosts:
+            opts = self._get_host_ssh_check(host, default_check, based_check)
+            if opts is None:
                 success_hosts.append(host)
-                logger.debug(
-                    f"{self.dsp_name} Skipping ssh check for host '{host.name}'"
-                )
                 continue
 
-            awaitable = self._wait_for_ssh(
-                host,
-                timeout=opts.get("timeout"),
-                port=opts.get("port"),
-            )
+            awaitable = self._wait_for_host_ssh(host, opts)
             wait_ssh.append(awaitable)
+            checked_hosts.append(host)
 
-        ssh_results = await asyncio.gather(*wait_ssh)
+        ssh_results = await self._gather_or_abort(
+            wait_ssh,
+            is_failed=lambda res: not res[RET_CODE],
+            on_abort=lambda idx: (False, self._aborted_host(checked_hosts[idx])),
+        )
         # We distinguish the success hosts and new error hosts from active by using:
         # res[RET_CODE] 0
         #   - the result of operation returned from self._wait_for_ssh()
@@ -233,131 +364,362 @@ class Provider:
             if res[RET_CODE]:
                 success_hosts.append(res[HOST_OBJ])
             else:
-                res[HOST_OBJ].error = (
-                    "Could not establish ssh connection to host "
-                    f"{res[HOST_OBJ].host_id} with IP {res[HOST_OBJ].ip_addr}"
-                )
+                if res[HOST_OBJ].error != ABORTED_ERROR:
+                    self._set_ssh_check_error(res[HOST_OBJ])
                 error_hosts.append(res[HOST_OBJ])
 
         return success_hosts, error_hosts
 
-    async def _provision_base(
-        self,
-        reqs,
-        timeout=None,
-    ):  # pylint: disable=too-many-locals, too-many-branches, too-many-statements
-        """Provision hosts based on list of host requirements.
+    def _fast_abort(self):
+        """Return True when provisioning should stop right after first error.
 
-        Main function which does provisioning and validation.
-        Parameters:
-            reqs - dictionary with requirements for provider
-            timeout - base timeout (minutes) to wait for resources
+        With abort strategy any error means that all hosts are deleted
+        so there is no point in waiting for the other hosts.
         """
-        if not timeout:
-            timeout = self.timeout
+        config = global_context.CONFIG
+        return self.strategy == STRATEGY_ABORT and bool(config and config.fast_abort)
 
-        log_msg_start = f"{self.dsp_name}"  # use display name at log message beginning
-        logger.info(f"{log_msg_start} Validating host(s) definitions")
-        if not reqs:
-            raise ProvisioningError(
-                f"{log_msg_start} Can not continue with empty requirement for provider"
-            )
+    def _get_resource_id(self, resource):
+        """Get ID of resource returned by create_server."""
+        if isinstance(resource, dict):
+            return resource.get("id")
+        return resource
 
-        await self.validate_hosts(reqs)
-        logger.info(f"{log_msg_start} Host(s) definitions valid")
+    def _aborted_host(self, resource):
+        """Get error host for resource which provisioning was aborted.
+
+        Resource is either Host object or result of create_server so the
+        created resource can be deleted.
+        """
+        if isinstance(resource, Host):
+            resource.error = ABORTED_ERROR
+            return resource
+
+        res, req = resource
+        return Host(
+            provider=self,
+            host_id=self._get_resource_id(res),
+            name=req.get("name"),
+            operating_system=req.get("os"),
+            group=req.get("group"),
+            ip_addrs=[],
+            status=STATUS_OTHER,
+            rawdata=req,
+            error_obj=ABORTED_ERROR,
+        )
 
-        delta = abs(self.timeout - timeout)
-        slow_down = random.choice(range(delta, self.timeout + delta))
+    async def _gather_or_abort(self, awaitables, is_failed, on_abort, aborted=None):
+        """Gather results of awaitables, cancel all of them on unexpected exception.
 
-        logger.debug(
-            f"{log_msg_start} Slowing down the execution for {slow_down} s "
-            "(This will help mrack to get better resource overview for concurrent runs)"
+        With fast abort awaitables still running after the first failed result
+        are cancelled and `on_abort(index)` is used as a result of cancelled one.
+        Optional `aborted` event shared with other waves of hosts is set on
+        the failure and setting it aborts the awaitables the same way.
+        """
+        tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+        results = [None] * len(tasks)
+        fast_abort = self._fast_abort()
+        pending = set(tasks)
+        abort_wait = asyncio.ensure_future(aborted.wait()) if aborted else None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending | {abort_wait} if abort_wait else pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                pending.discard(abort_wait)
+                failed = bool(abort_wait and abort_wait.done())
+                for idx, task in enumerate(tasks):
+                    if task in done:
+                        results[idx] = task.result()
+                        failed = failed or is_failed(results[idx])
+
+                if fast_abort and failed and aborted:
+                    aborted.set()
+                if fast_abort and failed and pending:
+                    logger.info(
+                        f"{self.dsp_name} Provisioning failed, aborting "
+                        f"the provisioning of {len(pending)} host(s)"
+                    )
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    for idx, task in enumerate(tasks):
+                        if task in pending:
+                            results[idx] = (
+                                on_abort(idx) if task.cancelled() else task.result()
+                            )
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            if abort_wait:
+                abort_wait.cancel()
+
+        return results
+
+    def _get_provisioning_lock(self):
+        """Get lock coordinating provisioning with other mrack runs."""
+        return FileLock(
+            os.path.join(global_context.CONFIG.lock_dir, f"{self.name}.lock")
         )
 
-        await asyncio.sleep(slow_down)
-        # This slows down the provisioning at the beginning using a variable time
-        # to sleep so we prevent mrack executions to provision at the same time.
-        logger.info(
-            f"{log_msg_start} Setting timeout to wait "
-            f"for resources to {timeout} min(s)"
+    def _get_ssh_check(self):
+        """Get post provisioning ssh check configuration."""
+        return global_context.PROV_CONFIG.get("post_provisioning_check", {}).get(
+            "ssh", True
+        )  # enable check by default
+
+    def _error_to_host(self, error):
+        """Create Host object from ProvisioningError raised by create_server."""
+        # use ProvisioningError arguments to create missing Host object
+        # which we append to error hosts list for later usage
+        return Host(
+            provider=self,
+            host_id=error.args[SPECS].get("host_id"),
+            name=error.args[SPECS].get("name"),
+            operating_system=error.args[SPECS].get("os"),
+            group=error.args[SPECS].get("group"),
+            ip_addrs=[],
+            status=STATUS_OTHER,
+            rawdata=error.args,
+            error_obj=error.args[ERROR_OBJ],
         )
 
-        logger.info(f"{log_msg_start} Checking available resources")
-        res_check_start = datetime.now()
-        error_hosts = []
+    async def _provision_host(self, req, ssh_check, issued=None, created=None):
+        """Provision single host from its requirement.
 
-        while not await self.can_provision(reqs):
-            if datetime.now() - res_check_start >= timedelta(minutes=timeout):
-                # create error host object so retry strategy can continue
-                # instead of throwing exception to fail at once without retry
-                err_str = "Not enough resources to provision"
-                logger.error(f"{log_msg_start} {err_str}")
-                for req in reqs:
-                    error_hosts.append(
-                        Host(
-                            provider=self,
-                            host_id=req.get("name"),
-                            name=req.get("name"),
-                            operating_system=req.get("os"),
-                            group=req.get("group"),
-                            ip_addrs=[],
-                            status=STATUS_OTHER,
-                            rawdata=req,
-                            error_obj=err_str,
-                        )
-                    )
-                return ([], error_hosts, reqs)
+        Host goes through its own create, wait and ssh check pipeline
+        without waiting for other hosts. Optional `issued` event is set
+        once the creation of the host is issued and result of the creation
+        is stored in optional `created` dictionary under the host name.
+
+        Returns tuple (host, stage) where stage is None for successfully
+        provisioned host or name of the stage on which the host failed.
+        """
+        if created is None:
+            created = {}
+
+        creation = asyncio.ensure_future(self._create_server(req, issued))
+        try:
+            try:
+                response = await asyncio.shield(creation)
+            except asyncio.CancelledError:
+                # let the creation finish so the created resource can be deleted
+                created[req.get("name")] = await creation
+                raise
+        except ProvisioningError as create_error:
+            return self._error_to_host(create_error), "create"
+        finally:
+            if issued:
+                issued.set()
+
+        created[req.get("name")] = response
+
+        srv, req = await self._wait_till_provisioned(response)
+        host = self.to_host(srv, req)
+        if await self.parse_error_hosts([host]):
+            return host, "provisioning"
+
+        if not bool(ssh_check):
+            return host, None
+
+        default_check, based_check = ssh_check
+        opts = self._get_host_ssh_check(host, default_check, based_check)
+        if opts is None:
+            return host, None
+
+        res, host = await self._wait_for_host_ssh(host, opts)
+        if not res:
+            self._set_ssh_check_error(host)
+            return host, "ssh check"
+
+        return host, None
+
+    def _mark_create_issued(self, req):
+        """Mark creation of the host as issued before create_server finishes.
+
+        Providers call it once the create request is accepted or before
+        waiting to retry it, so other mrack runs do not wait for the
+        provisioning lock during long retries. Creation is marked as issued
+        when create_server finishes in any case.
+        """
+        issued = self._create_issued.pop(req.get("name"), None)
+        if issued:
+            issued.set()
+
+    async def _create_server(self, req, issued=None):
+        """Issue creation of the host recording the create request phase.
 
-            logger.info(
-                f"{log_msg_start} Not enough resources to provision, "
-                f"checking again in {timeout * 10} seconds(s)"
+        Optional `issued` event is set once the creation is issued,
+        see `_mark_create_issued`.
+        """
+        if issued:
+            self._create_issued[req.get("name")] = issued
+        try:
+            with self.timeline.phase(req.get("name"), "create"):
+                return await self.create_server(req)
+        finally:
+            self._mark_create_issued(req)
+
+    async def _wait_till_provisioned(self, response):
+        """Wait till host is provisioned recording the provisioning phase."""
+        _res, req = response
+        with self.timeline.phase(req.get("name"), "provisioning"):
+            return await self.wait_till_provisioned(response)
+
+    async def _wait_for_host_ssh(self, host, opts):
+        """Wait for ssh of the host recording the ssh check phase."""
+        with self.timeline.phase(host.name, "ssh check"):
+            return await self._wait_for_ssh(
+                host, timeout=opts.get("timeout"), port=opts.get("port")
             )
-            # Sleep time to wait to check if resources are available again.
-            await asyncio.sleep(timeout * 10)
 
-        logger.info(f"{log_msg_start} Resource availability: OK")
+    async def _report_host(self, pipeline, finished, count):
+        """Log result of host provisioning pipeline once it is finished."""
+        host, failed_stage = await pipeline
+        finished.append(host)
+        progress = f"({len(finished)}/{count})"
+        if failed_stage:
+            logger.error(
+                f"{self.dsp_name} [{host.name}] {progress} Failed "
+                f"at {failed_stage} stage: {str(host.error)}"
+            )
+        else:
+            logger.info(f"{self.dsp_name} [{host.name}] {progress} Ready")
+        return host, failed_stage
+
+    async def _set_when_issued(self, issued, host_issued):
+        """Set the issued event after creation of all hosts is issued."""
+        await asyncio.gather(*[event.wait() for event in host_issued])
+        logger.info(f"{self.dsp_name} Provisioning issued")
+        issued.set()
+
+    async def _provision_pipeline(self, reqs, issued=None, aborted=None):
+        """Provision hosts each in its own pipeline collecting results as they come.
+
+        Wall-clock time is bounded by the slowest host instead of the sum
+        of the slowest hosts of each provisioning stage. Optional `issued`
+        event is set once the provisioning of all hosts is issued, optional
+        `aborted` event is shared with other waves, see `_gather_or_abort`.
+        """
+        log_msg_start = self.dsp_name
+        success_hosts = []
+        error_hosts = []
+
+        ssh_check = self._get_ssh_check()
+        if bool(ssh_check):
+            ssh_check = self._load_ssh_check_config(ssh_check)
+
+        logger.info(f"{log_msg_start} Issuing provisioning pipelines for all hosts")
+        host_issued = [asyncio.Event() for _ in reqs]
+        created = {}
+        finished = []
+        pipelines = [
+            self._report_host(
+                self._provision_host(req, ssh_check, event, created),
+                finished,
+                len(reqs),
+            )
+            for req, event in zip(reqs, host_issued)
+        ]
+        issuing = None
+        if issued:
+            issuing = asyncio.ensure_future(self._set_when_issued(issued, host_issued))
+        try:
+            results = await self._gather_or_abort(
+                pipelines,
+                is_failed=lambda res: res[1],
+                on_abort=lambda idx: (
+                    self._aborted_host(created[reqs[idx].get("name")]),
+                    "abort",
+                ),
+                aborted=aborted,
+            )
+        except Exception:
+            logger.error("An unexpected exception occurred while provisioning")
+            raise
+        finally:
+            if issuing:
+                issuing.cancel()
+
+        for host, failed_stage in results:
+            if failed_stage:
+                error_hosts.append(host)
+            else:
+                success_hosts.append(host)
+
+        return success_hosts, error_hosts
+
+    async def _wait_for_host(self, response):
+        """Wait till resource is provisioned and check it for errors.
+
+        Returns tuple (host, failed).
+        """
+        srv, req = await self._wait_till_provisioned(response)
+        if not srv:
+            return None, False
+
+        host = self.to_host(srv, req)
+        return host, bool(await self.parse_error_hosts([host]))
+
+    async def _provision_stages(self, reqs, issued=None, aborted=None):
+        """Provision hosts stage by stage waiting for all hosts in each stage.
+
+        Optional `issued` event is set once the provisioning of all hosts is issued,
+        optional `aborted` event is shared with other waves, see `_gather_or_abort`.
+        """
+        log_msg_start = self.dsp_name
+        error_hosts = []
         started = datetime.now()
 
         logger.info(f"{log_msg_start} Issuing provisioning of {len(reqs)} host(s)")
+        host_issued = [asyncio.Event() for _ in reqs]
         create_servers = []
-        for req in reqs:
-            awaitable = self.create_server(req)
+        for req, event in zip(reqs, host_issued):
+            awaitable = self._create_server(req, event)
             create_servers.append(awaitable)
 
-        # expect the exception in return data to be parsed later
-        create_resps = await asyncio.gather(*create_servers, return_exceptions=True)
+        issuing = None
+        if issued:
+            issuing = asyncio.ensure_future(self._set_when_issued(issued, host_issued))
+        try:
+            # expect the exception in return data to be parsed later
+            create_resps = await asyncio.gather(*create_servers, return_exceptions=True)
+        finally:
+            if issuing:
+                issuing.cancel()
 
-        logger.info(f"{log_msg_start} Provisioning issued")
+        logger.info(f"{log_msg_start} Creation of all hosts finished")
+        if issued:
+            issued.set()
 
         logger.info(f"{log_msg_start} Waiting for all hosts to be active")
 
-        wait_servers = []
+        created = []
         for response in create_resps:
             if isinstance(response, ProvisioningError):
-                # use ProvisioningError arguments to create missing Host object
-                # which we append to error hosts list for later usage
-                error_hosts.append(
-                    Host(
-                        provider=self,
-                        host_id=response.args[SPECS].get("host_id"),
-                        name=response.args[SPECS].get("name"),
-                        operating_system=response.args[SPECS].get("os"),
-                        group=response.args[SPECS].get("group"),
-                        ip_addrs=[],
-                        status=STATUS_OTHER,
-                        rawdata=response.args,
-                        error_obj=response.args[ERROR_OBJ],
-                    )
-                )
+                error_hosts.append(self._error_to_host(response))
             elif isinstance(response, Exception):
                 logger.error("An unexpected exception occurred while provisioning")
                 raise response
             else:
                 # response might be okay so let us wait for result
-                awaitable = self.wait_till_provisioned(response)
-                wait_servers.append(awaitable)
-
-        server_results = await asyncio.gather(*wait_servers)
+                created.append(response)
+
+        if (error_hosts or (aborted and aborted.is_set())) and self._fast_abort():
+            logger.info(f"{log_msg_start} Provisioning failed, aborting")
+            if aborted:
+                aborted.set()
+            error_hosts += [self._aborted_host(response) for response in created]
+            return [], error_hosts
+
+        wait_results = await self._gather_or_abort(
+            [self._wait_for_host(response) for response in created],
+            is_failed=lambda res: res[1],
+            on_abort=lambda idx: (self._aborted_host(created[idx]), True),
+            aborted=aborted,
+        )
         provisioned = datetime.now()
 
         logger.info(
@@ -366,15 +728,11 @@ class Provider:
         )
         logger.info(f"{log_msg_start} Provisioning duration: {provisioned - started}")
 
-        hosts = [self.to_host(srv, req) for srv, req in server_results if srv]
-
-        error_hosts += await self.parse_error_hosts(hosts)
-        active_hosts = [h for h in hosts if h not in error_hosts]
+        error_hosts += [host for host, failed in wait_results if host and failed]
+        active_hosts = [host for host, failed in wait_results if host and not failed]
         success_hosts = []
 
-        ssh_check = global_context.PROV_CONFIG.get("post_provisioning_check", {}).get(
-            "ssh", True
-        )  # enable check by default
+        ssh_check = self._get_ssh_check()
 
         # check ssh connectivity to hosts if not disabled per host or provider
         if bool(ssh_check):
@@ -385,6 +743,287 @@ class Provider:
         else:  # we do not check the ssh connection to VMs
             success_hosts = active_hosts
 
+        return success_hosts, error_hosts
+
+    async def _provision_base(
+        self,
+        reqs,
+        timeout=None,
+    ):
+        """Provision hosts based on list of host requirements.
+
+        Main function which does provisioning and validation.
+        Parameters:
+            reqs - dictionary with requirements for provider
+            timeout - base timeout (minutes) to wait for resources
+        """
+        if not timeout:
+            timeout = self.timeout
+
+        log_msg_start = f"{self.dsp_name}"  # use display name at log message beginning
+        logger.info(f"{log_msg_start} Validating host(s) definitions")
+        if not reqs:
+            raise ProvisioningError(
+                f"{log_msg_start} Can not continue with empty requirement for provider"
+            )
+
+        for req in reqs:
+            self.timeline.begin(req.get("name"), "validate")
+        await self.validate_hosts(reqs)
+        for req in reqs:
+            self.timeline.end(req.get("name"), "validate")
+        logger.info(f"{log_msg_start} Host(s) definitions valid")
+
+        logger.info(
+            f"{log_msg_start} Setting timeout to wait "
+            f"for resources to {timeout} min(s)"
+        )
+
+        # Concurrent mrack runs take turns in checking the resources and issuing
+        # the provisioning so they do not compete for the same resources.
+        lock = self._get_provisioning_lock()
+        await lock.acquire()
+        try:
+            return await self._provision_locked(reqs, timeout, lock)
+        finally:
+            lock.release()
+
+    def _allow_partial_admission(self):
+        """Return True if hosts can be provisioned in waves as resources allow.
+
+        Partial admission is enabled by `partial-admission` in mrack config
+        unless job metadata requires all hosts at once using `gang` option.
+        """
+        config = global_context.CONFIG
+        if not (config and config.partial_admission):
+            return False
+
+        metadata = global_context.METADATA or {}
+        return not value_to_bool(metadata.get("config", {}).get("gang", False))
+
+    def _sort_by_priority(self, reqs):
+        """Sort requirements by `priority` of hosts in job metadata (highest first)."""
+        metadata = global_context.METADATA or {}
+
+        def get_priority(req):
+            meta_host, _domain = get_host_from_metadata(metadata, req.get("name"))
+            return -int((meta_host or {}).get("priority", 0))
+
+        return sorted(reqs, key=get_priority)
+
+    async def _admit(self, reqs, partial=False):
+        """Get requirements which can be provisioned with current resources.
+
+        When partial admission is allowed the longest prefix of requirements
+        which fits available resources is returned, otherwise all or nothing.
+        """
+        if await self.can_provision(reqs):
+            return reqs
+        if not partial:
+            return []
+
+        # binary search for the longest prefix which can be provisioned
+        fits, does_not_fit = 0, len(reqs)
+        while does_not_fit - fits > 1:
+            middle = (fits + does_not_fit) // 2
+            if await self.can_provision(reqs[:middle]):
+                fits = middle
+            else:
+                does_not_fit = middle
+
+        return reqs[:fits]
+
+    def _abort_on_error(self, aborted, wave):
+        """Set the aborted event when the finished wave has failed hosts."""
+        if wave.cancelled() or wave.exception() or wave.result()[1]:
+            aborted.set()
+
+    async def _start_wave(self, reqs, aborted=None):
+        """Start provisioning of hosts and wait till it is issued.
+
+        Optional `aborted` event is set once the wave fails and it aborts
+        the wave when it is set by other wave, see `_gather_or_abort`.
+
+        Returns the task provisioning the hosts.
+        """
+        issued = asyncio.Event()
+        if global_context.CONFIG.provisioning_pipeline:
+            wave = asyncio.ensure_future(
+                self._provision_pipeline(reqs, issued, aborted)
+            )
+        else:
+            wave = asyncio.ensure_future(self._provision_stages(reqs, issued, aborted))
+        if aborted:
+            wave.add_done_callback(partial(self._abort_on_error, aborted))
+
+        issuing = asyncio.ensure_future(issued.wait())
+        await asyncio.wait([wave, issuing], return_when=asyncio.FIRST_COMPLETED)
+        issuing.cancel()
+        return wave
+
+    def _not_enough_resources_hosts(self, reqs):
+        """Create error hosts for requirements which did not get resources."""
+        # create error host object so retry strategy can continue
+        # instead of throwing exception to fail at once without retry
+        err_str = "Not enough resources to provision"
+        logger.error(f"{self.dsp_name} {err_str} {len(reqs)} host(s)")
+        return [
+            Host(
+                provider=self,
+                host_id=req.get("name"),
+                name=req.get("name"),
+                operating_system=req.get("os"),
+                group=req.get("group"),
+                ip_addrs=[],
+                status=STATUS_OTHER,
+                rawdata=req,
+                error_obj=err_str,
+            )
+            for req in reqs
+        ]
+
+    async def _wait_for_capacity(
+        self, check, max_wait, base=CAPACITY_POLL_BASE, cap=None, lock=None
+    ):
+        """Wait till resources needed by `check` are available.
+
+        `check` is a coroutine function using cheap provider usage signals
+        (limits, available addresses) which returns truthy value once there
+        are enough resources. It is called with exponential backoff starting
+        at `base` seconds limited by `cap` so the waiting ends soon after the
+        resources are freed, but not later than after `max_wait` seconds.
+        Optional lock is released while sleeping between the checks.
+
+        Returns the result of the last check.
+        """
+        start = datetime.now()
+        cap = cap or max_wait
+        result = None
+        attempt = 0
+        while True:
+            remaining = max_wait - (datetime.now() - start).total_seconds()
+            if remaining <= 0:
+                break
+
+            delay = min(remaining, get_backoff_delay(attempt, base=base, cap=cap))
+            attempt += 1
+            if lock:
+                # let other mrack runs use the resources which are available
+                lock.release()
+            await asyncio.sleep(delay)
+            if lock:
+                await lock.acquire()
+
+            result = await check()
+            if result:
+                break
+
+        waited = datetime.now() - start
+        if result:
+            logger.info(f"{self.dsp_name} Waited {waited} for resources")
+        else:
+            logger.info(f"{self.dsp_name} Resources not available after {waited}")
+        return result
+
+    async def _wait_for_capacity_or_abort(self, aborted, *args, **kwargs):
+        """Wait for resources unless provisioning of started waves fails.
+
+        Returns the result of `_wait_for_capacity` or None when the waiting
+        was interrupted by the `aborted` event.
+        """
+        if not aborted:
+            return await self._wait_for_capacity(*args, **kwargs)
+
+        capacity = asyncio.ensure_future(self._wait_for_capacity(*args, **kwargs))
+        abort_wait = asyncio.ensure_future(aborted.wait())
+        try:
+            await asyncio.wait(
+                [capacity, abort_wait], return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            abort_wait.cancel()
+            if not capacity.done():
+                capacity.cancel()
+                await asyncio.gather(capacity, return_exceptions=True)
+
+        if aborted.is_set():
+            return None
+        return capacity.result()
+
+    async def _provision_locked(self, reqs, timeout, lock):
+        """Provision hosts once there are enough resources for them.
+
+        The lock is released while waiting for resources and after
+        provisioning of all hosts is issued. With partial admission
+        hosts which fit the resources are provisioned in waves while
+        the rest of them waits for resources. With fast abort hosts are
+        not admitted anymore once any wave fails and the other waves are
+        aborted.
+        """
+        log_msg_start = self.dsp_name
+        logger.info(f"{log_msg_start} Checking available resources")
+        res_check_start = datetime.now()
+        error_hosts = []
+        waves = []
+        aborted = asyncio.Event() if self._fast_abort() else None
+
+        partial = self._allow_partial_admission()
+        pending = self._sort_by_priority(reqs) if partial else reqs
+        for req in pending:
+            self.timeline.begin(req.get("name"), "quota wait")
+
+        try:
+            while pending:
+                admitted = await self._admit(pending, partial)
+                if not admitted:
+                    logger.info(
+                        f"{log_msg_start} Not enough resources to provision, "
+                        "waiting for them to be freed"
+                    )
+                    elapsed = datetime.now() - res_check_start
+                    admitted = await self._wait_for_capacity_or_abort(
+                        aborted,
+                        lambda: self._admit(pending, partial),
+                        max_wait=timeout * 60 - elapsed.total_seconds(),
+                        cap=timeout * 10,
+                        lock=lock,
+                    )
+                if aborted and aborted.is_set():
+                    logger.info(
+                        f"{log_msg_start} Provisioning failed, aborting "
+                        f"the provisioning of {len(pending)} waiting host(s)"
+                    )
+                    for req in pending:
+                        self.timeline.end(req.get("name"), "quota wait")
+                    error_hosts += [self._aborted_host((None, req)) for req in pending]
+                    break
+                if not admitted:
+                    for req in pending:
+                        self.timeline.end(req.get("name"), "quota wait")
+                    error_hosts += self._not_enough_resources_hosts(pending)
+                    break
+
+                for req in admitted:
+                    self.timeline.end(req.get("name"), "quota wait")
+                pending = pending[len(admitted) :]
+                logger.info(
+                    f"{log_msg_start} Resource availability: OK for "
+                    f"{len(admitted)}/{len(admitted) + len(pending)} host(s)"
+                )
+                waves.append(await self._start_wave(admitted, aborted))
+
+            lock.release()
+            results = await asyncio.gather(*waves)
+        except BaseException:
+            for wave in waves:
+                wave.cancel()
+            raise
+
+        success_hosts = []
+        for wave_success, wave_error in results:
+            success_hosts += wave_success
+            error_hosts += wave_error
+
         return (success_hosts, error_hosts, self._get_missing_reqs(reqs, error_hosts))
 
     async def provision_hosts(self, reqs):
@@ -414,6 +1053,8 @@ class Provider:
 
         logger.info(f"{log_msg_start} Printing provisioned hosts")
         for host in success_hosts:
+            # store the provisioning phases of the host within its DB entry
+            host.timeline = self.timeline.get(host.name)
             logger.info(f"{log_msg_start} {host}")
 
         return success_hosts
@@ -509,22 +1150,27 @@ class Provider:
 
                 await self.delete_hosts(error_hosts)
 
-                # increase the sleep time to extend the cooldown period
-                # when internal error happens
-                res_check_timeout += res_check_timeout * int(server_error)
-
-                cooldown = random.choice(
-                    range(res_check_timeout, 2 * res_check_timeout)
-                )
-
-                logger.info(
-                    f"{log_msg_start} Retrying to provision these hosts in {cooldown}s"
-                )
                 # In this case we haven't been able to provision all resources
                 # despite the previous waits, so we probably are in a race condition
-                # with concurrent runs, and thus we free all resources and try again
-                # in `cooldown` seconds to give chance other mrack requests.
-                await asyncio.sleep(cooldown)
+                # with concurrent runs, and thus we free all resources and wait
+                # till there are enough resources for the missing hosts, at least
+                # the initial backoff delay to give chance other mrack requests.
+                cooldown = 2 * res_check_timeout * (1 + int(server_error))
+                logger.info(
+                    f"{log_msg_start} Retrying to provision these hosts once "
+                    f"there are enough resources (up to {cooldown}s)"
+                )
+                # can_provision checks only the quota, not the capacity of provider
+                # which caused the server error, so wait at least the base timeout
+                min_wait = res_check_timeout if server_error else 0
+                if min_wait:
+                    await asyncio.sleep(min_wait)
+                await self._wait_for_capacity(
+                    lambda: self.can_provision(missing_reqs),
+                    max_wait=cooldown - min_wait,
+                    base=CAPACITY_POLL_BASE * (1 + int(server_error)),
+                    cap=res_check_timeout,
+                )
 
         return success_hosts, error_hosts, missing_reqs
 
@@ -567,13 +1213,26 @@ class Provider:
         """Delete provisioned host."""
         raise NotImplementedError()
 
+    async def bake_host(self, host):
+        """Create image of configured host for later provisioning.
+
+        Returns True if the image was created.
+        """
+        logger.warning(f"{self.dsp_name} Baking of hosts is not supported")
+        return False
+
+    async def _delete_host(self, host):
+        """Delete the host recording the delete phase."""
+        with self.timeline.phase(host.name, "delete"):
+            return await self.delete_host(host.host_id, host.name)
+
     async def delete_hosts(self, hosts):
         """Issue deletion of all servers based on previous results from provisioning."""
         log_msg_start = self.dsp_name
         logger.info(f"{log_msg_start} Issuing deletion")
         delete_servers = []
         for host in hosts:
-            awaitable = self.delete_host(host.host_id, host.name)
+            awaitable = self._delete_host(host)
             delete_servers.append(awaitable)
         results = await asyncio.gather(*delete_servers)
         logger.info(f"{log_msg_start} All servers issued to be deleted")
@@ -0,0 +1,91 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for recording images baked from configured hosts."""
+
+import hashlib
+import time
+
+from mrack.utils import object2json
+
+BAKE_MAX_AGE = 7 * 24  # hours to use baked image
+BAKE_MAX_COUNT = 2  # baked images kept per base image and configuration
+CACHE_KEY = "bakes"
+
+
+def get_bake_hash(config):
+    """Get hash of host configuration defined by `bake` attribute of the host."""
+    return hashlib.sha256(object2json(config).encode()).hexdigest()[:16]
+
+
+class BakeCache:
+    """Baked images stored in DiskCache.
+
+    Images are recorded under the ID of the base image they were booted
+    from and the hash of the configuration applied on top of it, newest
+    last. Images older than `max_age` hours are not used and only
+    `max_count` newest images are kept for each base image and configuration,
+    see `add`.
+    """
+
+    def __init__(self, cache, max_age=BAKE_MAX_AGE, max_count=BAKE_MAX_COUNT):
+        """Init the bake cache."""
+        self.cache = cache
+        self.max_age = max_age
+        self.max_count = max_count
+
+    @staticmethod
+    def _key(base_id, config_hash):
+        """Get key of images baked from the base image and configuration."""
+        return f"{base_id}:{config_hash}"
+
+    def _load(self):
+        """Load baked images from the disk cache."""
+        return self.cache.get(CACHE_KEY, float("inf")) or {}
+
+    def _is_fresh(self, entry, now):
+        """Check that the baked image is not too old to be used."""
+        return now - entry["time"] < self.max_age * 60 * 60
+
+    def get(self, base_id, config_hash):
+        """Get ID of the newest usable image baked for the configuration or None."""
+        now = time.time()
+        entries = self._load().get(self._key(base_id, config_hash), [])
+        fresh = [entry for entry in entries if self._is_fresh(entry, now)]
+        return fresh[-1]["image"] if fresh else None
+
+    def add(self, base_id, config_hash, image_id):
+        """Record newly baked image.
+
+        Returns list of IDs of evicted images which should be deleted.
+        """
+        bakes = self._load()
+        entries = bakes.setdefault(self._key(base_id, config_hash), [])
+        entries.append({"image": image_id, "time": time.time()})
+        return self._evict(bakes)
+
+    def _evict(self, bakes):
+        """Evict images from given baked images and store the rest."""
+        now = time.time()
+        evicted = []
+        for key, entries in list(bakes.items()):
+            keep = [entry for entry in entries if self._is_fresh(entry, now)]
+            keep = keep[-self.max_count :] if self.max_count > 0 else []
+            evicted += [entry["image"] for entry in entries if entry not in keep]
+            if keep:
+                bakes[key] = keep
+            else:
+                del bakes[key]
+        self.cache.set(CACHE_KEY, bakes)
+        return evicted
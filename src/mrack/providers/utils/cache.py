@@ -0,0 +1,96 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for caching provider objects on disk between mrack runs."""
+
+import json
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1  # increase when format of cached objects changes
+
+
+class DiskCache:
+    """Cache of provider objects stored in single JSON file.
+
+    Each object is stored under a key with the time it was stored, objects
+    older than `ttl` given to `get` are considered missing. Cache written
+    by other version of mrack (see CACHE_VERSION) or unreadable cache
+    is ignored. The file is readable only by its owner.
+    """
+
+    def __init__(self, path, version=CACHE_VERSION):
+        """Init the cache."""
+        self.path = path
+        self.version = version
+        self._entries = None
+
+    def _load(self):
+        """Load the entries from the cache file."""
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except FileNotFoundError:
+            return self._entries
+        except (OSError, ValueError) as err:
+            logger.debug(f"Ignoring unreadable cache {self.path}: {err}")
+            return self._entries
+
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self._entries = data.get("entries", {})
+        else:
+            logger.debug(f"Ignoring cache {self.path} of other version")
+        return self._entries
+
+    def _save(self):
+        """Write the entries to the cache file atomically."""
+        data = {"version": self.version, "entries": self._entries}
+        directory = os.path.dirname(self.path)
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # temporary file is created readable only by the owner
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cache-")
+            with os.fdopen(fd, "w", encoding="utf-8") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self.path)
+        except OSError as err:
+            logger.warning(f"Unable to write cache {self.path}: {err}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, key, ttl):
+        """Get object stored under the key not older than `ttl` seconds or None."""
+        entry = self._load().get(key)
+        if not entry or time.time() - entry["time"] >= ttl:
+            return None
+        return entry["value"]
+
+    def set(self, key, value):
+        """Store object under the key."""
+        self._load()[key] = {"time": time.time(), "value": value}
+        self._save()
+
+    def invalidate(self, key):
+        """Remove object stored under the key."""
+        if self._load().pop(key, None) is not None:
+            self._save()
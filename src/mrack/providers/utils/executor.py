@@ -0,0 +1,75 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for running blocking provider API calls off the event loop."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_WORKERS = 20  # number of threads running blocking calls
+EXECUTOR_TIMEOUT = 120  # seconds to wait for result of blocking call
+
+
+class BlockingExecutor:
+    """Pool of threads running blocking calls (e.g. boto3) for coroutines.
+
+    The event loop and other providers keep running while the calls are
+    in progress. Number of calls running at the same time is bounded by
+    `workers`, the rest waits for a free thread. Coroutine waiting for the
+    call gets asyncio.TimeoutError after `timeout` seconds, the call itself
+    can not be interrupted so it should have its own (e.g. socket) timeouts.
+    """
+
+    def __init__(self, name, workers=EXECUTOR_WORKERS, timeout=EXECUTOR_TIMEOUT):
+        """Init the executor."""
+        self.name = name
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+
+    def _get_pool(self):
+        """Get thread pool, create it on first use."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix=self.name
+            )
+        return self._pool
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """Run blocking function in the thread pool and return its result.
+
+        `timeout` overrides the default timeout of the executor, None
+        uses the default, 0 waits without a timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_event_loop()
+        call = loop.run_in_executor(self._get_pool(), partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(call, timeout or None)
+        except asyncio.TimeoutError:
+            logger.debug(
+                f"{self.name} {getattr(func, '__name__', func)} did not finish "
+                f"in {timeout} seconds"
+            )
+            raise
+
+    def shutdown(self):
+        """Stop the threads once running calls finish, drop waiting calls."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
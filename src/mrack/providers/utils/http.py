@@ -0,0 +1,117 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for HTTP transport shared by provider API clients."""
+
+import asyncio
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = 100  # maximum number of open connections
+HTTP_POOL_SIZE_PER_HOST = 0  # maximum number of open connections to host, 0 unlimited
+HTTP_KEEPALIVE = 30  # seconds to keep idle connection open
+HTTP_DNS_CACHE = 300  # seconds to cache resolved host names
+HTTP_CONNECT_TIMEOUT = 30  # seconds to wait for new connection
+
+
+class HTTPTransport:
+    """Pool of keep-alive HTTP connections shared by API clients.
+
+    Single aiohttp session is created lazily within running event loop
+    so connections (and TLS sessions) are reused by all requests instead
+    of opening new connection for each request. Duration of requests is
+    recorded per method and host, see `stats`.
+    """
+
+    def __init__(
+        self,
+        name,
+        pool_size=HTTP_POOL_SIZE,
+        pool_size_per_host=HTTP_POOL_SIZE_PER_HOST,
+        keepalive=HTTP_KEEPALIVE,
+        dns_cache=HTTP_DNS_CACHE,
+        connect_timeout=HTTP_CONNECT_TIMEOUT,
+    ):
+        """Init the transport."""
+        self.name = name
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive = keepalive
+        self.dns_cache = dns_cache
+        self.connect_timeout = connect_timeout
+        self.stats = {}
+        self._session = None
+
+    def _trace_config(self):
+        """Get trace config recording duration of requests."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(_session, context, _params):
+            context.start = asyncio.get_event_loop().time()
+
+        async def on_request_end(_session, context, params):
+            self._record(params.method, params.url, params.response.status, context)
+
+        async def on_request_exception(_session, context, params):
+            self._record(params.method, params.url, "error", context)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        return trace_config
+
+    def _record(self, method, url, status, context):
+        """Record duration of finished request."""
+        duration = asyncio.get_event_loop().time() - context.start
+        logger.debug(
+            f"{self.name} {method} {url.path} {status} in {duration:.3f} seconds"
+        )
+        key = f"{method} {url.host}"
+        stats = self.stats.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += duration
+        stats["max"] = max(stats["max"], duration)
+
+    def get_session(self):
+        """Get session shared by all requests, create it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=self.dns_cache,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_connect=self.connect_timeout
+                ),
+                trace_configs=[self._trace_config()],
+            )
+        return self._session
+
+    async def close(self):
+        """Close pooled connections and log duration of requests."""
+        for key, stats in sorted(self.stats.items()):
+            logger.debug(
+                f"{self.name} {key}: {stats['count']} request(s), "
+                f"average {stats['total'] / stats['count']:.3f} seconds, "
+                f"max {stats['max']:.3f} seconds"
+            )
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,90 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for limiting concurrency of provider operations."""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimiter:
+    """Async context manager bounding number of concurrently running operations.
+
+    Limit 0 means no limit. When adaptive the limit is halved each time
+    the operation fails with one of `errors` (e.g. provider rate limiting)
+    and raised by one after `limit` consecutive successful operations,
+    never exceeding the configured limit.
+    """
+
+    def __init__(self, name, limit=0, adaptive=False, errors=()):
+        """Init the limiter."""
+        self.name = name
+        self.max_limit = limit
+        self.limit = limit
+        self.adaptive = adaptive
+        self.errors = tuple(errors)
+        self.running = 0
+        self._successes = 0
+        self._condition = None
+
+    def _get_condition(self):
+        """Get condition created lazily within running event loop."""
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _decrease(self):
+        """Halve the limit after failed operation."""
+        self._successes = 0
+        limit = max(1, self.limit // 2)
+        if limit != self.limit:
+            logger.debug(f"Lowering {self.name} concurrency to {limit}")
+        self.limit = limit
+
+    def _increase(self):
+        """Raise the limit after enough successful operations."""
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self._successes = 0
+            self.limit += 1
+            logger.debug(f"Raising {self.name} concurrency to {self.limit}")
+
+    async def __aenter__(self):
+        """Wait for free slot."""
+        if not self.max_limit:
+            return self
+
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.running < self.limit)
+            self.running += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        """Release the slot and adapt the limit to the operation result."""
+        if not self.max_limit:
+            return False
+
+        condition = self._get_condition()
+        async with condition:
+            self.running -= 1
+            if self.adaptive:
+                if exc_type is None:
+                    self._increase()
+                elif issubclass(exc_type, self.errors):
+                    self._decrease()
+            condition.notify_all()
+        return False
@@ -0,0 +1,115 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for coordinating concurrent mrack runs."""
+
+import asyncio
+import fcntl
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class FileLock:
+    """Lock shared by mrack processes using the same lock file.
+
+    The lock is taken using flock(2) on a file in a directory shared by
+    the processes (local or on shared file system). Waiting for the lock
+    does not block the event loop, the lock is polled every `poll` seconds.
+    When the lock file can not be used the lock is not held and mrack
+    continues without coordination.
+    """
+
+    def __init__(self, path, poll=1):
+        """Init the lock."""
+        self.path = path
+        self.poll = poll
+        self._fd = None
+
+    @property
+    def locked(self):
+        """Return True when the lock is held by this object."""
+        return self._fd is not None
+
+    def _open(self):
+        """Open the lock file, return None when it is not possible."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            return os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        except OSError as err:
+            logger.warning(
+                f"Unable to use lock file {self.path}, continuing "
+                f"without coordination with other mrack runs: {err}"
+            )
+            return None
+
+    async def acquire(self):
+        """Wait till the lock is acquired.
+
+        Return True if the lock was acquired and False if lock file
+        could not be used.
+        """
+        if self.locked:
+            return True
+
+        fd = self._open()
+        if fd is None:
+            return False
+
+        start = datetime.now()
+        waiting = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if not waiting:
+                    logger.info(f"Waiting for other mrack run holding {self.path}")
+                    waiting = True
+                await asyncio.sleep(self.poll)
+            except OSError as err:
+                logger.warning(f"Unable to lock {self.path}: {err}")
+                os.close(fd)
+                return False
+            except BaseException:
+                os.close(fd)
+                raise
+
+        if waiting:
+            logger.info(f"Lock {self.path} acquired after {datetime.now() - start}")
+        self._fd = fd
+        return True
+
+    def release(self):
+        """Release the lock if it is held, do nothing otherwise."""
+        if not self.locked:
+            return
+
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    async def __aenter__(self):
+        """Acquire the lock."""
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        """Release the lock."""
+        self.release()
+        return False
@@ -14,11 +14,77 @@
 
 """Additional client API wrappers for OpenStack."""
 
-from asyncopenstackclient import NovaClient
+import json
+from functools import partial
+from types import MethodType
+
+from asyncopenstackclient import GlanceClient, NovaClient
 from asyncopenstackclient.client import Client
+from simple_rest_client.models import Request
+from simple_rest_client.request import make_async_request
+from simple_rest_client.resource import AsyncResource
+
+
+class PooledAsyncResource(AsyncResource):
+    """Resource sending requests using session of shared HTTPTransport.
+
+    AsyncResource opens new session (and connection) for each request.
+    """
+
+    def __init__(self, *args, transport=None, **kwargs):
+        """Init the resource."""
+        self.transport = transport
+        super().__init__(*args, **kwargs)
+
+    def add_action(self, action_name):
+        """Add method sending request of the action."""
+
+        async def action_method(
+            self,
+            *args,
+            body=None,
+            params=None,
+            headers=None,
+            action_name=action_name,
+            **kwargs,
+        ):
+            url = self.get_action_full_url(action_name, *args)
+            method = self.get_action_method(action_name)
+            if self.json_encode_body and body:
+                body = json.dumps(body)
+            request = Request(
+                url=url,
+                method=method,
+                params=params or {},
+                body=body,
+                headers=headers or {},
+                timeout=self.timeout,
+                kwargs=kwargs,
+            )
+            request.params.update(self.params)
+            request.headers.update(self.headers)
+            return await make_async_request(self.transport.get_session(), request)
+
+        setattr(self, action_name, MethodType(action_method, self))
+
+
+class PooledClient(Client):
+    """Client sending requests using shared HTTPTransport if it is set."""
 
+    transport = None
 
-class ExtraNovaClient(NovaClient):
+    async def init_api(self, timeout=60):
+        """Initialize API with resources using the transport."""
+        await super().init_api(timeout)
+        if self.transport is None:
+            return
+
+        resource_class = partial(PooledAsyncResource, transport=self.transport)
+        for resource in self.api.get_resource_list():
+            self.api.add_resource(resource_name=resource, resource_class=resource_class)
+
+
+class ExtraNovaClient(NovaClient, PooledClient):
     """Extension of NovaClient to provide additional methods.
 
     Added methods:
@@ -27,12 +93,15 @@ class ExtraNovaClient(NovaClient):
     * usage.show
     * keypairs.show
     * keypairs.create
+    * flavors.show
+    * servers.update
     """
 
-    def __init__(self, session=None, api_url=None):
+    def __init__(self, session=None, api_url=None, transport=None):
         """Add new objects."""
         super().__init__(session, api_url)
         self.resources.extend(["limits", "quota", "usage", "keypairs"])
+        self.transport = transport
 
     async def init_api(self, timeout=60):
         """Initialize API.
@@ -48,24 +117,40 @@ class ExtraNovaClient(NovaClient):
         }
         self.api.keypairs.actions["show"] = {"method": "GET", "url": "os-keypairs/{}"}
         self.api.keypairs.actions["create"] = {"method": "POST", "url": "os-keypairs"}
+        self.api.flavors.actions["show"] = {"method": "GET", "url": "flavors/{}"}
+        self.api.servers.actions["update"] = {"method": "PUT", "url": "servers/{}"}
         self.api.limits.add_action("show")
         self.api.quota.add_action("show")
         self.api.usage.add_action("show")
         self.api.keypairs.add_action("show")
         self.api.keypairs.add_action("create")
+        self.api.flavors.add_action("show")
+        self.api.servers.add_action("update")
+
 
+class ExtraGlanceClient(GlanceClient, PooledClient):
+    """Extension of GlanceClient to send requests using shared HTTPTransport."""
 
-class NeutronClient(Client):
+    def __init__(self, session=None, api_url=None, transport=None):
+        """Init the client."""
+        super().__init__(session, api_url)
+        self.transport = transport
+
+
+class NeutronClient(PooledClient):
     """Client API for working with Neutron (Networks).
 
     Available methods:
     * network.list - get all networks
     * ip.list - get network availibilities
+    * quota.tenant - get ID of the project
+    * quota.details - get quota usage and limits of the project
     """
 
-    def __init__(self, session=None, api_url=None):
+    def __init__(self, session=None, api_url=None, transport=None):
         """Add new objects."""
-        super().__init__("neutron", ["network", "ip"], session, api_url)
+        super().__init__("neutron", ["network", "ip", "quota"], session, api_url)
+        self.transport = transport
 
     async def init_api(self, timeout=60):
         """Initialize API.
@@ -78,5 +163,12 @@ class NeutronClient(Client):
             "method": "GET",
             "url": "network-ip-availabilities",
         }
+        self.api.quota.actions["tenant"] = {"method": "GET", "url": "quotas/tenant"}
+        self.api.quota.actions["details"] = {
+            "method": "GET",
+            "url": "quotas/{}/details",
+        }
         self.api.network.add_action("list")
         self.api.ip.add_action("list")
+        self.api.quota.add_action("tenant")
+        self.api.quota.add_action("details")
@@ -77,11 +77,14 @@ class Podman:
         container_id = stdout.strip()
         return container_id
 
-    async def inspect(self, container_id):
-        """Inspects a container returns data loaded from JSON structure."""
-        args = ["inspect", container_id]
+    async def inspect(self, *container_ids):
+        """Inspects containers returns data loaded from JSON structure.
+
+        Data of containers which do not exist are not part of the result.
+        """
+        args = ["inspect", *container_ids]
         stdout, _stderr, _process = await self._run_podman(args, raise_on_err=False)
-        inspect_data = json.loads(stdout)
+        inspect_data = json.loads(stdout or "[]")
         return inspect_data
 
     async def rm(self, container_id, force=False):  # pylint: disable=invalid-name
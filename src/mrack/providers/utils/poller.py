@@ -0,0 +1,141 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for polling state of provider resources in batches."""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPoller:
+    """Poll state of all watched resources of a provider using one request per tick.
+
+    Coroutines waiting for their resource register it by calling `wait`.
+    Single background task calls `fetch` with IDs of all watched resources
+    every `interval` seconds and wakes up the coroutines which resources
+    reached final state according to `is_done`.
+
+    `fetch` is a coroutine function which gets list of resource IDs and
+    returns dictionary mapping the IDs to their current state. Resources
+    missing in the result are polled again on the next tick, exception
+    instance used as a state is raised in the coroutines waiting for it.
+    Errors from `errors` raised by `fetch` are tolerated `max_errors` times
+    in a row, after that they are raised in all waiting coroutines.
+    """
+
+    def __init__(self, name, fetch, is_done, interval=10, errors=(), max_errors=5):
+        """Init the poller."""
+        self.name = name
+        self.fetch = fetch
+        self.is_done = is_done
+        self.interval = interval
+        self.errors = tuple(errors)
+        self.max_errors = max_errors
+        self.states = {}
+        self._waiters = {}
+        self._watched_since = {}
+        self._seen_callbacks = {}
+        self._task = None
+
+    def watched_since(self):
+        """Get time (UTC) since the oldest of currently watched resources is watched."""
+        if not self._watched_since:
+            return None
+        return min(self._watched_since.values())
+
+    async def wait(self, res_id, timeout=None, seen=None):
+        """Wait for resource to reach final state.
+
+        Optional `seen` callback is called with the first fetched state.
+        Returns last known state of the resource, which is not final when
+        the `timeout` (seconds) is reached or None if it was not seen yet.
+        """
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.setdefault(res_id, []).append(future)
+        if seen:
+            self._seen_callbacks.setdefault(res_id, []).append(seen)
+        self._watched_since.setdefault(res_id, datetime.now(timezone.utc))
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+        try:
+            await asyncio.wait([future], timeout=timeout)
+            if future.done():
+                return future.result()
+            return self.states.get(res_id)
+        finally:
+            future.cancel()
+            waiters = self._waiters.get(res_id, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(res_id, None)
+                self._watched_since.pop(res_id, None)
+                self._seen_callbacks.pop(res_id, None)
+                self.states.pop(res_id, None)
+
+    def _wake_up(self, res_id, state=None, error=None):
+        """Wake up coroutines waiting for the resource."""
+        for future in self._waiters.get(res_id, []):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(state)
+
+    async def _run(self):
+        """Poll watched resources till there is anyone waiting for them."""
+        error_attempts = 0
+        try:
+            while self._waiters:
+                await asyncio.sleep(self.interval)
+                res_ids = list(self._waiters)
+                if not res_ids:
+                    break
+
+                logger.debug(f"{self.name} Polling state of {len(res_ids)} resource(s)")
+                try:
+                    states = await self.fetch(res_ids)
+                except self.errors as err:
+                    error_attempts += 1
+                    logger.debug(
+                        f"{self.name} Polling failed "
+                        f"({error_attempts}/{self.max_errors}): {err}"
+                    )
+                    if error_attempts > self.max_errors:
+                        for res_id in res_ids:
+                            self._wake_up(res_id, error=err)
+                    continue
+
+                error_attempts = 0
+                for res_id in res_ids:
+                    state = states.get(res_id)
+                    if isinstance(state, Exception):
+                        self._wake_up(res_id, error=state)
+                    elif state is not None:
+                        for seen in self._seen_callbacks.pop(res_id, []):
+                            seen(state)
+                        self.states[res_id] = state
+                        if self.is_done(state):
+                            self._wake_up(res_id, state=state)
+        except Exception as err:  # pylint: disable=broad-except
+            # do not leave anyone waiting forever
+            for res_id in list(self._waiters):
+                self._wake_up(res_id, error=err)
+        finally:
+            self._task = None
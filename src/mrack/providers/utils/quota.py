@@ -0,0 +1,101 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for caching provider quota usage and limits."""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaCache:
+    """Cache of provider quota usage and limits.
+
+    `fetch` is a coroutine function returning dictionary which maps
+    resources to their usage, e.g. {"vcpus": {"used": 10, "limit": 100}}.
+    Data older than `ttl` seconds are fetched again on next use.
+
+    Resources requested by mrack are recorded as local reservations which
+    are added to the fetched usage till the data is fetched again, so
+    decisions stay correct without fetching the data after each request.
+    """
+
+    def __init__(self, name, fetch, ttl=30):
+        """Init the cache."""
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self._data = None
+        self._fetched_at = None
+        self._reservations = []
+        self._lock = None
+
+    def _get_lock(self):
+        """Get lock created lazily within running event loop."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _is_valid(self):
+        """Return True when cached data can be used."""
+        return self._data is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def update(self, data, fetched_at=None):
+        """Store freshly fetched data dropping reservations made before the fetch."""
+        self._fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        self._data = data
+        self._reservations = [
+            (made_at, usage)
+            for made_at, usage in self._reservations
+            if made_at >= self._fetched_at
+        ]
+
+    def invalidate(self):
+        """Drop cached data so it is fetched on next use, e.g. after deletion."""
+        logger.debug(f"{self.name} Invalidating cached quota")
+        self._data = None
+
+    def reserve(self, usage):
+        """Record local reservation of resources, e.g. {"vcpus": 2, "ram": 2048}."""
+        self._reservations.append((time.monotonic(), dict(usage)))
+
+    def release(self, usage):
+        """Release resources reserved by `reserve`, e.g. after failed request."""
+        for idx, (_made_at, reserved) in enumerate(self._reservations):
+            if reserved == usage:
+                del self._reservations[idx]
+                return
+
+    async def get(self):
+        """Get quota usage (including local reservations) and limits."""
+        async with self._get_lock():
+            if not self._is_valid():
+                logger.debug(f"{self.name} Fetching quota")
+                started = time.monotonic()
+                self.update(await self.fetch(), fetched_at=started)
+            else:
+                logger.debug(f"{self.name} Using cached quota")
+
+        quota = {
+            resource: {"used": values["used"], "limit": values["limit"]}
+            for resource, values in self._data.items()
+        }
+        for _made_at, usage in self._reservations:
+            for resource, amount in usage.items():
+                if resource in quota:
+                    quota[resource]["used"] += amount
+
+        return quota
@@ -0,0 +1,128 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Module for recording timeline of host provisioning phases."""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Timeline:
+    """Timeline of provisioning phases of provider hosts.
+
+    Each host has a list of events with monotonic `start` and `end`
+    timestamps (seconds). Phases which take some time (e.g. create request)
+    are recorded using `phase` or `begin` and `end`, points in time
+    (e.g. first status of the host) using `mark` with the same start and end.
+    """
+
+    def __init__(self):
+        """Init the timeline."""
+        self.hosts = {}
+
+    def begin(self, host, phase):
+        """Record start of host phase."""
+        event = {"phase": phase, "start": time.monotonic(), "end": None}
+        self.hosts.setdefault(host, []).append(event)
+
+    def end(self, host, phase):
+        """Record end of the last started host phase of given name."""
+        for event in reversed(self.hosts.get(host, [])):
+            if event["phase"] == phase and event["end"] is None:
+                event["end"] = time.monotonic()
+                return
+
+    def mark(self, host, phase):
+        """Record point in time of host phase."""
+        now = time.monotonic()
+        self.hosts.setdefault(host, []).append(
+            {"phase": phase, "start": now, "end": now}
+        )
+
+    @contextmanager
+    def phase(self, host, phase):
+        """Record host phase taking the time of the with block."""
+        self.begin(host, phase)
+        try:
+            yield
+        finally:
+            self.end(host, phase)
+
+    def get(self, host):
+        """Get copy of recorded events of the host."""
+        return [dict(event) for event in self.hosts.get(host, [])]
+
+    def trace_events(self, pid, origin):
+        """Get Chrome trace events of all hosts in process `pid`.
+
+        Timestamps are in microseconds relative to `origin` (monotonic seconds).
+        """
+        events = []
+        for tid, (host, host_events) in enumerate(sorted(self.hosts.items()), 1):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": host},
+                }
+            )
+            for event in host_events:
+                end = event["end"] if event["end"] is not None else event["start"]
+                trace_event = {
+                    "name": event["phase"],
+                    "cat": "mrack",
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": round((event["start"] - origin) * 1e6),
+                }
+                if end == event["start"]:
+                    trace_event.update({"ph": "i", "s": "t"})
+                else:
+                    trace_event.update(
+                        {"ph": "X", "dur": round((end - event["start"]) * 1e6)}
+                    )
+                events.append(trace_event)
+        return events
+
+    def origin(self):
+        """Get monotonic time of the first recorded event or None."""
+        starts = [event["start"] for events in self.hosts.values() for event in events]
+        return min(starts) if starts else None
+
+
+def write_trace(path, timelines):
+    """Write timelines of providers to file in Chrome trace (Perfetto) format.
+
+    `timelines` is a dictionary mapping provider name to its Timeline.
+    """
+    origins = [timeline.origin() for timeline in timelines.values()]
+    origins = [origin for origin in origins if origin is not None]
+    origin = min(origins) if origins else 0
+
+    events = []
+    for pid, (name, timeline) in enumerate(sorted(timelines.items()), 1):
+        events.append(
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}}
+        )
+        events += timeline.trace_events(pid, origin)
+
+    with open(path, "w", encoding="utf-8") as trace_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+    logger.info(f"Provisioning trace saved to {path}")
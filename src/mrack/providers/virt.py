@@ -164,6 +164,8 @@ class VirtProvider(Provider):
     async def wait_till_provisioned(self, resource):
         """Wait till resource is provisioned."""
         result, req = resource
+        # testcloud returns the VM once it is running
+        self.timeline.mark(req.get("name"), "active")
         result.update({"mrack_req": req})
         return result, req
 
@@ -20,6 +20,7 @@ from typing import Set, Tuple, Type
 
 import click
 
+from mrack.actions.bake import Bake
 from mrack.actions.destroy import Destroy
 from mrack.actions.etchosts import EtcHostsUpdate
 from mrack.actions.list import List
@@ -139,17 +140,24 @@ def mrackcli(ctx, mrack_config, provisioning_config, db_file, debug):
 @click.pass_context
 @click.option("-m", "--metadata", type=click.Path(exists=True))
 @click.option("-p", "--provider", default="openstack")
+@click.option("--trace", "trace_file", type=click.Path(dir_okay=False))
 @async_run
-async def up(ctx, metadata, provider):  # pylint: disable=invalid-name
+async def up(ctx, metadata, provider, trace_file):  # pylint: disable=invalid-name
     """Provision hosts.
 
     Based on provided job metadata file and provisioning configuration.
+    Phases of host provisioning can be saved as Chrome trace to `--trace` file.
     """
     ctx.obj.init_metadata(metadata)
 
     up_action = Up(ctx.obj.PROV_CONFIG, ctx.obj.METADATA, ctx.obj.DB)
-    await up_action.init(provider)
-    await up_action.provision()
+    try:
+        await up_action.init(provider)
+        await up_action.provision()
+    finally:
+        if trace_file:
+            up_action.save_trace(trace_file)
+        await up_action.close()
 
     await generate_outputs(ctx)
 
@@ -157,12 +165,39 @@ async def up(ctx, metadata, provider):  # pylint: disable=invalid-name
 @mrackcli.command()
 @click.pass_context
 @click.option("-m", "--metadata", type=click.Path(exists=True))
+@click.option("--trace", "trace_file", type=click.Path(dir_okay=False))
 @async_run
-async def destroy(ctx, metadata):
-    """Destroy provisioned hosts."""
+async def destroy(ctx, metadata, trace_file):
+    """Destroy provisioned hosts.
+
+    Deletion of hosts can be saved as Chrome trace to `--trace` file.
+    """
     ctx.obj.init_metadata(metadata)
     destroy_action = Destroy(ctx.obj.PROV_CONFIG, ctx.obj.METADATA, ctx.obj.DB)
-    await destroy_action.destroy()
+    try:
+        await destroy_action.destroy()
+    finally:
+        if trace_file:
+            destroy_action.save_trace(trace_file)
+        await destroy_action.close()
+
+
+@mrackcli.command()
+@click.pass_context
+@click.argument("hostnames", nargs=-1)
+@click.option("-m", "--metadata", type=click.Path(exists=True))
+@async_run
+async def bake(ctx, hostnames, metadata):
+    """Create images of configured hosts for later provisioning.
+
+    Bakes given hosts or all hosts with `bake` attribute in job metadata.
+    """
+    ctx.obj.init_metadata(metadata)
+    bake_action = Bake(ctx.obj.PROV_CONFIG, ctx.obj.METADATA, ctx.obj.DB)
+    try:
+        await bake_action.bake(hostnames)
+    finally:
+        await bake_action.close()
 
 
 @mrackcli.command()
@@ -15,6 +15,7 @@
 """AWS transformer module."""
 
 from mrack.providers.provider import STRATEGY_ABORT
+from mrack.providers.utils.executor import EXECUTOR_TIMEOUT, EXECUTOR_WORKERS
 from mrack.transformers.transformer import DEFAULT_ATTEMPTS, Transformer
 
 CONFIG_KEY = "aws"
@@ -42,6 +43,10 @@ class AWSTransformer(Transformer):
             instance_tags=self.config["instance_tags"],
             strategy=self.config.get("strategy", STRATEGY_ABORT),
             max_retry=self.config.get("max_retry", DEFAULT_ATTEMPTS),
+            api_workers=self.config.get("api_workers", EXECUTOR_WORKERS),
+            api_timeout=self.config.get("api_timeout", EXECUTOR_TIMEOUT),
+            bulk_create=self.config.get("bulk_create", False),
+            status_checks=self.config.get("status_checks", False),
         )
 
     def _get_security_groups(self):
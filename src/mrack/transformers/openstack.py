@@ -18,6 +18,7 @@ import os
 
 from mrack.errors import ProvisioningConfigError
 from mrack.providers.provider import STRATEGY_ABORT
+from mrack.providers.utils.bake import get_bake_hash
 from mrack.transformers.transformer import Transformer
 
 logger = logging.getLogger(__name__)
@@ -55,6 +56,9 @@ class OpenStackTransformer(Transformer):
             cloud_profile=os_cloud,
             keypair=self.config["keypair"],
             pubkey=self.config["pubkey"],
+            lazy_load=self.config.get("lazy_load", False),
+            bulk_create=self.config.get("bulk_create", False),
+            profile=self.init_profile,
         )
 
     def _get_network_type(self, host):
@@ -97,5 +101,10 @@ class OpenStackTransformer(Transformer):
         if config_drive_req:
             req.update({"config_drive": config_drive_req})
 
+        # hosts whose configuration is baked to image, see `mrack bake`
+        bake = host.get("bake")
+        if bake:
+            req["bake"] = get_bake_hash(bake)
+
         req = self.update_metadata_for_owner_lifetime(req)
         return req
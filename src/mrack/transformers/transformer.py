@@ -22,6 +22,7 @@ import typing
 from mrack.context import global_context
 from mrack.errors import ConfigError, MetadataError, ValidationError
 from mrack.providers import providers
+from mrack.providers.provider import INIT_FULL
 from mrack.utils import (
     find_value_in_config_hierarchy,
     get_config_value,
@@ -85,12 +86,17 @@ class Transformer:
     _required_config_attrs: typing.List[str] = []
     _config_key = ""
 
-    async def init(self, cfg, metadata):
-        """Initialize transformer."""
+    async def init(self, cfg, metadata, profile=INIT_FULL):
+        """Initialize transformer.
+
+        `profile` is passed to providers which can skip loading of data
+        not needed by the action, see INIT_* constants in mrack.providers.provider.
+        """
         self.dsp_name = "Transformer"
         self._hosts = []
         self._config = cfg
         self._metadata = metadata
+        self.init_profile = profile
         if self._config_key:
             self.validate_config()
 
@@ -22,6 +22,7 @@ import datetime
 import json
 import logging
 import os
+import random
 import subprocess
 import sys
 from functools import wraps
@@ -386,30 +387,17 @@ def ssh_options_to_cli(options):
     return cmd
 
 
-def ssh_to_host(
+def get_ssh_command(
     host,
     username=None,
     password=None,
     ssh_key=None,
     command=None,
-    interactive=False,
     ssh_options={},
 ):
-    """SSH to the selected host."""
+    """Get shell command used to SSH to the selected host."""
     psw = host.password or password
 
-    run_args = {
-        "env": os.environ.copy(),
-        "shell": True,
-    }
-    if not interactive:
-        run_args.update(
-            {
-                "stdout": subprocess.PIPE,
-                "stderr": subprocess.PIPE,
-            }
-        )
-
     cmd = ["ssh"]
     cmd.extend(ssh_options_to_cli(ssh_options))
 
@@ -428,22 +416,120 @@ def ssh_to_host(
     if command:
         cmd.append(command)
 
-    cmd = " ".join(cmd)
+    return " ".join(cmd)
+
+
+def _log_ssh_output(std_out, std_err):
+    """Log output of the ssh command on debug level."""
+    for o_line in std_out.decode().splitlines():
+        logger.debug(f"stdout: {o_line}")
+
+    for e_line in std_err.decode().splitlines():
+        logger.debug(f"stderr: {e_line}")
+
+
+def ssh_to_host(
+    host,
+    username=None,
+    password=None,
+    ssh_key=None,
+    command=None,
+    interactive=False,
+    ssh_options={},
+):
+    """SSH to the selected host."""
+    run_args = {
+        "env": os.environ.copy(),
+        "shell": True,
+    }
+    if not interactive:
+        run_args.update(
+            {
+                "stdout": subprocess.PIPE,
+                "stderr": subprocess.PIPE,
+            }
+        )
+
+    cmd = get_ssh_command(host, username, password, ssh_key, command, ssh_options)
 
     logger.debug(f"Running: {cmd}")
     with subprocess.Popen(cmd, **run_args) as process:
         std_out, std_err = process.communicate()
 
     if not interactive:
-        for o_line in std_out.decode().splitlines():
-            logger.debug(f"stdout: {o_line}")
+        _log_ssh_output(std_out, std_err)
+
+    return process.returncode == 0
+
+
+async def ssh_to_host_async(
+    host,
+    username=None,
+    password=None,
+    ssh_key=None,
+    command=None,
+    ssh_options={},
+    timeout=None,
+):
+    """SSH to the selected host without blocking the event loop.
+
+    Returns False when the command fails or does not finish within `timeout`
+    seconds, the ssh process is killed in such case and also when the
+    coroutine is cancelled.
+    """
+    cmd = get_ssh_command(host, username, password, ssh_key, command, ssh_options)
 
-        for e_line in std_err.decode().splitlines():
-            logger.debug(f"stderr: {e_line}")
+    logger.debug(f"Running: {cmd}")
+    process = await asyncio.create_subprocess_shell(
+        cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=os.environ.copy(),
+    )
+    try:
+        std_out, std_err = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        logger.debug(f"ssh to {host.ip_addr} timed out after {timeout}s")
+        return False
+    finally:
+        # do not leave ssh running on timeout or when the caller is cancelled
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    _log_ssh_output(std_out, std_err)
 
     return process.returncode == 0
 
 
+async def is_port_open(address, port, timeout=None):
+    """Check that the port on the address accepts TCP connections."""
+    try:
+        _reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(address, port), timeout
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass  # we only care that the connection was established
+    return True
+
+
+def get_backoff_delay(attempt, base=1, cap=60):
+    """Get exponential backoff delay in seconds with a random jitter.
+
+    Delay grows as `base * 2 ** attempt` limited by `cap`, the returned value
+    is randomized from the upper half of the interval so concurrent waiters
+    do not retry at the same time.
+    """
+    delay = min(cap, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
 async def exec_async_subprocess(program, args, raise_on_err=True):
     """Util method to execute subprocess asynchronously."""
     process = await asyncio.create_subprocess_exec(
@@ -134,3 +134,6 @@ class TestStaticProvider:
 
         for host in database.hosts.values():
             assert host.status == STATUS_DELETED
+            # deletion is stored with the phases of the host
+            assert host.timeline[-1]["phase"] == "delete"
+            assert host.timeline[-1]["end"] is not None
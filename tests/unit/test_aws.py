@@ -0,0 +1,396 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+from unittest.mock import Mock, call, patch
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from mrack.config import MrackConfig
+from mrack.context import global_context
+from mrack.providers.aws import AWSProvider
+
+
+def instance(aws_id, state):
+    return {
+        "InstanceId": aws_id,
+        "State": {"Name": state},
+        "PrivateIpAddress": "10.0.0.1",
+        "Tags": [{"Key": "Name", "Value": f"host{aws_id[-1]}.mrack.test"}],
+    }
+
+
+def reservation(*instances):
+    return {"Reservations": [{"Instances": list(instances)}]}
+
+
+class TestAWSProvider:
+    def setup_method(self):
+        self.client = boto3.client(
+            "ec2",
+            region_name="us-east-1",
+            aws_access_key_id="key",
+            aws_secret_access_key="secret",
+        )
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        self.boto_patcher = patch(
+            "mrack.providers.aws.boto3.client", return_value=self.client
+        )
+        self.boto_patcher.start()
+
+    def teardown_method(self):
+        self.boto_patcher.stop()
+        self.stubber.deactivate()
+
+    async def init_provider(self):
+        provider = AWSProvider()
+        await provider.init(ssh_key="mrack", instance_tags={"mrack": "yes"})
+        return provider
+
+    @pytest.mark.asyncio
+    @patch("mrack.providers.aws.POLL_PAGE_SIZE", 2)
+    async def test_wait_till_provisioned(self):
+        provider = await self.init_provider()
+        provider.poll_sleep = 0.01
+        provider.status_checks = True
+        reqs = [
+            {"name": f"host{idx}.mrack.test", "os": "fedora", "group": "client"}
+            for idx in range(3)
+        ]
+
+        def describe(ids, *instances):
+            self.stubber.add_response(
+                "describe_instances",
+                reservation(*instances) if instances else {"Reservations": []},
+                {"Filters": [{"Name": "instance-id", "Values": ids}]},
+            )
+
+        def status(aws_id, instance_status, system_status):
+            return {
+                "InstanceId": aws_id,
+                "InstanceStatus": {"Status": instance_status},
+                "SystemStatus": {"Status": system_status},
+            }
+
+        # all instances are polled by single request per page, i-2 is not visible
+        describe(["i-0", "i-1"], instance("i-0", "pending"), instance("i-1", "running"))
+        describe(["i-2"])
+        self.stubber.add_response(
+            "describe_instance_status",
+            {"InstanceStatuses": [status("i-1", "initializing", "ok")]},
+            {"InstanceIds": ["i-1"]},
+        )
+        describe(["i-0", "i-1"], instance("i-0", "running"), instance("i-1", "running"))
+        describe(["i-2"], instance("i-2", "terminated"))
+        self.stubber.add_response(
+            "describe_instance_status",
+            {
+                "InstanceStatuses": [
+                    status("i-0", "initializing", "initializing"),
+                    status("i-1", "ok", "ok"),
+                ]
+            },
+            {"InstanceIds": ["i-0", "i-1"]},
+        )
+        describe(["i-0"], instance("i-0", "running"))
+        self.stubber.add_response(
+            "describe_instance_status",
+            {"InstanceStatuses": [status("i-0", "ok", "ok")]},
+            {"InstanceIds": ["i-0"]},
+        )
+
+        results = await asyncio.gather(
+            *[
+                provider.wait_till_provisioned((f"i-{idx}", req))
+                for idx, req in enumerate(reqs)
+            ]
+        )
+        await provider.close()
+
+        self.stubber.assert_no_pending_responses()
+        states = [result["State"]["Name"] for result, _req in results]
+        assert states == ["running", "running", "terminated"]
+        assert [result["mrack_status_checks"] for result, _req in results[:2]] == [
+            "ok",
+            "ok",
+        ]
+        host = provider.to_host(*results[0])
+        assert host.host_id == "i-0"
+        assert host.ip_addrs == ["10.0.0.1"]
+        assert host.name == "host0.mrack.test"
+
+    @pytest.mark.asyncio
+    async def test_load_images(self, tmp_path):
+        reqs = [
+            {"name": "host1", "image": {"tag": {"name": "os", "value": "fedora"}}},
+            {"name": "host2", "image": {"tag": {"name": "os", "value": "rhel"}}},
+            {"name": "host3", "image": {"tag": {"name": "os", "value": "fedora"}}},
+            {"name": "host4", "image": "ami-3"},
+        ]
+        images = {
+            "tag:os": [
+                {
+                    "ImageId": "ami-1",
+                    "CreationDate": "2023-01-01T00:00:00.000Z",
+                    "Tags": [{"Key": "os", "Value": "fedora"}],
+                },
+                {
+                    "ImageId": "ami-2",
+                    "CreationDate": "2023-02-01T00:00:00.000Z",
+                    "Tags": [{"Key": "os", "Value": "fedora"}],
+                },
+                {
+                    "ImageId": "ami-4",
+                    "CreationDate": "2023-01-15T00:00:00.000Z",
+                    "Tags": [{"Key": "os", "Value": "rhel"}],
+                },
+            ],
+            "image-id": [{"ImageId": "ami-3", "CreationDate": "2023-01-01"}],
+        }
+
+        def describe_images(Filters):
+            return {"Images": images[Filters[0]["Name"]]}
+
+        config_file = tmp_path / "mrack.conf"
+        config_file.write_text(f"[mrack]\ncache-dir = {tmp_path}\n")
+        config = MrackConfig(str(config_file))
+        config.load()
+        with patch.object(global_context, "mrack_conf", config):
+            describe_calls = []
+            for _run in range(2):
+                provider = await self.init_provider()
+                provider.client.describe_images = Mock(side_effect=describe_images)
+                assert await provider.prepare_provisioning(reqs)
+                await provider.close()
+                describe_calls.append(provider.client.describe_images.call_args_list)
+
+        # images of all hosts are loaded by single request per filter
+        assert len(describe_calls[0]) == 2
+        assert (
+            call(Filters=[{"Name": "tag:os", "Values": ["fedora", "rhel"]}])
+            in describe_calls[0]
+        )
+        # second run uses images from the disk cache
+        assert not describe_calls[1]
+        # the newest image is used
+        assert provider.get_image(reqs[0])["ImageId"] == "ami-2"
+        assert provider.get_image(reqs[1])["ImageId"] == "ami-4"
+        assert provider.get_image(reqs[3])["ImageId"] == "ami-3"
+
+        # each image expires on its own, newer resolved images do not extend it
+        with patch.object(global_context, "mrack_conf", config), patch(
+            "mrack.providers.utils.cache.time.time"
+        ) as mock_time:
+            describe_calls = []
+            for hours in [0, 23, 25]:
+                mock_time.return_value = 2 * 10**9 + hours * 60 * 60
+                provider = await self.init_provider()
+                provider.client.describe_images = Mock(side_effect=describe_images)
+                host = dict(reqs[0]) if hours != 23 else dict(reqs[3])
+                assert await provider.prepare_provisioning([host])
+                await provider.close()
+                describe_calls.append(provider.client.describe_images.call_count)
+        assert describe_calls == [1, 1, 1]
+
+        # missing image fails the preparation
+        provider = await self.init_provider()
+        provider.client.describe_images = Mock(return_value={"Images": []})
+        assert not await provider.prepare_provisioning([{"name": "h", "image": "x"}])
+
+    @pytest.mark.asyncio
+    async def test_delete_host(self):
+        provider = await self.init_provider()
+        self.stubber.add_response("terminate_instances", {}, {"InstanceIds": ["i-1"]})
+        self.stubber.add_client_error(
+            "terminate_instances", service_error_code="UnauthorizedOperation"
+        )
+
+        assert await provider.delete_host("i-1", "host1.mrack.test")
+        assert not await provider.delete_host("i-2", "host2.mrack.test")
+        assert not await provider.delete_host(None, "host3.mrack.test")
+        await provider.close()
+
+    @pytest.mark.asyncio
+    @patch("mrack.providers.aws.BULK_CREATE_WINDOW", 0)
+    async def test_create_server_bulk(self):
+        provider = AWSProvider()
+        await provider.init(
+            ssh_key="mrack", instance_tags={"mrack": "yes"}, bulk_create=True
+        )
+        provider.amis = {("image-id", "ami-1"): {"ImageId": "ami-1"}}
+        provider.subnets_capacity = {"subnet-1": 10}
+        reqs = [
+            {
+                "name": f"host{idx}.mrack.test",
+                "image": "ami-1",
+                "flavor": "t3.medium" if idx != 3 else "t3.large",
+                "subnet_ids": ["subnet-1"],
+            }
+            for idx in range(1, 5)
+        ]
+
+        def run_instances(**request):
+            return {
+                "Instances": [
+                    {
+                        "InstanceId": f"i-{request['InstanceType']}-{idx}",
+                        "AmiLaunchIndex": idx,
+                    }
+                    for idx in reversed(range(request["MaxCount"]))
+                ]
+            }
+
+        provider.client = Mock()
+        provider.client.run_instances = Mock(side_effect=run_instances)
+        results = await asyncio.gather(*[provider.create_server(req) for req in reqs])
+        await provider.close()
+
+        # identical instances created by single request, the different one alone
+        assert provider.client.run_instances.call_count == 2
+        counts = sorted(
+            call.kwargs["MaxCount"]
+            for call in provider.client.run_instances.call_args_list
+        )
+        assert counts == [1, 3]
+        ids = {req["name"]: aws_id for aws_id, req in results}
+        assert ids == {
+            "host1.mrack.test": "i-t3.medium-0",
+            "host2.mrack.test": "i-t3.medium-1",
+            "host3.mrack.test": "i-t3.large-0",
+            "host4.mrack.test": "i-t3.medium-2",
+        }
+
+        # instances of the batch are tagged with their own names
+        assert provider.client.create_tags.call_count == 3
+        tags = {
+            call.kwargs["Resources"][0]: call.kwargs["Tags"][0]["Value"]
+            for call in provider.client.create_tags.call_args_list
+        }
+        assert tags["i-t3.medium-1"] == "host2.mrack.test"
+        single = [
+            call.kwargs
+            for call in provider.client.run_instances.call_args_list
+            if call.kwargs["MaxCount"] == 1
+        ][0]
+        single_tags = single["TagSpecifications"][0]["Tags"]
+        assert {"Key": "Name", "Value": "host3.mrack.test"} in single_tags
+        assert {"Key": "mrack", "Value": "yes"} in single_tags
+        assert provider.subnets_capacity == {"subnet-1": 6}
+
+    @pytest.mark.asyncio
+    @patch("mrack.providers.aws.BULK_CREATE_WINDOW", 0)
+    async def test_create_server_bulk_cleanup(self):
+        provider = AWSProvider()
+        await provider.init(
+            ssh_key="mrack", instance_tags={"mrack": "yes"}, bulk_create=True
+        )
+        provider.amis = {("image-id", "ami-1"): {"ImageId": "ami-1"}}
+        reqs = [
+            {"name": f"host{idx}.mrack.test", "image": "ami-1", "flavor": "t3.medium"}
+            for idx in range(3)
+        ]
+        provider.client = Mock()
+        provider.client.run_instances = Mock(
+            return_value={
+                "Instances": [
+                    {"InstanceId": f"i-{idx}", "AmiLaunchIndex": idx}
+                    for idx in range(3)
+                ]
+            }
+        )
+        provider.delete_host = Mock(side_effect=RuntimeError("executor stopped"))
+
+        creations = [asyncio.ensure_future(provider.create_server(r)) for r in reqs]
+        await asyncio.sleep(0)
+        creations[0].cancel()  # nobody waits for the first instance
+        await provider.close()
+        results = await asyncio.wait_for(asyncio.gather(*creations[1:]), timeout=1)
+
+        # failed termination of abandoned instance does not affect the others
+        assert [aws_id for aws_id, _req in results] == ["i-1", "i-2"]
+        provider.delete_host.assert_called_once_with("i-0", "host0.mrack.test")
+        assert not provider._batch_tasks  # pylint: disable=protected-access
+
+    @pytest.mark.asyncio
+    async def test_subnet_placement(self):
+        provider = await self.init_provider()
+        subnets = [
+            ("subnet-a1", "10.0.0.0/28", "us-east-1a", 5),
+            ("subnet-a2", "10.0.1.0/24", "us-east-1a", 100),
+            ("subnet-b1", "10.0.2.0/27", "us-east-1b", 3),
+        ]
+        # all subnets are described by single request
+        self.stubber.add_response(
+            "describe_subnets",
+            {
+                "Subnets": [
+                    {
+                        "SubnetId": subnet_id,
+                        "CidrBlock": cidr,
+                        "AvailabilityZone": zone,
+                        "AvailableIpAddressCount": available,
+                    }
+                    for subnet_id, cidr, zone, available in subnets
+                ]
+            },
+            {
+                "Filters": [
+                    {
+                        "Name": "subnet-id",
+                        "Values": ["subnet-a1", "subnet-a2", "subnet-b1"],
+                    }
+                ]
+            },
+        )
+        all_subnets = [subnet[0] for subnet in subnets]
+        hosts = [
+            {"name": "host1.mrack.test", "subnet_ids": ["subnet-b1"]},
+            {"name": "host2.mrack.test", "subnet_ids": all_subnets},
+        ]
+
+        assert await provider.can_provision(hosts)
+        self.stubber.assert_no_pending_responses()
+        quota = await provider.quota.get()
+        # size is derived from CIDR, AWS reserves 5 addresses of each subnet
+        assert quota["subnet-a1"] == {"used": 6, "limit": 11}
+        assert quota["subnet-a2"] == {"used": 151, "limit": 251}
+        assert quota["subnet-b1"] == {"used": 24, "limit": 27}
+        assert await provider.utilization() == pytest.approx(24 / 27 * 100)
+
+        # hosts alternate availability zones, most free IPs within the zone
+        zone_hosts = {}
+        capacity = provider.subnets_capacity.copy()
+        picked = [
+            provider.pick_subnet(all_subnets, capacity, zone_hosts) for _ in range(6)
+        ]
+        assert picked == [
+            "subnet-a2",
+            "subnet-b1",
+            "subnet-a2",
+            "subnet-b1",
+            "subnet-a2",
+            "subnet-b1",
+        ]
+        assert provider.pick_subnet(["subnet-b1"], capacity, zone_hosts) is None
+        assert zone_hosts == {"us-east-1a": 3, "us-east-1b": 3}
+
+        # hosts with single subnet are not spread to other subnets
+        hosts = [
+            {"name": f"host{idx}.mrack.test", "subnet_ids": ["subnet-b1"]}
+            for idx in range(4)
+        ]
+        assert not await provider.can_provision(hosts)
+        await provider.close()
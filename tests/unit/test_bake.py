@@ -0,0 +1,71 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+from unittest.mock import patch
+
+from mrack.providers.utils.bake import BakeCache, get_bake_hash
+from mrack.providers.utils.cache import DiskCache
+
+HOUR = 60 * 60
+
+
+def bake_cache(tmp_path, max_age=24, max_count=2):
+    return BakeCache(
+        DiskCache(os.path.join(tmp_path, "openstack.json")), max_age, max_count
+    )
+
+
+class TestBakeCache:
+    def test_get_newest(self, tmp_path):
+        bakes = bake_cache(tmp_path)
+        assert bakes.get("base", "hash") is None
+
+        with patch("mrack.providers.utils.bake.time.time", return_value=0):
+            assert bakes.add("base", "hash", "image-1") == []
+        with patch("mrack.providers.utils.bake.time.time", return_value=HOUR):
+            assert bakes.add("base", "hash", "image-2") == []
+
+        with patch("mrack.providers.utils.bake.time.time", return_value=2 * HOUR):
+            # bake cache is shared by mrack runs
+            assert bake_cache(tmp_path).get("base", "hash") == "image-2"
+            assert bakes.get("base", "other-hash") is None
+            assert bakes.get("other-base", "hash") is None
+
+        # too old images are not used
+        with patch("mrack.providers.utils.bake.time.time", return_value=25 * HOUR):
+            assert bakes.get("base", "hash") is None
+
+    def test_evict(self, tmp_path):
+        bakes = bake_cache(tmp_path, max_count=2)
+        with patch("mrack.providers.utils.bake.time.time", return_value=0):
+            bakes.add("base", "hash", "image-1")
+            bakes.add("base", "other-hash", "image-2")
+            bakes.add("base", "hash", "image-3")
+            # only the newest images of the configuration are kept
+            assert bakes.add("base", "hash", "image-4") == ["image-1"]
+
+        with patch("mrack.providers.utils.bake.time.time", return_value=HOUR):
+            bakes.add("base", "other-hash", "image-5")
+        with patch("mrack.providers.utils.bake.time.time", return_value=24 * HOUR):
+            # too old images of all configurations are evicted as well
+            evicted = bakes.add("other-base", "hash", "image-6")
+            assert sorted(evicted) == ["image-2", "image-3", "image-4"]
+            assert bakes.get("base", "other-hash") == "image-5"
+            assert bake_cache(tmp_path).add("other-base", "hash", "image-7") == []
+
+
+def test_bake_hash():
+    config = {"playbook": "setup.yml", "version": 1}
+    assert get_bake_hash(config) == get_bake_hash(dict(reversed(config.items())))
+    assert get_bake_hash(config) != get_bake_hash({"playbook": "setup.yml"})
@@ -0,0 +1,55 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+import stat
+from unittest.mock import patch
+
+from mrack.providers.utils.cache import DiskCache
+
+
+class TestDiskCache:
+    def test_ttl(self, tmp_path):
+        path = os.path.join(tmp_path, "cache", "openstack.json")
+        cache = DiskCache(path)
+        with patch("mrack.providers.utils.cache.time.time", return_value=100):
+            cache.set("flavors", [{"name": "small"}])
+
+        # cache is shared by mrack runs
+        cache = DiskCache(path)
+        with patch("mrack.providers.utils.cache.time.time", return_value=159):
+            assert cache.get("flavors", ttl=60) == [{"name": "small"}]
+        with patch("mrack.providers.utils.cache.time.time", return_value=160):
+            assert cache.get("flavors", ttl=60) is None
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        cache.invalidate("flavors")
+        assert DiskCache(path).get("flavors", ttl=60) is None
+
+    def test_other_version_and_corrupted(self, tmp_path):
+        path = os.path.join(tmp_path, "openstack.json")
+        DiskCache(path, version=1).set("networks", [])
+        assert DiskCache(path, version=2).get("networks", ttl=60) is None
+
+        with open(path, "w", encoding="utf-8") as cache_file:
+            cache_file.write("{not json")
+        cache = DiskCache(path)
+        assert cache.get("networks", ttl=60) is None
+        cache.set("networks", [{"name": "net"}])
+        with open(path, encoding="utf-8") as cache_file:
+            assert json.load(cache_file)["entries"]["networks"]["value"] == [
+                {"name": "net"}
+            ]
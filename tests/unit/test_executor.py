@@ -0,0 +1,64 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mrack.providers.utils.executor import BlockingExecutor
+
+
+class TestBlockingExecutor:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls(self):
+        executor = BlockingExecutor("Test", workers=4)
+        threads = set()
+
+        def blocking_call(value, delay=0.2):
+            threads.add(threading.current_thread().name)
+            time.sleep(delay)
+            return value
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        start = time.monotonic()
+        results = await asyncio.gather(
+            *[executor.run(blocking_call, idx, delay=0.2) for idx in range(4)],
+            tick(),
+        )
+        duration = time.monotonic() - start
+        executor.shutdown()
+
+        assert results[:4] == [0, 1, 2, 3]
+        # calls run in parallel threads without blocking the event loop
+        assert duration < 0.6
+        assert ticks == 5
+        assert len(threads) == 4
+        assert all(name.startswith("Test") for name in threads)
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        executor = BlockingExecutor("Test", timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(time.sleep, 0.2)
+        # timeout of single call overrides the default
+        assert await executor.run(time.sleep, 0.1, timeout=1) is None
+        executor.shutdown()
@@ -0,0 +1,79 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp import web
+
+from mrack.providers.utils.http import HTTPTransport
+from mrack.providers.utils.osapi import PooledAsyncResource
+
+
+class TestHTTPTransport:
+    @pytest.mark.asyncio
+    async def test_shared_session(self):
+        peers = set()
+
+        async def list_servers(request):
+            peers.add(request.transport.get_extra_info("peername"))
+            return web.json_response({"servers": [{"id": "server-id"}]})
+
+        app = web.Application()
+        app.router.add_get("/servers", list_servers)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        transport = HTTPTransport("Test")
+        try:
+            for _ in range(3):
+                session = transport.get_session()
+                async with session.get(f"http://127.0.0.1:{port}/servers") as resp:
+                    assert await resp.json() == {"servers": [{"id": "server-id"}]}
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+        # all requests used the same keep-alive connection
+        assert len(peers) == 1
+        stats = transport.stats["GET 127.0.0.1"]
+        assert stats["count"] == 3
+        assert 0 <= stats["max"] <= stats["total"]
+
+    @pytest.mark.asyncio
+    async def test_pooled_resource(self):
+        transport = HTTPTransport("Test")
+        resource = PooledAsyncResource(
+            api_root_url="https://nova/v2.1/",
+            resource_name="servers",
+            timeout=10,
+            json_encode_body=True,
+            transport=transport,
+        )
+        make_request = AsyncMock(return_value="response")
+        with patch("mrack.providers.utils.osapi.make_async_request", make_request):
+            try:
+                assert await resource.create(body={"server": {}}) == "response"
+            finally:
+                await transport.close()
+
+        session, request = make_request.call_args.args
+        assert session.closed  # shared session of the transport was used
+        assert request.url == "https://nova/v2.1/servers"
+        assert request.method == "POST"
+        assert request.body == '{"server": {}}'
@@ -0,0 +1,72 @@
+# Copyright 2023 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from mrack.providers.utils.limiter import ConcurrencyLimiter
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TestConcurrencyLimiter:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("limit,expected", [(0, 10), (1, 1), (3, 3)])
+    async def test_limit(self, limit, expected):
+        limiter = ConcurrencyLimiter("test", limit=limit)
+        running = [0]
+        max_running = [0]
+
+        async def operation():
+            async with limiter:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+                await asyncio.sleep(0.01)
+                running[0] -= 1
+
+        await asyncio.gather(*[operation() for _ in range(10)])
+        assert max_running[0] == expected
+
+    @pytest.mark.asyncio
+    async def test_adaptive(self):
+        limiter = ConcurrencyLimiter(
+            "test", limit=8, adaptive=True, errors=(RateLimited,)
+        )
+
+        async def operation(error=None):
+            async with limiter:
+                if error:
+                    raise error
+
+        for _ in range(2):
+            with pytest.raises(RateLimited):
+                await operation(RateLimited())
+        assert limiter.limit == 2
+
+        # errors not caused by rate limiting do not change the limit
+        with pytest.raises(ValueError):
+            await operation(ValueError())
+        assert limiter.limit == 2
+
+        for _ in range(2 + 3):
+            await operation()
+        assert limiter.limit == 4
+
+        for _ in range(100):
+            await operation()
+        assert limiter.limit == 8
+        assert limiter.running == 0
@@ -0,0 +1,54 @@
+# Copyright 2023 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+
+import pytest
+
+from mrack.providers.utils.lock import FileLock
+
+
+class TestFileLock:
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive(self, tmp_path):
+        path = os.path.join(tmp_path, "locks", "openstack.lock")
+        first = FileLock(path, poll=0.01)
+        second = FileLock(path, poll=0.01)
+
+        assert await first.acquire()
+        waiting = asyncio.ensure_future(second.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        first.release()
+        assert await asyncio.wait_for(waiting, 1)
+        assert second.locked
+        assert not first.locked
+
+        second.release()
+        second.release()  # releasing not held lock does nothing
+        async with first:
+            assert first.locked
+        assert not first.locked
+
+    @pytest.mark.asyncio
+    async def test_unusable_lock_file(self, tmp_path):
+        blocker = os.path.join(tmp_path, "file")
+        with open(blocker, "w", encoding="utf-8") as blocker_file:
+            blocker_file.write("not a directory")
+
+        lock = FileLock(os.path.join(blocker, "openstack.lock"))
+        assert not await lock.acquire()
+        assert not lock.locked
@@ -11,22 +11,35 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
 import os
+import time
+from collections import Counter
 from copy import deepcopy
 from unittest import mock
 from unittest.mock import Mock, patch
 
 import pytest
-from simple_rest_client.exceptions import AuthError, NotFoundError, ServerError
+from simple_rest_client.exceptions import (
+    AuthError,
+    ClientError,
+    NotFoundError,
+    ServerError,
+)
 
 from mrack.context import global_context
 from mrack.errors import (
     MrackError,
+    ProviderError,
     ProviderNotExists,
     ProvisioningError,
+    ServerNotFoundError,
     ValidationError,
 )
+from mrack.host import STATUS_ACTIVE, Host
 from mrack.providers.openstack import OpenStackProvider
+from mrack.providers.provider import INIT_DELETE_ONLY
+from mrack.providers.utils.cache import DiskCache
 
 from .mock_networks import (
     mock_network_ip_availabilities,
@@ -165,6 +178,7 @@ class TestOpenStackProvider:
 
         self.auth_patcher = patch("mrack.providers.openstack.AuthPassword")
         self.mock_auth = self.auth_patcher.start()
+        self.mock_auth.return_value.authenticate = AsyncMock()
 
         self.mock_nova = Mock()
         self.mock_nova.init_api = AsyncMock(return_value=True)
@@ -182,6 +196,12 @@ class TestOpenStackProvider:
         self.mock_neutron.init_api = AsyncMock(return_value=True)
         self.mock_neutron.network.list = AsyncMock(return_value=self.networks)
         self.mock_neutron.ip.list = AsyncMock(return_value=self.availabilities)
+        self.mock_neutron.quota.tenant = AsyncMock(
+            return_value={"tenant": {"tenant_id": "project-id"}}
+        )
+        self.mock_neutron.quota.details = AsyncMock(
+            return_value={"quota": {"port": {"used": 20, "limit": 100, "reserved": 2}}}
+        )
 
         self.mock_neutron_class = Mock(return_value=self.mock_neutron)
         self.neutron_patcher = patch(
@@ -195,19 +215,35 @@ class TestOpenStackProvider:
 
         self.mock_glance_class = Mock(return_value=self.mock_glance)
         self.glance_patcher = patch(
-            "mrack.providers.openstack.GlanceClient", new=self.mock_glance_class
+            "mrack.providers.openstack.ExtraGlanceClient", new=self.mock_glance_class
         )
         self.glance_patcher.start()
 
     def teardown_method(self):
         mock.patch.stopall()
 
+    def mock_cached_session(self):
+        session = self.mock_auth.return_value
+        session.token = "token"
+        session.token_expires_at = time.time() + 3600
+        session.endpoints = [{"name": "nova"}]
+        self.mock_nova.api_url = "https://nova/v2.1/"
+        self.mock_glance.api_url = "https://glance/v2/"
+        self.mock_neutron.api_url = "https://neutron/v2.0/"
+        return session
+
     def mock_osp_network_calls(self, availabilities, networks):
         del self.mock_neutron
         self.mock_neutron = Mock()
         self.mock_neutron.init_api = AsyncMock(return_value=True)
         self.mock_neutron.network.list = AsyncMock(return_value=networks)
         self.mock_neutron.ip.list = AsyncMock(return_value=availabilities)
+        self.mock_neutron.quota.tenant = AsyncMock(
+            return_value={"tenant": {"tenant_id": "project-id"}}
+        )
+        self.mock_neutron.quota.details = AsyncMock(
+            return_value={"quota": {"port": {"used": 20, "limit": 100, "reserved": 2}}}
+        )
 
         self.mock_neutron_class = Mock(return_value=self.mock_neutron)
         self.neutron_patcher = patch(
@@ -261,6 +297,19 @@ class TestOpenStackProvider:
             net = provider._get_ips(ref=uuid)  # pylint: disable=protected-access
             assert net["network_name"] == name
 
+    @pytest.mark.asyncio
+    async def test_init_provider_delete_only(self):
+        provider = OpenStackProvider()
+        await provider.init(image_names=[], profile=INIT_DELETE_ONLY)
+
+        # Provider only authenticated, no objects nor keypair were loaded
+        assert self.mock_nova.init_api.mock.called
+        assert not self.mock_nova.keypairs.show.mock.called
+        assert not self.mock_nova.flavors.list.mock.called
+        assert not self.mock_nova.limits.show.mock.called
+        assert not self.mock_glance.images.list.mock.called
+        assert not provider.flavors
+
     @pytest.mark.asyncio
     async def test_provision(self):
         provider = OpenStackProvider()
@@ -621,6 +670,62 @@ class TestOpenStackProvider:
             x, "mrack_no_spread.conf", "no", 95
         )
 
+    async def translate_network_types(self, availabilities_data, pools, hosts):
+        availabilities = mock_network_ip_availabilities(availabilities_data)
+        networks = mock_networks_from_availabilities(availabilities)
+        self.mock_osp_network_calls(availabilities, networks)
+        init_global_context("mrack.conf")
+        provider = OpenStackProvider()
+        await provider.init(image_names=[], networks=pools)
+        provider._translate_network_types(hosts)  # pylint: disable=protected-access
+
+        return Counter(host["network"] for host in hosts)
+
+    @pytest.mark.asyncio
+    async def test_network_plan_capacity(self):
+        hosts = [hostX(x) for x in range(2000)]
+        availabilities_data = [
+            net_availability("net1", 2000, 500, 4),
+            net_availability("net2", 1000, 200, 4),
+            net_availability("net3", 500, 100, 4),
+        ]
+        pools = {"IPv4": ["net1", "net2", "net3"]}
+
+        allocation = await self.translate_network_types(
+            availabilities_data, pools, hosts
+        )
+
+        # hosts are split proportionally to available IPs of networks
+        assert allocation == {"net1": 1112, "net2": 592, "net3": 296}
+
+    @pytest.mark.asyncio
+    async def test_network_plan_shared_networks(self):
+        hosts = [hostX(x) for x in range(7)]
+        for host in hosts[:3]:
+            host["network"] = "IPv6"
+        availabilities_data = [
+            net_availability("net1", 100, 95, 4),
+            net_availability("net2", 100, 90, 4),
+        ]
+        pools = {"IPv4": ["net1", "net2"], "IPv6": ["net1"]}
+
+        allocation = await self.translate_network_types(
+            availabilities_data, pools, hosts
+        )
+
+        # IPs of net1 planned for IPv6 hosts are not available to IPv4 hosts
+        assert [host["network"] for host in hosts[:3]] == ["net1"] * 3
+        assert allocation == {"net1": 3, "net2": 4}
+
+    @pytest.mark.asyncio
+    async def test_network_plan_overcommit(self):
+        hosts = [hostX(x) for x in range(60)]
+        availabilities_data = [net_availability("net1", 100, 50, 4)]
+        pools = {"IPv4": ["net1"]}
+
+        with pytest.raises(ValidationError, match="Can not satisfy request for 60"):
+            await self.translate_network_types(availabilities_data, pools, hosts)
+
     @pytest.mark.asyncio
     @patch("asyncio.sleep", new_callable=AsyncMock)
     async def test_openstack_gather_responses(self, mocked_sleep):
@@ -734,71 +839,624 @@ class TestOpenStackProvider:
         assert server_req == req
 
     @pytest.mark.asyncio
-    async def test_load_limits(self):
+    @patch.object(
+        OpenStackProvider,
+        "_translate_flavor",
+        return_value={"name": "mocked-flavor", "id": "mocked-flavor-id"},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_image",
+        return_value={"name": "mocked-image", "id": "mocked-image-id"},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_networks",
+        return_value=[{"uuid": "mocked-network-uuid"}],
+    )
+    async def test_resolve_req(self, mocked_networks, mocked_image, mocked_flavor):
         provider = OpenStackProvider()
         await provider.init()
+        mocked_flavor.reset_mock()
+
+        reqs = [hostX(x) for x in range(1000)]
+        for req in reqs:
+            provider.validate_host(req)
+
+        # similar requirements are translated only once
+        assert mocked_flavor.call_count == 1
+        assert mocked_image.call_count == 1
+        resolved = provider._resolve_req(reqs[0])  # pylint: disable=protected-access
+        assert resolved.flavor["id"] == "mocked-flavor-id"
+        assert resolved.specs == ({"uuid": "mocked-network-uuid"},)
+
+        # requirement with other flavor is translated on its own
+        reqs[0]["flavor"] = "ci.standard.xl"
+        provider.validate_host(reqs[0])
+        assert mocked_flavor.call_count == 2
+
+        # loading of objects drops translated requirements
+        provider._set_flavors([])  # pylint: disable=protected-access
+        provider.validate_host(reqs[1])
+        assert mocked_flavor.call_count == 3
+
+    @pytest.mark.parametrize("networks", [None, "net", {"uuid": "net"}])
+    def test_translate_networks_not_list(self, networks):
+        provider = OpenStackProvider()
+        req = {"name": "host1.mrack.test", "networks": networks}
+        # networks which are not a list are ignored
+        assert provider._translate_networks(req, spec=True) == []
 
-        (
-            used_vcpus,
-            used_memory,
-            limit_vcpus,
-            limit_memory,
-        ) = await provider._load_limits()
+    @pytest.mark.asyncio
+    @patch("mrack.providers.openstack.BULK_CREATE_WINDOW", 0)
+    @patch.object(
+        OpenStackProvider,
+        "_translate_flavor",
+        return_value={"name": "mocked-flavor", "id": "mocked-flavor-id", "vcpus": 1},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_image",
+        return_value={"name": "mocked-image", "id": "mocked-image-id"},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_networks",
+        return_value=[{"uuid": "mocked-network-uuid"}],
+    )
+    async def test_create_server_bulk(
+        self, mocked_flavor, mocked_image, mocked_networks
+    ):
+        reqs = [host1(), host2(), host3(), hostX(4)]
+        reqs[2]["config_drive"] = False  # differs from the others
+
+        def create(server):
+            if server.get("max_count"):
+                return {"reservation_id": "r-bulk"}
+            return {"server": {"id": "single-id", "name": server["name"]}}
+
+        listed = [
+            {"id": f"bulk-id-{idx}", "name": f"host1.mrack.test-{idx}"}
+            for idx in [3, 1, 2]
+        ]
+
+        provider = OpenStackProvider()
+        await provider.init(bulk_create=True)
+        self.mock_nova.servers.create = AsyncMock(side_effect=create)
+        self.mock_nova.servers.list = AsyncMock(return_value={"servers": listed})
+        self.mock_nova.servers.update = AsyncMock()
+
+        results = await asyncio.gather(*[provider.create_server(r) for r in reqs])
+
+        # identical hosts created by single request, the different one alone
+        assert self.mock_nova.servers.create.mock.call_count == 2
+        bulk_call = self.mock_nova.servers.create.mock.call_args_list[0]
+        assert bulk_call.kwargs["server"]["min_count"] == 3
+        assert bulk_call.kwargs["server"]["max_count"] == 3
+        assert bulk_call.kwargs["server"]["return_reservation_id"]
+        self.mock_nova.servers.list.mock.assert_called_once_with(
+            reservation_id="r-bulk"
+        )
 
-        limits = self.limits["limits"]["absolute"]
-        assert used_vcpus == limits["totalCoresUsed"]
-        assert used_memory == limits["totalRAMUsed"]
-        assert limit_vcpus == limits["maxTotalCores"]
-        assert limit_memory == limits["maxTotalRAMSize"]
+        # servers are mapped to requirements and renamed
+        ids = {req["name"]: server["id"] for server, req in results}
+        assert ids == {
+            "host1.mrack.test": "bulk-id-1",
+            "host2.mrack.test": "bulk-id-2",
+            "host3.mrack.test": "single-id",
+            "host4.mrack.test": "bulk-id-3",
+        }
+        for server, req in results:
+            assert server["name"] == req["name"]
+        assert self.mock_nova.servers.update.mock.call_count == 3
+        self.mock_nova.servers.update.mock.assert_any_call(
+            "bulk-id-2", server={"name": "host2.mrack.test"}
+        )
+
+    @pytest.mark.asyncio
+    @patch("mrack.providers.openstack.BULK_CREATE_WINDOW", 0)
+    @patch("mrack.providers.openstack.SERVER_ERROR_SLEEP", 0)
+    @patch.object(
+        OpenStackProvider,
+        "_translate_flavor",
+        return_value={"name": "mocked-flavor", "id": "mocked-flavor-id", "vcpus": 1},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_image",
+        return_value={"name": "mocked-image", "id": "mocked-image-id"},
+    )
+    @patch.object(
+        OpenStackProvider,
+        "_translate_networks",
+        return_value=[{"uuid": "mocked-network-uuid"}],
+    )
+    async def test_create_server_bulk_cleanup(
+        self, mocked_flavor, mocked_image, mocked_networks
+    ):
+        reqs = [host1(), hostX(2), hostX(3)]
+        listed = [
+            {"id": f"bulk-id-{idx}", "name": f"host1.mrack.test-{idx}"}
+            for idx in [1, 2, 3]
+        ]
+        list_errors = [ServerError("Oops!", 503)]
+
+        def list_servers(reservation_id):
+            if list_errors:
+                raise list_errors.pop()
+            return {"servers": listed}
+
+        provider = OpenStackProvider()
+        await provider.init(bulk_create=True)
+        self.mock_nova.servers.create = AsyncMock(
+            return_value={"reservation_id": "r-bulk"}
+        )
+        self.mock_nova.servers.list = AsyncMock(side_effect=list_servers)
+        self.mock_nova.servers.update = AsyncMock()
+        provider.delete_server = AsyncMock(side_effect=ProviderError("bulk-id-3"))
+
+        creations = [asyncio.ensure_future(provider.create_server(r)) for r in reqs]
+        await asyncio.sleep(0)
+        creations[2].cancel()  # nobody waits for the last server
+        await provider.close()
+        results = await asyncio.gather(*creations[:2])
+
+        # failed list is retried so the servers are found
+        assert self.mock_nova.servers.list.mock.call_count == 2
+        assert [server["id"] for server, _req in results] == [
+            "bulk-id-1",
+            "bulk-id-2",
+        ]
+        # failed deletion of abandoned server does not affect other servers
+        provider.delete_server.mock.assert_called_once_with("bulk-id-3")
+        assert not provider._batch_tasks  # pylint: disable=protected-access
+
+    @pytest.mark.asyncio
+    async def test_create_server_baked(self, tmp_path):
+        init_global_context()
+        self.mock_cached_session()
+        pubkey = os.path.join(tmp_path, "id_rsa.pub")
+        with open(pubkey, "w", encoding="utf-8") as pubkey_file:
+            pubkey_file.write("ssh-rsa AAAA")
+        base = self.images["images"][0]
+        baked = dict(base, id="baked-id", name="mrack-bake-hash")
+        self.mock_glance.images.retrieve = AsyncMock(return_value=baked)
+        self.mock_nova.servers.create = AsyncMock(
+            return_value={"server": {"id": "server-id"}}
+        )
+        req = dict(host1(), flavor="m1.medium", image=base["name"], bake="hash")
+        del req["network"]
+        other_req = dict(req, name="host2.mrack.test", bake="other-hash")
+
+        with patch.object(
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
+        ):
+            provider = OpenStackProvider()
+            await provider.init(image_names=[base["name"]], pubkey=pubkey)
+            provider.bakes.add(base["id"], "hash", "baked-id")
+
+            await provider.prepare_provisioning([req, other_req])
+            await provider.create_server(req)
+            await provider.create_server(other_req)
+
+        self.mock_glance.images.retrieve.mock.assert_called_once_with("baked-id")
+        servers = [
+            call.kwargs["server"]
+            for call in self.mock_nova.servers.create.mock.call_args_list
+        ]
+        # image baked for the configuration is used instead of the base image
+        assert servers[0]["imageRef"] == "baked-id"
+        assert servers[1]["imageRef"] == base["id"]
+        assert "bake" not in servers[0]
+        assert servers[0]["metadata"] == {
+            "mrack_bake": "hash",
+            "mrack_base_image": base["id"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_load_images_cached_expiry(self, tmp_path):
+        first = self.images["images"][0]
+        second = dict(first, id="other-image-id", name="other-image")
+        self.mock_glance.images.list = AsyncMock(
+            return_value={"images": [first, second]}
+        )
+        provider = OpenStackProvider()
+        provider.glance = self.mock_glance
+        provider.cache = DiskCache(os.path.join(tmp_path, "openstack.json"))
+
+        loads = []
+        with patch("mrack.providers.utils.cache.time.time") as mock_time:
+            for hours, name in [
+                (0, first["name"]),
+                (23, second["name"]),
+                (25, first["name"]),
+            ]:
+                mock_time.return_value = hours * 60 * 60
+                calls = self.mock_glance.images.list.mock.call_count
+                await provider._load_images_cached([name])
+                loads.append(self.mock_glance.images.list.mock.call_count - calls)
+
+        # each image expires on its own, loading other image does not extend it
+        assert loads == [1, 1, 1]
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
-        "used_vcpus, used_memory, limit_vcpus, limit_memory, expected_utilization",
+        "message,dropped",
         [
-            (10, 2048, 100, 16384, 12.5),
-            (25, 4096, 100, 16384, 25.0),
-            (50, 6144, 100, 16384, 50.0),
+            ("Image mocked-image-id could not be found.", "image"),
+            ("Invalid key_name provided.", "keypair"),
         ],
     )
-    async def test_utilization(
-        self,
-        used_vcpus,
-        used_memory,
-        limit_vcpus,
-        limit_memory,
-        expected_utilization,
-    ):
+    async def test_create_server_rejected(self, tmp_path, message, dropped):
+        init_global_context()
+        self.mock_cached_session()
+        pubkey = os.path.join(tmp_path, "id_rsa.pub")
+        with open(pubkey, "w", encoding="utf-8") as pubkey_file:
+            pubkey_file.write("ssh-rsa AAAA")
+        image = self.images["images"][0]
+        response = Mock(body={"badRequest": {"code": 400, "message": message}})
+        self.mock_nova.servers.create = AsyncMock(
+            side_effect=ClientError(message, response)
+        )
+        req = dict(host1(), flavor="m1.medium", image=image["name"])
+        del req["network"]
+
+        with patch.object(
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
+        ):
+            provider = OpenStackProvider()
+            await provider.init(
+                image_names=[image["name"]], keypair="mrack", pubkey=pubkey
+            )
+            await provider.prepare_provisioning([req])
+            with pytest.raises(ProvisioningError):
+                await provider.create_server(req)
+
+        # object rejected by nova is not reused from the cache by next run
+        cached = {
+            "image": provider.cache.get(f"image:{image['name']}", float("inf")),
+            "keypair": provider.cache.get("keypair", float("inf")),
+        }
+        assert cached.pop(dropped) is None
+        assert all(cached.values())
+
+    @pytest.mark.asyncio
+    @patch("mrack.providers.openstack.BAKE_POLL_SLEEP", 0)
+    async def test_bake_host(self, tmp_path):
+        init_global_context()
+        self.mock_cached_session()
+        pubkey = os.path.join(tmp_path, "id_rsa.pub")
+        with open(pubkey, "w", encoding="utf-8") as pubkey_file:
+            pubkey_file.write("ssh-rsa AAAA")
+        base_id = self.images["images"][0]["id"]
+        metadata = {"mrack_bake": "hash", "mrack_base_image": base_id}
+        host = Host(
+            provider=None,
+            host_id="server-id",
+            name="host1.mrack.test",
+            operating_system="fedora-latest",
+            group="ipaclient",
+            ip_addrs=["192.168.0.1"],
+            status=STATUS_ACTIVE,
+            rawdata={"id": "server-id", "image": {"id": base_id}, "metadata": metadata},
+        )
+        self.mock_nova.servers.run_action = AsyncMock()
+        images = [
+            {"images": []},
+            {"images": [{"id": "baked-1", "status": "saving"}]},
+            {"images": [{"id": "baked-1", "status": "active"}]},
+            {"images": [{"id": "baked-2", "status": "active"}]},
+        ]
+        self.mock_glance.images.list = AsyncMock(side_effect=lambda **_: images.pop(0))
+        self.mock_glance.images.destroy = AsyncMock()
+
+        with patch.object(
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
+        ), patch.object(type(global_context.CONFIG), "bake_max_count", new=1):
+            provider = OpenStackProvider()
+            await provider.init(image_names=[], pubkey=pubkey)
+            assert await provider.bake_host(host)
+            assert provider.bakes.get(base_id, "hash") == "baked-1"
+            assert not self.mock_glance.images.destroy.mock.called
+
+            # older image is deleted when the host is baked again
+            assert await provider.bake_host(host)
+            assert provider.bakes.get(base_id, "hash") == "baked-2"
+            self.mock_glance.images.destroy.mock.assert_called_once_with("baked-1")
+
+        name, kwargs = self.mock_nova.servers.run_action.mock.call_args
+        assert name == ("server-id",)
+        assert kwargs["createImage"]["name"].startswith("mrack-bake-hash-")
+        assert kwargs["createImage"]["metadata"] == metadata
+
+        # host not provisioned with bake attribute is not baked
+        host.rawdata["metadata"] = {}
+        assert not await provider.bake_host(host)
+
+    @pytest.mark.asyncio
+    async def test_wait_till_provisioned(self):
+        provider = OpenStackProvider()
+        await provider.init()
+        provider.poll_sleep_initial = 0
+        provider.poll_sleep = 0.01
+
+        statuses = {"srv1": ["BUILD", "ACTIVE"], "srv2": ["BUILD", "BUILD", "ERROR"]}
+
+        list_calls = []
+
+        async def list_servers(**params):
+            list_calls.append(params)
+            return {
+                "servers": [
+                    {"id": uuid, "status": states.pop(0)}
+                    for uuid, states in statuses.items()
+                    if states
+                ]
+            }
+
+        self.mock_nova.servers.list = list_servers
+        self.mock_nova.servers.get = AsyncMock(
+            side_effect=NotFoundError("Mocked NotFoundError", 404)
+        )
+
+        results = await asyncio.gather(
+            provider.wait_till_provisioned(({"id": "srv1"}, host1())),
+            provider.wait_till_provisioned(({"id": "srv2"}, host1())),
+            provider.wait_till_provisioned(({"id": "srv3"}, host1())),
+            return_exceptions=True,
+        )
+
+        assert results[0][0]["status"] == "ACTIVE"
+        assert results[1][0]["status"] == "ERROR"
+        assert isinstance(results[2], ServerNotFoundError)
+        # servers are polled together with single request per poll
+        assert len(list_calls) == 3
+        assert all("changes-since" in params for params in list_calls)
+        assert self.mock_nova.servers.get.mock.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_lazy_load(self):
+        networks = {n["name"]: n for n in self.networks["networks"]}
+        availabilities = {
+            a["network_id"]: a for a in self.availabilities["network_ip_availabilities"]
+        }
+
+        def network_list(name=None, id=None):
+            found = [n for n in networks.values() if name in (n["name"], n["id"])]
+            found += [n for n in networks.values() if n["id"] == id]
+            return {"networks": found}
+
+        def ip_list(network_id):
+            return {"network_ip_availabilities": [availabilities[network_id]]}
+
+        self.mock_nova.flavors.show = AsyncMock(side_effect=NotFoundError("Error", 404))
+        self.mock_neutron.network.list = AsyncMock(side_effect=network_list)
+        self.mock_neutron.ip.list = AsyncMock(side_effect=ip_list)
+
         provider = OpenStackProvider()
+        await provider.init(image_names=[], networks=self.network_pools, lazy_load=True)
+        assert not self.mock_nova.flavors.list.mock.called
+        assert not self.mock_neutron.network.list.mock.called
+        assert not self.mock_neutron.ip.list.mock.called
+
+        net_2 = networks["net_2"]["id"]
+        reqs = [
+            {"name": "a", "image": "fedora", "flavor": "m1.medium", "network": "IPv4"},
+            {"name": "b", "image": "fedora", "flavor": "m1.medium", "network": net_2},
+        ]
+        await provider.prepare_provisioning(reqs)
+
+        # flavor is not found by UUID so all flavors are loaded once
+        assert self.mock_nova.flavors.list.mock.call_count == 1
+        assert provider._get_flavor("m1.medium")
+        # only networks of used network type and referenced networks are loaded
+        assert sorted(provider.networks) == ["net_1", "net_2", "net_3"]
+        self.mock_neutron.network.list.mock.assert_any_call(name="net_1")
+        self.mock_neutron.network.list.mock.assert_any_call(id=net_2)
+        assert sorted(provider.ips) == ["net_1", "net_3"]
+
+        # loaded objects are memoized
+        await provider.prepare_provisioning(reqs)
+        assert self.mock_neutron.network.list.mock.call_count == 3
+        assert self.mock_neutron.ip.list.mock.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_init_cached(self, tmp_path):
+        pubkey = os.path.join(tmp_path, "id_rsa.pub")
+        with open(pubkey, "w", encoding="utf-8") as pubkey_file:
+            pubkey_file.write("ssh-rsa AAAA")
+        image_names = [image["name"] for image in self.images["images"]]
+        session = self.mock_cached_session()
 
-        # Mock the return value of _load_limits method
         with patch.object(
-            OpenStackProvider,
-            "_load_limits",
-            new_callable=AsyncMock,
-            return_value=(used_vcpus, used_memory, limit_vcpus, limit_memory),
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
+        ):
+            for run in range(2):
+                if run:
+                    # new mrack run starts without token
+                    session.token = None
+                provider = OpenStackProvider()
+                await provider.init(
+                    image_names=image_names, keypair="mrack", pubkey=pubkey
+                )
+
+        # second run uses objects from the disk cache
+        assert self.mock_nova.flavors.list.mock.call_count == 1
+        assert self.mock_neutron.network.list.mock.call_count == 1
+        assert self.mock_glance.images.list.mock.call_count == 1
+        assert self.mock_nova.keypairs.show.mock.call_count == 1
+        for image in self.images["images"]:
+            assert provider._get_image(image["name"])["id"] == image["id"]
+        for flavor in self.flavors["flavors"]:
+            assert provider._get_flavor(flavor["name"])["id"] == flavor["id"]
+        for network in self.networks["networks"]:
+            assert provider._get_network(network["name"])["id"] == network["id"]
+        # IP availabilities change often and are not cached
+        assert self.mock_neutron.ip.list.mock.call_count == 2
+        # token and service catalog of the first run are reused
+        assert session.token == "token"
+        self.mock_glance_class.assert_called_with(
+            session=session, api_url="https://glance/v2/", transport=provider.transport
+        )
+
+    @pytest.mark.asyncio
+    async def test_init_cached_token_rejected(self, tmp_path):
+        init_global_context()
+        session = self.mock_cached_session()
+
+        def login():
+            if session.token is None:
+                session.token = "new-token"
+
+        session.authenticate = AsyncMock(side_effect=login)
+
+        with patch.object(
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
         ):
-            utilization_value = await provider.utilization()
+            provider = OpenStackProvider()
+            await provider.init(image_names=[], profile=INIT_DELETE_ONLY)
+            assert not self.mock_nova.limits.show.mock.called
+
+            # token from the first run was revoked meanwhile
+            self.mock_nova.limits.show = AsyncMock(
+                side_effect=[AuthError("Mocked AuthError", 401), self.limits]
+            )
+            provider = OpenStackProvider()
+            await provider.init(image_names=[], profile=INIT_DELETE_ONLY)
+
+        # provider logged in again with API URLs from the service catalog
+        assert session.token == "new-token"
+        self.mock_nova_class.assert_called_with(
+            session=session, api_url=None, transport=provider.transport
+        )
+        assert provider.cache.get("auth", float("inf"))["token"] == "new-token"
+
+    @pytest.mark.asyncio
+    async def test_init_cache_scope_user(self, tmp_path):
+        init_global_context()
+        session = self.mock_cached_session()
+        paths = []
+
+        with patch.object(
+            type(global_context.CONFIG),
+            "cache_dir",
+            new=os.path.join(tmp_path, "cache"),
+        ):
+            for user, domain in [
+                ("ci1", "Default"),
+                ("ci2", "Default"),
+                ("ci1", "dom"),
+            ]:
+                session.os_username = user
+                session.os_user_domain_name = domain
+                provider = OpenStackProvider()
+                await provider.init(image_names=[], profile=INIT_DELETE_ONLY)
+                paths.append(provider.cache.path)
+
+        # identities sharing project do not share cached token
+        assert len(set(paths)) == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "quota, expected_utilization",
+        [
+            (
+                {
+                    "vcpus": {"used": 25, "limit": 100},
+                    "ram": {"used": 4096, "limit": 16384},
+                },
+                25.0,
+            ),
+            (
+                {
+                    "vcpus": {"used": 50, "limit": 100},
+                    "ram": {"used": 6144, "limit": 16384},
+                },
+                50.0,
+            ),
+            (
+                {
+                    "vcpus": {"used": 10, "limit": 100},
+                    "ram": {"used": 4096, "limit": 16384},
+                    "ports": {"used": 90, "limit": 100},
+                },
+                90.0,
+            ),
+            (
+                {
+                    "vcpus": {"used": 10, "limit": 100},
+                    "ram": {"used": 4096, "limit": -1},
+                },
+                10.0,
+            ),
+        ],
+    )
+    async def test_utilization(self, quota, expected_utilization):
+        provider = OpenStackProvider()
+        provider.quota.update(quota)
+
+        utilization_value = await provider.utilization()
 
         assert utilization_value == expected_utilization
 
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
-        "host_reqs, load_limits, expected_can_provision",
+        "host_reqs, expected_can_provision",
         [
             (
                 [{"vcpus": 2, "ram": 2048}, {"vcpus": 3, "ram": 4096}],
-                (10, 4096, 100, 16384),
                 True,
             ),
             (
                 [{"vcpus": 50, "ram": 8192}, {"vcpus": 60, "ram": 8192}],
-                (10, 4096, 100, 16384),
                 False,
             ),
+            (
+                [
+                    {"vcpus": 1, "ram": 1024, "instances": 1, "ports": 1},
+                    {"vcpus": 1, "ram": 1024, "instances": 1, "ports": 1},
+                ],
+                True,
+            ),
+            (
+                [
+                    {"vcpus": 1, "ram": 1024, "instances": 1, "ports": 1},
+                    {"vcpus": 1, "ram": 1024, "instances": 1, "ports": 1},
+                    {"vcpus": 1, "ram": 1024, "instances": 1, "ports": 1},
+                ],
+                False,
+            ),
+            (
+                [{"vcpus": 1, "ram": 1024, "instances": 1, "ports": 6}],
+                False,
+            ),
+            (
+                # volumes are not limited by the quota
+                [{"vcpus": 1, "ram": 1024, "volumes": 100}],
+                True,
+            ),
         ],
     )
-    async def test_can_provision(self, host_reqs, load_limits, expected_can_provision):
+    async def test_can_provision(self, host_reqs, expected_can_provision):
         provider = OpenStackProvider()
+        provider.quota.update(
+            {
+                "vcpus": {"used": 10, "limit": 100},
+                "ram": {"used": 4096, "limit": 16384},
+                "instances": {"used": 8, "limit": 10},
+                "ports": {"used": 15, "limit": 20},
+            }
+        )
 
         def mock_get_host_requirements(req):
             return req
@@ -807,16 +1465,60 @@ class TestOpenStackProvider:
             OpenStackProvider,
             "get_host_requirements",
             side_effect=mock_get_host_requirements,
-        ), patch.object(
-            OpenStackProvider,
-            "_load_limits",
-            new_callable=AsyncMock,
-            return_value=load_limits,
         ):
             can_provision = await provider.can_provision(host_reqs)
 
         assert can_provision == expected_can_provision
 
+    @pytest.mark.asyncio
+    async def test_fetch_quota(self):
+        provider = OpenStackProvider()
+        await provider.init(image_names=[])
+
+        quota = await provider.fetch_quota()
+        absolute = self.limits["limits"]["absolute"]
+        assert quota["vcpus"]["limit"] == absolute["maxTotalCores"]
+        assert quota["instances"] == {
+            "used": absolute["totalInstancesUsed"],
+            "limit": absolute["maxTotalInstances"],
+        }
+        assert quota["ports"] == {"used": 22, "limit": 100}
+        # project ID is loaded only once
+        assert self.mock_neutron.quota.tenant.mock.call_count == 1
+        self.mock_neutron.quota.details.mock.assert_called_with("project-id")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "details",
+        [
+            AsyncMock(side_effect=NotFoundError("Error", 404)),
+            AsyncMock(return_value={"quota": {"network": {"used": 1, "limit": 10}}}),
+        ],
+    )
+    async def test_fetch_quota_no_ports(self, details):
+        self.mock_neutron.quota.details = details
+        provider = OpenStackProvider()
+        await provider.init(image_names=[])
+
+        quota = await provider.fetch_quota()
+        assert "ports" not in quota
+        assert "vcpus" in quota
+
+    def test_get_host_requirements(self):
+        provider = OpenStackProvider()
+        provider._set_flavors(self.flavors["flavors"])
+        flavor = self.flavors["flavors"][0]
+
+        usage = provider.get_host_requirements(
+            {"flavor": flavor["name"], "network": "net1", "networks": [{"uuid": "x"}]}
+        )
+        assert usage == {
+            "vcpus": flavor["vcpus"],
+            "ram": flavor["ram"],
+            "instances": 1,
+            "ports": 2,
+        }
+
     @patch(
         "aiofiles.open",
         return_value=AsyncContextManagerMock(AsyncFileReadMock("mock_public_key")),
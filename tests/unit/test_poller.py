@@ -0,0 +1,101 @@
+# Copyright 2023 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from mrack.errors import ServerNotFoundError
+from mrack.providers.utils.poller import BatchPoller
+
+
+class FlakyError(Exception):
+    pass
+
+
+class TestBatchPoller:
+    @pytest.mark.asyncio
+    async def test_single_fetch_per_tick(self):
+        calls = []
+
+        async def fetch(res_ids):
+            calls.append(sorted(res_ids))
+            tick = len(calls)
+            # resource N becomes active on tick N, resource 3 does not exist
+            return {
+                res_id: (
+                    ServerNotFoundError(res_id)
+                    if res_id == 3
+                    else {
+                        "id": res_id,
+                        "status": "ACTIVE" if res_id <= tick else "BUILD",
+                    }
+                )
+                for res_id in res_ids
+            }
+
+        poller = BatchPoller(
+            "test", fetch, lambda state: state["status"] == "ACTIVE", interval=0.01
+        )
+
+        results = await asyncio.gather(
+            poller.wait(1),
+            poller.wait(2),
+            poller.wait(3),
+            return_exceptions=True,
+        )
+
+        assert results[0] == {"id": 1, "status": "ACTIVE"}
+        assert results[1] == {"id": 2, "status": "ACTIVE"}
+        assert isinstance(results[2], ServerNotFoundError)
+        assert calls == [[1, 2, 3], [2]]
+        assert poller.watched_since() is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_last_state(self):
+        async def fetch(res_ids):
+            return {res_id: {"status": "BUILD"} for res_id in res_ids}
+
+        poller = BatchPoller(
+            "test", fetch, lambda state: state["status"] == "ACTIVE", interval=0.01
+        )
+
+        assert await poller.wait(1, timeout=0.05) == {"status": "BUILD"}
+        assert await poller.wait(2, timeout=0) is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("failures,raised", [(2, False), (3, True)])
+    async def test_fetch_errors(self, failures, raised):
+        attempts = [0]
+
+        async def fetch(res_ids):
+            attempts[0] += 1
+            if attempts[0] <= failures:
+                raise FlakyError()
+            return {res_id: {"status": "ACTIVE"} for res_id in res_ids}
+
+        poller = BatchPoller(
+            "test",
+            fetch,
+            lambda state: state["status"] == "ACTIVE",
+            interval=0.01,
+            errors=(FlakyError,),
+            max_errors=2,
+        )
+
+        if raised:
+            with pytest.raises(FlakyError):
+                await poller.wait(1)
+        else:
+            assert await poller.wait(1) == {"status": "ACTIVE"}
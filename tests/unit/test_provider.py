@@ -12,15 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import os
 from unittest import mock
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, PropertyMock, patch
 
 import pytest
 
+from mrack.config import MrackConfig, ProvisioningConfig
 from mrack.context import global_context
-from mrack.errors import ProviderNotExists
-from mrack.providers.provider import Provider
+from mrack.errors import ProviderNotExists, ProvisioningError
+from mrack.providers.provider import ABORTED_ERROR, STRATEGY_RETRY, Provider
+from mrack.providers.utils.lock import FileLock
 
 
 def init_global_context(mrack_conf="mrack.conf"):
@@ -70,6 +73,8 @@ class TestProvider:
 
         provider = Provider()
         provider.max_retry = 3
+        # resources for the missing hosts are available right after the cooldown
+        provider.can_provision = AsyncMock(return_value=True)
 
         async def subtest_500_error():
             """Test reprovisioning and output when provisioning results in 500 error."""
@@ -108,7 +113,14 @@ class TestProvider:
                 assert len(success_hosts) == 1
                 assert len(error_hosts) == 2
                 assert len(missing_reqs) == 2
-                assert mock_sleep.mock.call_count == 3
+                # each retry waits at least the base timeout before checking
+                # the resources, quota does not reflect the server error
+                delays = [c[0][0] for c in mock_sleep.mock.call_args_list]
+                assert len(delays) == 6
+                delta_sleep = global_context.CONFIG.delta_sleep
+                assert all(
+                    delay >= provider.timeout - delta_sleep for delay in delays[::2]
+                )
                 assert mock_delete_hosts.mock.call_count == 3
                 # Assert that delete_hosts is called to delete all the hosts
                 for call in mock_delete_hosts.mock.call_args_list:
@@ -155,7 +167,8 @@ class TestProvider:
                 assert len(success_hosts) == 1
                 assert len(error_hosts) == 2
                 assert len(missing_reqs) == 2
-                assert mock_sleep.mock.call_count == 3
+                # minimum delay and capacity check after each server error
+                assert mock_sleep.mock.call_count == 6
                 assert mock_delete_hosts.mock.call_count == 3
                 # Assert that delete_hosts is called to delete all the hosts
                 for call in mock_delete_hosts.mock.call_args_list:
@@ -253,3 +266,378 @@ class TestProvider:
         await subtest_high_utilization()
         await subtest_success()
         await subtest_reprovision_missing_one_by_one_error()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_ssh_retries_until_ready(self):
+        host = Mock(ip_addr="192.168.0.1", password=None)
+        host.name = "host1"
+        provider = Provider()
+        port_results = iter([False, False, True])
+
+        async def port_open(*args, **kwargs):
+            return next(port_results)
+
+        with patch(
+            "mrack.providers.provider.is_port_open", side_effect=port_open
+        ), patch(
+            "mrack.providers.provider.ssh_to_host_async",
+            new_callable=AsyncMock,
+            return_value=True,
+        ) as mock_ssh, patch(
+            "mrack.providers.provider.get_username_pass_and_ssh_key",
+            return_value=("user", None, "key"),
+        ), patch(
+            "mrack.providers.provider.get_ssh_options", return_value={}
+        ), patch(
+            "asyncio.sleep", new_callable=AsyncMock
+        ) as mock_sleep:
+            res, res_host = await provider._wait_for_ssh(host, timeout=1, port=22)
+
+        assert res is True
+        assert res_host is host
+        assert mock_ssh.mock.call_count == 1
+        # one backoff sleep per failed port probe, delays grow exponentially
+        delays = [c[0][0] for c in mock_sleep.mock.call_args_list]
+        assert len(delays) == 2
+        assert 0.5 <= delays[0] <= 1
+        assert 1 <= delays[1] <= 2
+
+    @pytest.mark.asyncio
+    async def test_check_ssh_auth_probes_concurrently(self):
+        provider = Provider()
+        provider.concurrency["ssh"] = 2
+        hosts = []
+        for idx in range(5):
+            host = Mock(operating_system="fedora", group="client", host_id=idx)
+            host.name = f"host{idx}"
+            hosts.append(host)
+
+        running = [0]
+        max_running = [0]
+
+        async def probe(*args, **kwargs):
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return True
+
+        with patch("mrack.providers.provider.is_port_open", side_effect=probe), patch(
+            "mrack.providers.provider.ssh_to_host_async", side_effect=probe
+        ), patch(
+            "mrack.providers.provider.get_username_pass_and_ssh_key",
+            return_value=("user", None, "key"),
+        ), patch(
+            "mrack.providers.provider.get_ssh_options", return_value={}
+        ):
+            success, errors = await provider._check_ssh_auth(
+                {"enabled": True, "port": 22, "timeout": 1}, hosts
+            )
+
+        assert len(success) == 5
+        assert not errors
+        # probes overlap but never exceed the configured pool size
+        assert max_running[0] == 2
+
+    @pytest.mark.asyncio
+    async def test_provision_pipeline_does_not_wait_for_stages(self):
+        provider = Provider()
+        provider.strategy = STRATEGY_RETRY
+        events = []
+        reqs = [
+            {"name": "slow", "os": "fedora", "group": "client", "delay": 0.05},
+            {"name": "fast", "os": "fedora", "group": "client", "delay": 0},
+            {"name": "fail", "os": "fedora", "group": "client", "delay": 0},
+        ]
+
+        async def create_server(req):
+            if req["name"] == "fail":
+                raise ProvisioningError("err", {"name": "fail", "host_id": "fail"})
+            return req, req
+
+        async def wait_till_provisioned(response):
+            _srv, req = response
+            await asyncio.sleep(req["delay"])
+            events.append(f"active {req['name']}")
+            return req, req
+
+        def to_host(srv, req):
+            host = Mock(operating_system="fedora", group="client", error=None)
+            host.name = req["name"]
+            return host
+
+        async def wait_for_ssh(host, timeout, port):
+            events.append(f"ssh {host.name}")
+            return True, host
+
+        provider.create_server = create_server
+        provider.wait_till_provisioned = wait_till_provisioned
+        provider.to_host = to_host
+        provider.parse_error_hosts = AsyncMock(return_value=[])
+        provider._wait_for_ssh = wait_for_ssh
+
+        success, errors = await provider._provision_pipeline(reqs)
+
+        assert [h.name for h in success] == ["slow", "fast"]
+        assert [h.name for h in errors] == ["fail"]
+        # fast host is checked without waiting for the slow one to be active
+        assert events.index("ssh fast") < events.index("active slow")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("pipeline", [True, False])
+    async def test_fast_abort(self, pipeline):
+        provider = Provider()
+        reqs = [
+            {"name": "slow", "os": "fedora", "group": "client", "delay": 10},
+            {"name": "fail", "os": "fedora", "group": "client", "delay": 0},
+        ]
+
+        async def create_server(req):
+            return {"id": req["name"]}, req
+
+        async def wait_till_provisioned(response):
+            await asyncio.sleep(response[1]["delay"])
+            return response
+
+        def to_host(srv, req):
+            host = Mock(operating_system="fedora", group="client", error=None)
+            host.name = req["name"]
+            return host
+
+        async def parse_error_hosts(hosts):
+            return [host for host in hosts if host.name == "fail"]
+
+        provider.create_server = create_server
+        provider.wait_till_provisioned = wait_till_provisioned
+        provider.to_host = to_host
+        provider.parse_error_hosts = parse_error_hosts
+        provider._get_ssh_check = Mock(return_value=False)
+
+        if pipeline:
+            provision = provider._provision_pipeline(reqs)
+        else:
+            provision = provider._provision_stages(reqs)
+        success, errors = await asyncio.wait_for(provision, timeout=1)
+
+        assert not success
+        assert sorted(h.name for h in errors) == ["fail", "slow"]
+        aborted = [h for h in errors if h.name == "slow"][0]
+        # the created resource is kept so it can be deleted
+        assert aborted.host_id == "slow"
+        assert aborted.error == ABORTED_ERROR
+
+    @pytest.mark.asyncio
+    async def test_partial_admission_fast_abort(self, tmp_path):
+        provider = Provider()
+        reqs = [
+            {"name": "slow", "os": "fedora", "group": "client", "delay": 10},
+            {"name": "fail", "os": "fedora", "group": "client", "delay": 0},
+            {"name": "waiting", "os": "fedora", "group": "client", "delay": 0},
+        ]
+        metadata = {
+            "domains": [
+                {
+                    "hosts": [
+                        {"name": "slow", "priority": 10},
+                        {"name": "fail", "priority": 5},
+                        {"name": "waiting"},
+                    ]
+                }
+            ],
+        }
+        quota = {"used": 0, "limit": 1}
+        waves = []
+
+        async def can_provision(hosts):
+            return quota["used"] + len(hosts) <= quota["limit"]
+
+        async def create_server(req):
+            quota["used"] += 1
+            if req["name"] == "slow":
+                # resources for one more host are freed
+                quota["limit"] += 1
+            waves.append(req["name"])
+            return {"id": req["name"]}, req
+
+        async def wait_till_provisioned(response):
+            await asyncio.sleep(response[1]["delay"])
+            return response
+
+        def to_host(srv, req):
+            host = Mock(operating_system="fedora", group="client", error=None)
+            host.name = req["name"]
+            return host
+
+        async def parse_error_hosts(hosts):
+            return [host for host in hosts if host.name == "fail"]
+
+        provider.validate_hosts = AsyncMock()
+        provider.can_provision = can_provision
+        provider.create_server = create_server
+        provider.wait_till_provisioned = wait_till_provisioned
+        provider.to_host = to_host
+        provider.parse_error_hosts = parse_error_hosts
+        provider._get_ssh_check = Mock(return_value=False)
+        with patch.object(
+            MrackConfig, "partial_admission", new_callable=PropertyMock
+        ) as partial, patch.object(global_context, "metadata", metadata), patch.object(
+            provider,
+            "_get_provisioning_lock",
+            return_value=FileLock(os.path.join(tmp_path, "dummy.lock")),
+        ):
+            partial.return_value = True
+            success, errors, missing = await asyncio.wait_for(
+                provider._provision_base(reqs, timeout=60), timeout=2
+            )
+
+        # failure of the second wave aborts the first one and the waiting host
+        assert waves == ["slow", "fail"]
+        assert not success
+        errors = {host.name: host for host in errors}
+        assert sorted(errors) == ["fail", "slow", "waiting"]
+        assert errors["slow"].host_id == "slow"
+        assert errors["slow"].error == ABORTED_ERROR
+        assert errors["waiting"].host_id is None
+        assert errors["waiting"].error == ABORTED_ERROR
+        assert len(missing) == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("pipeline", [True, False])
+    async def test_start_wave_issued_before_create_retry(self, pipeline):
+        provider = Provider()
+        reqs = [{"name": "retried", "os": "fedora", "group": "client"}]
+        retried = asyncio.Event()
+
+        async def create_server(req):
+            # create request is accepted, provider waits to retry it
+            provider._mark_create_issued(req)
+            await retried.wait()
+            return {"id": req["name"]}, req
+
+        def to_host(srv, req):
+            host = Mock(operating_system="fedora", group="client", error=None)
+            host.name = req["name"]
+            return host
+
+        provider.create_server = create_server
+        provider.wait_till_provisioned = AsyncMock(side_effect=lambda res: res)
+        provider.to_host = to_host
+        provider.parse_error_hosts = AsyncMock(return_value=[])
+        provider._get_ssh_check = Mock(return_value=False)
+        with patch.object(
+            MrackConfig, "provisioning_pipeline", new_callable=PropertyMock
+        ) as provisioning_pipeline:
+            provisioning_pipeline.return_value = pipeline
+            wave = await asyncio.wait_for(provider._start_wave(reqs), timeout=1)
+
+        # wave is issued (and the lock can be released) during the retry
+        assert not wave.done()
+        retried.set()
+        success, errors = await wave
+        assert [host.name for host in success] == ["retried"]
+        assert not errors
+
+    @pytest.mark.parametrize(
+        "max_concurrency,prov_concurrency,expected",
+        [
+            (None, {}, {"create": 0, "poll": 0, "delete": 0, "ssh": 50}),
+            ("10", {}, {"create": 10, "poll": 10, "delete": 10, "ssh": 10}),
+            (
+                "10",
+                {"create": 5, "ssh": 20},
+                {"create": 5, "poll": 10, "delete": 10, "ssh": 20},
+            ),
+        ],
+    )
+    def test_limiter_config(self, max_concurrency, prov_concurrency, expected):
+        provider = Provider()
+        prov_config = ProvisioningConfig({"dummy": {"concurrency": prov_concurrency}})
+        with patch.object(
+            global_context, "provisioning_config", prov_config
+        ), patch.object(global_context.CONFIG, "get", return_value=max_concurrency):
+            limits = {op: provider.limiter(op).max_limit for op in expected}
+
+        assert limits == expected
+
+    @pytest.mark.asyncio
+    async def test_wait_for_capacity(self):
+        provider = Provider()
+        checks = [False, False, True]
+        check = AsyncMock(side_effect=checks)
+
+        with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            assert await provider._wait_for_capacity(check, max_wait=600, cap=60)
+
+        # waiting ends with the first successful check
+        assert check.mock.call_count == 3
+        delays = [c[0][0] for c in mock_sleep.mock.call_args_list]
+        assert len(delays) == 3
+        # checks are spread with exponential backoff
+        assert delays[0] <= 5 < delays[2] <= 20
+
+    @pytest.mark.asyncio
+    async def test_wait_for_capacity_timeout(self):
+        provider = Provider()
+        check = AsyncMock(return_value=False)
+
+        assert not await provider._wait_for_capacity(check, max_wait=0.05)
+        assert check.mock.called
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "gang,expected_waves",
+        [
+            (False, [["hostB", "hostC"], ["hostA"]]),
+            (True, [["hostA", "hostB", "hostC"]]),
+        ],
+    )
+    async def test_partial_admission(self, tmp_path, gang, expected_waves):
+        provider = Provider()
+        reqs = [{"name": "hostA"}, {"name": "hostB"}, {"name": "hostC"}]
+        metadata = {
+            "config": {"gang": gang},
+            "domains": [
+                {
+                    "hosts": [
+                        {"name": "hostA"},
+                        {"name": "hostB", "priority": 10},
+                        {"name": "hostC", "priority": 5},
+                    ]
+                }
+            ],
+        }
+        quota = {"used": 0, "limit": 2}
+        waves = []
+
+        async def can_provision(hosts):
+            return quota["used"] + len(hosts) <= quota["limit"]
+
+        async def provision_stages(hosts, issued=None, aborted=None):
+            waves.append([h["name"] for h in hosts])
+            quota["used"] += len(hosts)
+            issued.set()
+            return [Mock(name=h["name"]) for h in hosts], []
+
+        async def sleep(*args):
+            # resources are freed while waiting
+            quota["limit"] += 1
+
+        provider.validate_hosts = AsyncMock()
+        provider.can_provision = can_provision
+        provider._provision_stages = provision_stages
+        with patch.object(
+            MrackConfig, "partial_admission", new_callable=PropertyMock
+        ) as partial, patch.object(global_context, "metadata", metadata), patch.object(
+            provider,
+            "_get_provisioning_lock",
+            return_value=FileLock(os.path.join(tmp_path, "dummy.lock")),
+        ), patch(
+            "asyncio.sleep", side_effect=sleep
+        ):
+            partial.return_value = True
+            success, errors, missing = await provider._provision_base(reqs)
+
+        assert waves == expected_waves
+        assert len(success) == 3
+        assert not errors
+        assert not missing
@@ -0,0 +1,70 @@
+# Copyright 2023 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from mrack.providers.utils.quota import QuotaCache
+
+
+class TestQuotaCache:
+    def setup_method(self):
+        self.fetched = []
+
+    async def fetch(self):
+        self.fetched.append(True)
+        await asyncio.sleep(0)
+        return {"vcpus": {"used": 10, "limit": 100}}
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_invalidation(self):
+        cache = QuotaCache("test", self.fetch, ttl=30)
+
+        with patch("mrack.providers.utils.quota.time.monotonic", return_value=100):
+            await asyncio.gather(cache.get(), cache.get())
+            assert len(self.fetched) == 1
+
+        with patch("mrack.providers.utils.quota.time.monotonic", return_value=129):
+            await cache.get()
+            assert len(self.fetched) == 1
+
+        with patch("mrack.providers.utils.quota.time.monotonic", return_value=130):
+            await cache.get()
+            assert len(self.fetched) == 2
+
+            cache.invalidate()
+            await cache.get()
+            assert len(self.fetched) == 3
+
+    @pytest.mark.asyncio
+    async def test_reservations(self):
+        cache = QuotaCache("test", self.fetch, ttl=30)
+
+        with patch("mrack.providers.utils.quota.time.monotonic", return_value=100):
+            await cache.get()
+            cache.reserve({"vcpus": 4, "unknown": 1})
+            cache.reserve({"vcpus": 2})
+            quota = await cache.get()
+            assert quota == {"vcpus": {"used": 16, "limit": 100}}
+
+            cache.release({"vcpus": 2})
+            quota = await cache.get()
+            assert quota["vcpus"]["used"] == 14
+
+        # reservations made before the fetch are part of fetched usage
+        with patch("mrack.providers.utils.quota.time.monotonic", return_value=200):
+            quota = await cache.get()
+            assert quota["vcpus"]["used"] == 10
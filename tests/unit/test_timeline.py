@@ -0,0 +1,72 @@
+# Copyright 2020 Red Hat Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from unittest.mock import patch
+
+from mrack.providers.utils.timeline import Timeline, write_trace
+
+
+class TestTimeline:
+    def test_phases(self):
+        timeline = Timeline()
+        with patch("time.monotonic", side_effect=[10, 12, 13, 20]):
+            with timeline.phase("host1", "create"):
+                timeline.mark("host1", "first status")
+            timeline.mark("host2", "active")
+
+        assert timeline.get("host1") == [
+            {"phase": "create", "start": 10, "end": 13},
+            {"phase": "first status", "start": 12, "end": 12},
+        ]
+        assert timeline.get("host2") == [{"phase": "active", "start": 20, "end": 20}]
+        assert timeline.origin() == 10
+
+    def test_write_trace(self, tmp_path):
+        openstack = Timeline()
+        aws = Timeline()
+        with patch("time.monotonic", side_effect=[5, 7.5, 6]):
+            with openstack.phase("host1", "create"):
+                pass
+            aws.mark("host2", "active")
+
+        path = os.path.join(tmp_path, "trace.json")
+        write_trace(path, {"openstack": openstack, "aws": aws})
+        with open(path, encoding="utf-8") as trace_file:
+            events = json.load(trace_file)["traceEvents"]
+
+        spans = [e for e in events if e["ph"] != "M"]
+        assert spans == [
+            {
+                "name": "active",
+                "cat": "mrack",
+                "pid": 1,
+                "tid": 1,
+                "ts": 1000000,
+                "ph": "i",
+                "s": "t",
+            },
+            {
+                "name": "create",
+                "cat": "mrack",
+                "pid": 2,
+                "tid": 1,
+                "ts": 0,
+                "ph": "X",
+                "dur": 2500000,
+            },
+        ]
+        names = {(e["pid"], e["args"]["name"]) for e in events if e["ph"] == "M"}
+        assert names == {(1, "aws"), (1, "host2"), (2, "openstack"), (2, "host1")}
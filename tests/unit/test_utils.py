@@ -1,15 +1,19 @@
+import asyncio
+from unittest.mock import Mock, patch
 from xml.dom.minidom import Document as xml_doc
 
 import pytest
 
 from mrack.utils import (
     add_dict_to_node,
+    get_backoff_delay,
     get_fqdn,
     get_os_type,
     get_shortname,
     get_ssh_options,
     get_username,
     ssh_options_to_cli,
+    ssh_to_host_async,
     value_to_bool,
 )
 
@@ -207,3 +211,44 @@ class TestPytestMrackUtils:
     )
     def test_add_dict_to_node(self, req_node, dct, expected):
         assert add_dict_to_node(req_node, dct).toxml() == expected
+
+    @pytest.mark.parametrize(
+        "attempt,base,cap,low,high",
+        [
+            (0, 1, 60, 0.5, 1),
+            (3, 1, 60, 4, 8),
+            (10, 1, 60, 30, 60),
+            (2, 5, 60, 10, 20),
+        ],
+    )
+    def test_get_backoff_delay(self, attempt, base, cap, low, high):
+        for _ in range(20):
+            delay = get_backoff_delay(attempt, base=base, cap=cap)
+            assert low <= delay <= high
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cancel", [False, True])
+    async def test_ssh_to_host_async_kills_ssh(self, cancel):
+        processes = []
+        create_subprocess_shell = asyncio.create_subprocess_shell
+
+        async def start_process(_cmd, **kwargs):
+            process = await create_subprocess_shell("exec sleep 30", **kwargs)
+            processes.append(process)
+            return process
+
+        host = Mock(ip_addr="192.0.2.1", password=None)
+        with patch("mrack.utils.asyncio.create_subprocess_shell", start_process):
+            task = asyncio.ensure_future(
+                ssh_to_host_async(host, timeout=None if cancel else 0.1)
+            )
+            if cancel:
+                await asyncio.sleep(0.1)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            else:
+                assert not await task
+
+        # ssh process does not outlive the timed out or cancelled check
+        assert processes[0].returncode is not None